@@ -8,6 +8,8 @@ import argparse
 import sys
 import os
 
+from qube.cli import configure_interpreter
+
 def create_parser():
     """CLI 파서 생성 - 확장된 기능 포함"""
     parser = argparse.ArgumentParser(
@@ -20,6 +22,15 @@ Examples:
   qube --repl                # Start interactive mode  
   qube --check syntax.qb     # Check syntax only
   qube --debug program.qb    # Run with debug output
+  qube --quiet program.qb    # Only the program's println/print output
+  qube --precision single program.qb  # complex64 state vectors
+  qube --memmap --scratch-dir /scratch big.qb  # disk-backed state vectors
+  qube --threads 0 grover.qb # gate kernels on all CPU cores
+  qube --workers 8 trials.qb # run_many() on 8 processes
+  qube --backend stabilizer ghz.qb  # Clifford-only circuits with thousands of qubits
+  qube --backend mps --max-bond 32 chain.qb  # low-entanglement 1D circuits, 50-100 qubits
+  qube --peephole grover.qb  # cancel H·H, X·X, CNOT·CNOT and merge rotations first
+  qube bench --output bench.json  # simulator benchmark suite (--compare old.json flags regressions)
   qube --api                 # Show API reference
   qube --help measure        # Help for measure function
         """
@@ -31,7 +42,33 @@ Examples:
     parser.add_argument('--repl', action='store_true', help='Start interactive REPL')
     parser.add_argument('--check', action='store_true', help='Check syntax only')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
-    parser.add_argument('--debug', action='store_true', help='Debug mode')
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument('--debug', action='store_true', help='Debug mode (per-gate and per-iteration messages)')
+    output_group.add_argument('--quiet', '-q', action='store_true',
+                              help='Only show println/print output from the program')
+    parser.add_argument('--precision', choices=['double', 'single'], default='double',
+                       help='State vector precision (single = complex64, half the memory)')
+    parser.add_argument('--memmap', action='store_true',
+                       help='Keep state vectors in memory-mapped scratch files (circuits over 20 qubits)')
+    parser.add_argument('--scratch-dir', metavar='DIR', help='Directory for --memmap state vector files')
+    parser.add_argument('--memory-budget', metavar='MB', type=int,
+                       help='Memory budget per gate kernel pass, in MB')
+    parser.add_argument('--threads', metavar='N', type=int,
+                       help='Gate kernel threads (0 = all CPU cores)')
+    parser.add_argument('--workers', metavar='N', type=int,
+                       help='Processes used by run_many (0 = all CPU cores)')
+    parser.add_argument('--backend', choices=['auto', 'statevector', 'stabilizer', 'mps', 'sparse'], default='auto',
+                       help='Simulation backend (auto = stabilizer tableau for Clifford-only circuits)')
+    parser.add_argument('--max-bond', metavar='N', type=int,
+                       help='Maximum MPS bond dimension (default 64)')
+    parser.add_argument('--truncation-threshold', metavar='EPS', type=float,
+                       help='MPS singular value truncation threshold (default 1e-10)')
+    parser.add_argument('--peephole', action='store_true',
+                       help='Cancel inverse gate pairs and merge rotations before simulation')
+    parser.add_argument('--profile', action='store_true',
+                       help='Record per-gate call counts, time and bytes touched (see circuit_stats())')
+    parser.add_argument('--circuit-cache', metavar='MB', type=int,
+                       help='Final-state cache for repeated circuit instances, in MB (0 = off, default 256)')
     
     # 🆕 새로운 도움말 기능들
     parser.add_argument('--api', action='store_true', help='Show API reference')
@@ -46,6 +83,11 @@ def main():
     """메인 실행 함수 - 확장된 기능 포함"""
     parser = create_parser()
     
+    # 🏁 벤치마크 서브커맨드 (qube bench ...)
+    if len(sys.argv) >= 2 and sys.argv[1] == 'bench':
+        from qube.bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+    
     # 🔧 --help topic 특별 처리
     if len(sys.argv) >= 3 and sys.argv[1] == '--help':
         # qube --help measure 형태 처리
@@ -80,7 +122,7 @@ def main():
         
         # 기존 기능들
         if args.repl:
-            start_repl(args.debug, args.verbose)
+            start_repl(args.debug, args.verbose, args)
             return
             
         if not args.file:
@@ -93,7 +135,7 @@ def main():
             sys.exit(1)
             
         # 파일 실행
-        execute_file(args.file, args.check, args.debug, args.verbose)
+        execute_file(args.file, args.check, args.debug, args.verbose, args)
         
     except KeyboardInterrupt:
         print("\n프로그램이 중단되었습니다.")
@@ -106,7 +148,7 @@ def main():
             print(f"Qube 오류: {e}")
         sys.exit(1)
 
-def execute_file(filename, check_only=False, debug_mode=False, verbose_mode=False):
+def execute_file(filename, check_only=False, debug_mode=False, verbose_mode=False, options=None):
     """파일 실행 - 기존 로직 유지"""
     try:
         with open(filename, 'r', encoding='utf-8') as f:
@@ -114,10 +156,14 @@ def execute_file(filename, check_only=False, debug_mode=False, verbose_mode=Fals
         
         from qube import QubeInterpreter
         interpreter = QubeInterpreter()
+        if options is not None:
+            configure_interpreter(interpreter, options)
         
         # 🔧 디버그/verbose 모드 설정
         if debug_mode:
+            from qube.output import DEBUG
             interpreter.debug_mode = True
+            interpreter.output.verbosity = DEBUG
         if verbose_mode:
             interpreter.verbose_mode = True
             
@@ -158,7 +204,7 @@ def execute_file(filename, check_only=False, debug_mode=False, verbose_mode=Fals
                 
             raise
 
-def start_repl(debug_mode=False, verbose_mode=False):
+def start_repl(debug_mode=False, verbose_mode=False, options=None):
     """REPL 모드 시작 - 개선된 도움말 포함"""
     print("🚀 Qube 대화형 모드 (REPL)")
     print("종료: exit() 또는 Ctrl+C")
@@ -167,9 +213,13 @@ def start_repl(debug_mode=False, verbose_mode=False):
     
     from qube import QubeInterpreter
     interpreter = QubeInterpreter()
+    if options is not None:
+        configure_interpreter(interpreter, options)
     
     if debug_mode:
+        from qube.output import DEBUG
         interpreter.debug_mode = True
+        interpreter.output.verbosity = DEBUG
     if verbose_mode:
         interpreter.verbose_mode = True
     
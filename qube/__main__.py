@@ -13,6 +13,9 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir.parent))
 
+from qube.output import DEBUG
+from qube.cli import configure_interpreter
+
 def create_parser():
     """명령행 인자 파서 생성"""
     parser = argparse.ArgumentParser(
@@ -38,10 +41,96 @@ def create_parser():
         help='버전 정보 표시'
     )
     
-    parser.add_argument(
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
         '--debug', '-d',
         action='store_true',
-        help='디버그 모드 활성화'
+        help='디버그 모드 활성화 (게이트별/반복별 메시지 출력)'
+    )
+    output_group.add_argument(
+        '--quiet', '-q',
+        action='store_true',
+        help='println/print 출력만 표시 (회로 생성/측정 메시지 생략)'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        choices=['double', 'single'],
+        default='double',
+        help='상태 벡터 정밀도 (single: complex64, 메모리 절반)'
+    )
+    
+    parser.add_argument(
+        '--memmap',
+        action='store_true',
+        help='상태 벡터를 스크래치 파일에 매핑 (20큐빗 초과 회로용)'
+    )
+    
+    parser.add_argument(
+        '--scratch-dir',
+        metavar='DIR',
+        help='--memmap 상태 벡터 파일을 둘 디렉터리'
+    )
+    
+    parser.add_argument(
+        '--memory-budget',
+        metavar='MB',
+        type=int,
+        help='게이트 커널이 한 번에 사용할 메모리 예산 (MB)'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        metavar='N',
+        type=int,
+        help='게이트 커널 스레드 수 (0이면 CPU 코어 수)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        metavar='N',
+        type=int,
+        help='run_many 프로세스 수 (0이면 CPU 코어 수)'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        choices=['auto', 'statevector', 'stabilizer', 'mps', 'sparse'],
+        default='auto',
+        help='시뮬레이션 백엔드 (auto: Clifford 회로는 스태빌라이저 테이블로 측정)'
+    )
+    
+    parser.add_argument(
+        '--max-bond',
+        metavar='N',
+        type=int,
+        help='MPS 백엔드 최대 결합 차원 (기본 64)'
+    )
+    
+    parser.add_argument(
+        '--truncation-threshold',
+        metavar='EPS',
+        type=float,
+        help='MPS 백엔드 특이값 절단 임계값 (기본 1e-10)'
+    )
+    
+    parser.add_argument(
+        '--peephole',
+        action='store_true',
+        help='시뮬레이션 전 핍홀 최적화 (역원 쌍 상쇄, 회전 병합)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='게이트별 호출 수/시간/접근 바이트 기록 (circuit_stats()로 확인)'
+    )
+    
+    parser.add_argument(
+        '--circuit-cache',
+        metavar='MB',
+        type=int,
+        help='회로 인스턴스 최종 상태 캐시 용량 (MB, 0이면 사용 안 함, 기본 256)'
     )
     
     parser.add_argument(
@@ -65,7 +154,8 @@ def print_version():
     print("작성자: Qube 개발팀")
     print("설명: 양자 컴퓨팅을 위한 도메인 특화 언어")
 
-def run_file(filepath: str, debug: bool = False, ast_only: bool = False, tokens_only: bool = False):
+def run_file(filepath: str, debug: bool = False, ast_only: bool = False, tokens_only: bool = False,
+             options=None):
     """Qube 파일 실행"""
     try:
         from qube.interpreter import QubeInterpreter
@@ -81,7 +171,9 @@ def run_file(filepath: str, debug: bool = False, ast_only: bool = False, tokens_
         with open(filepath, 'r', encoding='utf-8') as f:
             code = f.read()
         
-        print(f"🚀 실행: {filepath}")
+        quiet = options is not None and options.quiet
+        if not quiet:
+            print(f"🚀 실행: {filepath}")
         if debug:
             print(f"📄 코드 ({len(code)} 문자):")
             print("-" * 40)
@@ -111,8 +203,10 @@ def run_file(filepath: str, debug: bool = False, ast_only: bool = False, tokens_
         
         # 정상 실행
         interpreter = QubeInterpreter()
+        if options is not None:
+            configure_interpreter(interpreter, options)
         if debug:
-            interpreter.debug = True
+            interpreter.output.verbosity = DEBUG
         
         interpreter.run(code)
         
@@ -156,7 +250,7 @@ def print_ast(node, indent=0):
                     else:
                         print(f"{indent_str}  {attr_name}: {attr_value}")
 
-def start_repl(debug: bool = False):
+def start_repl(debug: bool = False, options=None):
     """대화형 REPL 시작"""
     try:
         from qube.interpreter import QubeInterpreter
@@ -166,8 +260,10 @@ def start_repl(debug: bool = False):
         print("-" * 40)
         
         interpreter = QubeInterpreter()
+        if options is not None:
+            configure_interpreter(interpreter, options)
         if debug:
-            interpreter.debug = True
+            interpreter.output.verbosity = DEBUG
         
         while True:
             try:
@@ -223,6 +319,11 @@ def start_repl(debug: bool = False):
 
 def main():
     """메인 함수"""
+    # 벤치마크 서브커맨드 (qube bench ...)
+    if len(sys.argv) >= 2 and sys.argv[1] == 'bench':
+        from .bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+
     parser = create_parser()
     args = parser.parse_args()
     
@@ -233,7 +334,7 @@ def main():
     
     # REPL 모드
     if args.repl or not args.file:
-        start_repl(args.debug)
+        start_repl(args.debug, args)
         return
     
     # 파일 실행
@@ -241,7 +342,8 @@ def main():
         args.file, 
         debug=args.debug,
         ast_only=args.ast,
-        tokens_only=args.tokens
+        tokens_only=args.tokens,
+        options=args
     )
     
     if not success:
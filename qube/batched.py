@@ -0,0 +1,112 @@
+"""
+batched.py - 파라미터 스윕용 배치 상태 벡터 시뮬레이터
+
+K개의 상태 벡터를 (K, 2^n) 배열 하나로 들고 QuantumCircuit.gates와 같은 게이트 리스트를
+한 번에 적용한다. RX/RY/RZ 각도에 길이 K 배열을 주면 행마다 다른 각도가 적용되므로
+각도 256개 스윕도 256번 재시뮬레이션하는 대신 게이트당 한 번의 벡터화 연산으로 끝난다.
+
+angles = np.linspace(0, 2 * np.pi, 256)
+circuit = QuantumCircuit(2, lazy=True)       # 지연 모드: 게이트만 기록
+circuit.h(0).ry(angles, 1).cnot(0, 1)
+states = BatchedSimulator(2).run(circuit.gates)          # (256, 4)
+probabilities = BatchedSimulator(2).probabilities(circuit.gates)
+"""
+
+import numpy as np
+from typing import List
+
+from .quantum import QuantumGate, PRECISIONS, GATE_MATRICES, rotation_matrix
+from .kernels import (apply_single_qubit_gate, apply_batched_single_qubit_gate, apply_controlled_x,
+                      apply_controlled_phase, apply_multi_qubit_gate)
+
+
+def rotation_matrices(axis: str, angles: np.ndarray) -> np.ndarray:
+    """각도 배열에 대한 RX/RY/RZ 행렬들 (K, 2, 2)"""
+    half = np.asarray(angles, dtype=float) / 2
+    cos, sin = np.cos(half), np.sin(half)
+    matrices = np.zeros((half.size, 2, 2), dtype=complex)
+    axis = axis.upper()
+    if axis == 'X':
+        matrices[:, 0, 0] = matrices[:, 1, 1] = cos
+        matrices[:, 0, 1] = matrices[:, 1, 0] = -1j * sin
+    elif axis == 'Y':
+        matrices[:, 0, 0] = matrices[:, 1, 1] = cos
+        matrices[:, 0, 1] = -sin
+        matrices[:, 1, 0] = sin
+    elif axis == 'Z':
+        matrices[:, 0, 0] = np.exp(-1j * half)
+        matrices[:, 1, 1] = np.exp(1j * half)
+    else:
+        raise ValueError(f"Unknown rotation axis: {axis}")
+    return matrices
+
+
+class BatchedSimulator:
+    """(K, 2^n) 배치 상태 벡터 시뮬레이터"""
+    def __init__(self, n_qubits: int, precision: str = "double"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision} (choose from {', '.join(PRECISIONS)})")
+        self.n_qubits = n_qubits
+        self.dtype = np.dtype(PRECISIONS[precision])
+
+    @staticmethod
+    def batch_size(gates: List[QuantumGate], default: int = 1) -> int:
+        """게이트 파라미터 배열들의 공통 길이 K (배열 파라미터가 없으면 default)"""
+        sizes = {np.size(p) for gate in gates for p in gate.parameters if np.ndim(p) > 0}
+        if len(sizes) > 1:
+            raise ValueError(f"Parameter arrays must have the same length, got {sorted(sizes)}")
+        return sizes.pop() if sizes else default
+
+    def initial_states(self, batch_size: int) -> np.ndarray:
+        """K개의 |0...0⟩ 상태"""
+        states = np.zeros((batch_size, 2**self.n_qubits), dtype=self.dtype)
+        states[:, 0] = 1.0
+        return states
+
+    def run(self, gates: List[QuantumGate], batch_size: int = None, states: np.ndarray = None) -> np.ndarray:
+        """게이트 리스트를 배치 전체에 적용한 (K, 2^n) 상태 반환
+
+        states를 주면 그 배열을 제자리에서 갱신하고, 없으면 |0...0⟩ K개에서 시작한다.
+        """
+        if states is None:
+            states = self.initial_states(self.batch_size(gates, batch_size or 1))
+        if states.shape[1] != 2**self.n_qubits:
+            raise ValueError(f"States must have {2**self.n_qubits} amplitudes, got {states.shape[1]}")
+
+        for gate in gates:
+            self._apply_gate(gate, states)
+        return states
+
+    def probabilities(self, gates: List[QuantumGate], batch_size: int = None) -> np.ndarray:
+        """배치별 기저 상태 확률 (K, 2^n)"""
+        states = self.run(gates, batch_size)
+        return states.real**2 + states.imag**2
+
+    def _apply_gate(self, gate: QuantumGate, states: np.ndarray):
+        """게이트 하나를 배치 전체에 적용 (QuantumCircuit._apply_gate와 같은 분기)"""
+        if gate.matrix is not None:
+            apply_multi_qubit_gate(states, gate.matrix.astype(self.dtype, copy=False), gate.target_qubits)
+
+        elif gate.name in GATE_MATRICES and not gate.control_qubits:
+            matrix = GATE_MATRICES[gate.name].astype(self.dtype, copy=False)
+            apply_single_qubit_gate(states, matrix, gate.target_qubits[0])
+
+        elif gate.name in ["RX", "RY", "RZ"]:
+            angle = gate.parameters[0]
+            if np.ndim(angle) == 0:
+                matrix = rotation_matrix(gate.name[1], angle).astype(self.dtype, copy=False)
+                apply_single_qubit_gate(states, matrix, gate.target_qubits[0])
+            else:
+                if np.size(angle) != states.shape[0]:
+                    raise ValueError(f"{gate.name} has {np.size(angle)} angles for a batch of {states.shape[0]}")
+                matrices = rotation_matrices(gate.name[1], angle).astype(self.dtype)
+                apply_batched_single_qubit_gate(states, matrices, gate.target_qubits[0])
+
+        elif gate.name == "CNOT" or (gate.name.endswith("X") and gate.control_qubits):
+            apply_controlled_x(states, gate.control_qubits, gate.target_qubits[0])
+
+        elif gate.name.lstrip("C") == "Z":
+            apply_controlled_phase(states, list(gate.control_qubits) + list(gate.target_qubits), -1)
+
+        else:
+            raise ValueError(f"Unsupported gate for batched simulation: {gate.name}")
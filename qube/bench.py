@@ -0,0 +1,287 @@
+"""
+bench.py - 시뮬레이터 벤치마크 (qube bench)
+
+고정된 워크로드(GHZ, QFT, 무작위 층 회로, N큐빗 Grover)를 큐빗 수 범위에 걸쳐 상태 벡터로
+시뮬레이션하고 게이트당 시간, 초당 진폭 갱신 수, 최대 메모리를 잰다. 결과는 JSON으로 저장하고,
+--compare로 이전 결과와 비교하면 임계값보다 느려지거나 메모리를 더 쓴 항목을 회귀로 표시한다.
+--fusion-check는 워크로드마다 게이트 퓨전을 끈 실행과 켠 실행의 상태 벡터 순회 수와 시간을 비교한다.
+
+qube bench --min-qubits 10 --max-qubits 18 --output bench.json
+qube bench --compare bench.json --threshold 0.2       # 회귀가 있으면 종료 코드 1
+qube bench --fusion-check --max-qubits 20             # 퓨전이 순회나 시간을 늘리면 종료 코드 1
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .quantum import QuantumCircuit, PRECISIONS
+
+
+# JSON 결과 형식 버전 (필드가 바뀌면 올림)
+BENCH_FORMAT_VERSION = 1
+
+# 회귀로 볼 상대 증가량 (0.2 = 기준보다 20% 넘게 느리거나 메모리를 더 씀)
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+# Grover 반복 횟수 (최적 반복 π√N/4는 큐빗 수에 따라 기하급수로 늘어나므로 고정)
+GROVER_ITERATIONS = 3
+
+# 무작위 층 회로 시드 (실행마다 같은 회로)
+RANDOM_CIRCUIT_SEED = 1234
+
+
+def ghz_circuit(n_qubits: int, **options) -> QuantumCircuit:
+    """H 하나와 CNOT 사슬"""
+    circuit = QuantumCircuit(n_qubits, lazy=True, **options).h(0)
+    for q in range(n_qubits - 1):
+        circuit.cnot(q, q + 1)
+    return circuit
+
+
+def _controlled_phase(circuit: QuantumCircuit, angle: float, control: int, target: int):
+    """제어 위상 게이트 (RZ 세 개와 CNOT 두 개로 분해, 전역 위상 차이만 있음)"""
+    circuit.rz(angle / 2, control)
+    circuit.cnot(control, target).rz(-angle / 2, target).cnot(control, target)
+    circuit.rz(angle / 2, target)
+
+
+def qft_circuit(n_qubits: int, **options) -> QuantumCircuit:
+    """양자 푸리에 변환 (마지막 큐빗 순서 뒤집기 SWAP은 생략)"""
+    circuit = QuantumCircuit(n_qubits, lazy=True, **options)
+    for target in reversed(range(n_qubits)):
+        circuit.h(target)
+        for control in reversed(range(target)):
+            _controlled_phase(circuit, np.pi / 2**(target - control), control, target)
+    return circuit
+
+
+def random_layered_circuit(n_qubits: int, **options) -> QuantumCircuit:
+    """n층: 층마다 모든 큐빗에 무작위 축 회전 + 엇갈린 CNOT 벽돌"""
+    rng = np.random.default_rng(RANDOM_CIRCUIT_SEED)
+    circuit = QuantumCircuit(n_qubits, lazy=True, **options)
+    rotations = [circuit.rx, circuit.ry, circuit.rz]
+    for layer in range(n_qubits):
+        for q in range(n_qubits):
+            rotations[rng.integers(3)](float(rng.uniform(0, 2 * np.pi)), q)
+        for q in range(layer % 2, n_qubits - 1, 2):
+            circuit.cnot(q, q + 1)
+    return circuit
+
+
+def grover_circuit(n_qubits: int, **options) -> QuantumCircuit:
+    """algorithms/search/grover/final/의 N큐빗 Grover와 같은 구조 (목표 |...10101⟩, 반복 수 고정)
+
+    오라클: 0인 목표 비트에 X, 전체 제어 Z, X 복원
+    확산: 전체 H, X, 제어 Z, X, H
+    """
+    circuit = QuantumCircuit(n_qubits, lazy=True, **options)
+    qubits = list(range(n_qubits))
+    zero_bits = [q for q in qubits if q % 2 == 1]  # 목표 비트 패턴 ...10101
+    for q in qubits:
+        circuit.h(q)
+    for _ in range(GROVER_ITERATIONS):
+        for q in zero_bits:
+            circuit.x(q)
+        circuit.controlled_z_n(*qubits)
+        for q in zero_bits:
+            circuit.x(q)
+        for q in qubits:
+            circuit.h(q).x(q)
+        circuit.controlled_z_n(*qubits)
+        for q in qubits:
+            circuit.x(q).h(q)
+    return circuit
+
+
+WORKLOADS: Dict[str, Callable[..., QuantumCircuit]] = {
+    "ghz": ghz_circuit,
+    "qft": qft_circuit,
+    "random": random_layered_circuit,
+    "grover": grover_circuit,
+}
+
+
+def run_workload(name: str, n_qubits: int, repeat: int = 3, **options) -> Dict:
+    """워크로드 하나를 repeat번 시뮬레이션해 가장 빠른 시간과 최대 메모리 측정
+
+    시간은 tracemalloc 없이 재고, 최대 메모리는 별도 한 번의 실행에서 tracemalloc으로 잰다.
+    """
+    build = WORKLOADS[name]
+    circuit = build(n_qubits, **options)
+    gate_count = len(circuit.gates)
+    sweeps = len(circuit._optimized_gates())  # 최적화 패스 후 게이트 수 = 상태 벡터 순회 수
+
+    best = float("inf")
+    for _ in range(repeat):
+        circuit = build(n_qubits, **options)
+        start = time.perf_counter()
+        circuit.circuit_state  # 지연 모드 회로는 여기서 전체 시뮬레이션
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        build(n_qubits, **options).circuit_state
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "workload": name,
+        "n_qubits": n_qubits,
+        "gates": gate_count,
+        "sweeps": sweeps,
+        "seconds": best,
+        "time_per_gate": best / gate_count,
+        "amplitudes_per_second": gate_count * 2**n_qubits / best,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_suite(workloads: List[str], qubit_counts: List[int], repeat: int = 3, progress=None, **options) -> Dict:
+    """워크로드 x 큐빗 수 전체 실행 결과 (JSON으로 저장할 형태)"""
+    results = []
+    for name in workloads:
+        for n_qubits in qubit_counts:
+            result = run_workload(name, n_qubits, repeat, **options)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {
+        "format_version": BENCH_FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "settings": {"repeat": repeat, "workloads": workloads, "qubits": qubit_counts, **options},
+        "results": results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict]:
+    """(워크로드, 큐빗 수)가 같은 항목끼리 비교해 시간/메모리가 threshold보다 많이 늘어난 항목"""
+    baseline_results = {(r["workload"], r["n_qubits"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        reference = baseline_results.get((result["workload"], result["n_qubits"]))
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_memory_bytes"):
+            if reference[metric] > 0:
+                change = result[metric] / reference[metric] - 1.0
+                if change > threshold:
+                    regressions.append({"workload": result["workload"], "n_qubits": result["n_qubits"],
+                                        "metric": metric, "baseline": reference[metric],
+                                        "current": result[metric], "change": change})
+    return regressions
+
+
+def fusion_check(workloads: List[str], n_qubits: int, repeat: int = 3, max_fused_width: int = 2,
+                 **options) -> List[Dict]:
+    """워크로드마다 퓨전을 끈 실행(폭 0)과 켠 실행의 상태 벡터 순회 수와 시간 비교"""
+    rows = []
+    for name in workloads:
+        unfused = run_workload(name, n_qubits, repeat, max_fused_width=0, **options)
+        fused = run_workload(name, n_qubits, repeat, max_fused_width=max_fused_width, **options)
+        rows.append({"workload": name, "n_qubits": n_qubits,
+                     "sweeps_unfused": unfused["sweeps"], "sweeps_fused": fused["sweeps"],
+                     "seconds_unfused": unfused["seconds"], "seconds_fused": fused["seconds"],
+                     "speedup": unfused["seconds"] / fused["seconds"]})
+    return rows
+
+
+def fusion_regressions(rows: List[Dict], threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict]:
+    """퓨전이 순회 수를 늘렸거나, 게이트를 합쳤는데 threshold보다 많이 느려진 항목
+
+    순회 수가 같으면 합쳐진 블록이 없어 두 실행의 게이트 리스트가 같으므로 시간 차이는 잡음으로 본다.
+    """
+    return [row for row in rows
+            if row["sweeps_fused"] > row["sweeps_unfused"]
+            or (row["sweeps_fused"] < row["sweeps_unfused"] and row["speedup"] < 1 / (1 + threshold))]
+
+
+def _format_result(result: Dict) -> str:
+    return (f"  {result['workload']:<8} {result['n_qubits']:>3}큐빗  게이트 {result['gates']:>6}개  "
+            f"순회 {result['sweeps']:>6}회  "
+            f"{result['seconds'] * 1e3:>10.2f} ms  {result['time_per_gate'] * 1e6:>9.2f} µs/게이트  "
+            f"{result['amplitudes_per_second'] / 1e6:>9.1f} M진폭/s  {result['peak_memory_bytes'] / 2**20:>8.1f} MB")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='qube bench', description='상태 벡터 시뮬레이터 벤치마크')
+    parser.add_argument('--workloads', nargs='+', choices=sorted(WORKLOADS), default=list(WORKLOADS),
+                        help='실행할 워크로드 (기본: 전체)')
+    parser.add_argument('--min-qubits', type=int, default=10, help='최소 큐빗 수 (기본 10)')
+    parser.add_argument('--max-qubits', type=int, default=18, help='최대 큐빗 수 (기본 18)')
+    parser.add_argument('--step', type=int, default=4, help='큐빗 수 간격 (기본 4)')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수, 가장 빠른 시간 사용 (기본 3)')
+    parser.add_argument('--precision', choices=list(PRECISIONS), default='double', help='상태 벡터 정밀도')
+    parser.add_argument('--fusion-width', type=int, default=2, help='게이트 퓨전 최대 큐빗 수 (0이면 끔)')
+    parser.add_argument('--fusion-check', action='store_true',
+                        help='--max-qubits에서 퓨전 끔/켬의 순회 수와 시간 비교 (퓨전이 손해면 종료 코드 1)')
+    parser.add_argument('--output', '-o', metavar='FILE', help='결과 JSON 파일')
+    parser.add_argument('--compare', metavar='BASELINE', help='기준 결과 JSON과 비교 (회귀가 있으면 종료 코드 1)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help=f'회귀 판정 상대 증가량 (기본 {DEFAULT_REGRESSION_THRESHOLD})')
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """qube bench 진입점 (종료 코드 반환)"""
+    args = create_parser().parse_args(argv)
+    if args.min_qubits < 2 or args.max_qubits < args.min_qubits or args.step < 1:
+        print("오류: 큐빗 범위가 잘못되었습니다 (2 <= --min-qubits <= --max-qubits, --step >= 1)")
+        return 2
+    qubit_counts = list(range(args.min_qubits, args.max_qubits + 1, args.step))
+
+    if args.fusion_check:
+        print(f"🏁 퓨전 비교: {', '.join(args.workloads)} / {args.max_qubits}큐빗 / 폭 {args.fusion_width}")
+        rows = fusion_check(args.workloads, args.max_qubits, args.repeat, args.fusion_width,
+                            precision=args.precision)
+        for row in rows:
+            print(f"  {row['workload']:<8} 순회 {row['sweeps_unfused']:>6} → {row['sweeps_fused']:>6}회  "
+                  f"{row['seconds_unfused'] * 1e3:>10.2f} → {row['seconds_fused'] * 1e3:>10.2f} ms  "
+                  f"(x{row['speedup']:.2f})")
+        regressions = fusion_regressions(rows, args.threshold)
+        if regressions:
+            print(f"❌ 퓨전이 손해인 워크로드 {len(regressions)}개: {', '.join(r['workload'] for r in regressions)}")
+            return 1
+        print("✅ 퓨전이 순회 수와 시간을 늘린 워크로드 없음")
+        return 0
+
+    print(f"🏁 Qube 벤치마크: {', '.join(args.workloads)} / {qubit_counts}큐빗 / 반복 {args.repeat}회")
+    report = run_suite(args.workloads, qubit_counts, args.repeat,
+                       progress=lambda result: print(_format_result(result), flush=True),
+                       precision=args.precision, max_fused_width=args.fusion_width)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📄 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ 회귀 {len(regressions)}건 (임계값 {args.threshold:+.0%}):")
+            for r in regressions:
+                print(f"  {r['workload']:<8} {r['n_qubits']:>3}큐빗  {r['metric']}: "
+                      f"{r['baseline']:.6g} → {r['current']:.6g} ({r['change']:+.1%})")
+            return 1
+        print(f"✅ 회귀 없음 (기준: {args.compare}, 임계값 {args.threshold:+.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+cache.py - 회로 인스턴스 최종 상태 캐시
+
+같은 회로 정의를 같은 인자로 인스턴스화하면 같은 게이트 열이 기록되고 최종 상태도 같다.
+게이트 열(큐빗 수, 정밀도 포함)의 정규화된 해시를 키로 처음 시뮬레이션한 상태 벡터를 저장해 두고,
+다음 인스턴스는 다시 시뮬레이션하는 대신 그 배열을 읽기 전용으로 공유한다 (바꾸기 전에 복사).
+전체 바이트 수가 max_bytes를 넘으면 가장 오래 쓰지 않은 항목부터 버린다.
+
+cache = StateCache(max_bytes=256 * 2**20)
+key = circuit_key(circuit)          # 기호/배열 매개변수 게이트가 있으면 None
+if key is not None:
+    circuit.use_state_cache(cache, key)
+"""
+
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+
+
+# 기본 캐시 용량 (저장된 상태 벡터 바이트 합)
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+
+def _gate_key(gate) -> Optional[tuple]:
+    """게이트 하나의 정규화된 표현 (캐시할 수 없는 매개변수가 있으면 None)"""
+    if gate.is_parametric or any(np.ndim(p) != 0 for p in gate.parameters):
+        return None
+    matrix = None if gate.matrix is None else hashlib.sha256(np.ascontiguousarray(gate.matrix).tobytes()).hexdigest()
+    return (gate.name, tuple(int(q) for q in gate.target_qubits), tuple(int(q) for q in gate.control_qubits),
+            tuple(float(p) for p in gate.parameters), matrix)
+
+
+def circuit_key(circuit) -> Optional[str]:
+    """회로에 기록된 게이트 열의 해시 (같은 정의 + 같은 인자 → 같은 키)"""
+    gate_keys = []
+    for gate in circuit.gates:
+        key = _gate_key(gate)
+        if key is None:
+            return None
+        gate_keys.append(key)
+    return hashlib.sha256(repr((circuit.n_qubits, circuit.dtype.str, gate_keys)).encode()).hexdigest()
+
+
+class StateCache:
+    """상태 벡터 LRU 캐시 (저장된 배열은 읽기 전용으로 공유)"""
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """저장된 상태 벡터 (없으면 None)"""
+        state_vector = self._entries.get(key)
+        if state_vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return state_vector
+
+    def put(self, key: str, state_vector: np.ndarray) -> bool:
+        """상태 벡터 저장 (배열은 읽기 전용이 됨). 용량보다 크면 저장하지 않고 False"""
+        if state_vector.nbytes > self.max_bytes:
+            return False
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        state_vector.setflags(write=False)
+        self._entries[key] = state_vector
+        self.nbytes += state_vector.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
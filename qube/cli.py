@@ -0,0 +1,34 @@
+"""
+cli.py - 명령행 옵션 공용 처리
+
+python -m qube (qube/__main__.py)와 qube.py 실행기가 같은 시뮬레이션 옵션을 받는다.
+파싱한 옵션을 인터프리터 설정에 옮기는 코드는 여기 한 곳에만 둔다.
+"""
+
+from qube.output import QUIET
+
+
+def configure_interpreter(interpreter, args):
+    """명령행 옵션을 인터프리터 시뮬레이션 설정에 반영"""
+    interpreter.precision = args.precision
+    interpreter.storage = "memmap" if args.memmap else "memory"
+    interpreter.scratch_dir = args.scratch_dir
+    if args.memory_budget is not None:
+        interpreter.memory_budget = args.memory_budget * 2**20
+    if args.threads is not None:
+        from qube.kernels import set_num_threads
+        set_num_threads(args.threads or None)
+    if args.workers is not None:
+        interpreter.workers = args.workers
+    interpreter.backend = args.backend
+    if args.max_bond is not None:
+        interpreter.max_bond_dimension = args.max_bond
+    if args.truncation_threshold is not None:
+        interpreter.truncation_threshold = args.truncation_threshold
+    interpreter.peephole = args.peephole
+    interpreter.profile = args.profile
+    if args.quiet:
+        interpreter.output.verbosity = QUIET
+    if args.circuit_cache is not None:
+        from qube.cache import StateCache
+        interpreter.circuit_cache = StateCache(args.circuit_cache * 2**20) if args.circuit_cache else None
@@ -84,6 +84,10 @@ result = measure(circuit, [0, 2, 4]);
 result = measure(circuit, [2]);
 // 반환: [bit2]
 
+# 4. 샷 기반 샘플링 (상태 붕괴 없음)
+counts = measure(circuit, [0, 1, 2], 1000);
+// 반환: {5: 498, 0: 502} 같은 히스토그램 (키: 비트0 + 비트1*2 + 비트2*4)
+
 === ⚠️ 주의사항 ===
 • 큐빗 인덱스는 0부터 시작
 • 측정 후 상태가 붕괴됨
@@ -21,8 +21,11 @@ from .parser import (QubeParser, ASTNode, Program, FunctionDef, VarDecl, Assignm
                      # 🆕 범위 문법 관련 AST 노드들
                      AllQubitsReference, RangeExpression)
 
-from .quantum import QuantumSimulator, QuantumState, QuantumCircuit
+from .quantum import QuantumSimulator, QuantumState, QuantumCircuit, BACKENDS
+from .cache import StateCache, circuit_key
 from .stdlib import get_stdlib_function
+from .output import OutputSink, USER, INFO, DEBUG
+from .tracing import Tracer, TraceRecord, format_record
 
 class QubeValue:
     """Wrapper for all Qube values with type information"""
@@ -135,6 +138,18 @@ class QubeInterpreter:
         self.classes: Dict[str, QubeClass] = {}
         self.circuits: Dict[str, CircuitDefinition] = {}  # 🆕 회로 정의 저장소
         self.quantum_sim = QuantumSimulator()
+        self.precision = "double"  # 새 회로의 상태 벡터 정밀도 ("double" | "single")
+        self.storage = "memory"  # 새 회로의 상태 벡터 저장 방식 ("memory" | "memmap")
+        self.scratch_dir = None  # memmap 스크래치 디렉터리 (None이면 시스템 임시 디렉터리)
+        self.memory_budget = None  # 게이트 커널 청크 메모리 예산 (바이트)
+        self.workers = 1  # run_many 프로세스 풀 크기 (0이면 CPU 코어 수)
+        self.backend = "auto"  # 새 회로의 시뮬레이션 백엔드 ("auto" | "statevector" | "stabilizer" | "mps" | "sparse")
+        self.max_bond_dimension = 64  # MPS 백엔드 결합 차원 상한
+        self.truncation_threshold = 1e-10  # MPS 백엔드 특이값 절단 임계값
+        self.peephole = False  # 새 회로에서 시뮬레이션 전 핍홀 최적화 실행
+        self.profile = False  # 새 회로에서 게이트별 시간/접근 바이트 기록 (circuit_stats)
+        self.circuit_cache = StateCache()  # 회로 인스턴스 최종 상태 캐시 (None이면 사용 안 함)
+        self.output = OutputSink()  # 모든 출력이 거치는 sink (verbosity: QUIET이면 println/print만)
         self.loop_stack = []  
         self.call_stack = []  
         self.scope_stack = []  
@@ -172,6 +187,11 @@ class QubeInterpreter:
             "Circuit": self._builtin_circuit_constructor,
             "draw_circuit": self._builtin_draw_circuit,
             "run_circuit": self._builtin_run_circuit,
+            "run_many": self._builtin_run_many,
+            "compile_circuit": self._builtin_compile_circuit,
+            "bind_circuit": self._builtin_bind_circuit,
+            "circuit_stats": self._builtin_circuit_stats,
+            "expectation": self._builtin_expectation,
             
             # Utility functions
             "sqrt": lambda x: QubeValue(np.sqrt(x.value), "float"),
@@ -192,6 +212,7 @@ class QubeInterpreter:
             # 양자 특화 함수들
             "fidelity": self._builtin_fidelity,
             "entanglement": self._builtin_entanglement,
+            "purity": self._builtin_purity,
             "trace": self._builtin_trace,
             "clone_state": self._builtin_clone_state,
             
@@ -238,6 +259,8 @@ class QubeInterpreter:
         except Exception as e:
             # print(f"Qube Error: {e}")
             raise
+        finally:
+            self.output.flush()
     
     def _execute_program(self, program: Program):
         """Execute the main program"""
@@ -247,7 +270,7 @@ class QubeInterpreter:
                 self.functions[statement.name] = statement
             elif isinstance(statement, CircuitDefinition):
                 self.circuits[statement.name] = statement
-                print(f"회로 정의 등록: {statement.name}")  # 디버그용
+                self.output.line(f"회로 정의 등록: {statement.name}")
         
         # Second pass: execute statements
         for statement in program.statements:
@@ -442,7 +465,7 @@ class QubeInterpreter:
     def _execute_function_call_in_circuit(self, node: FunctionCall):
         """🆕 회로 내부에서 함수 호출 실행"""
         
-        print(f"🔧 회로 내부에서 함수 호출: {node.name}()")
+        self.output.line(lambda: f"🔧 회로 내부에서 함수 호출: {node.name}()", DEBUG)
         
         # 내장 함수 확인
         if node.name in self.builtin_functions:
@@ -454,8 +477,10 @@ class QubeInterpreter:
                     result = self.builtin_functions[node.name](arg_values[0])
                 elif len(arg_values) == 2:
                     result = self.builtin_functions[node.name](arg_values[0], arg_values[1].value)
+                elif len(arg_values) == 3:
+                    result = self.builtin_functions[node.name](arg_values[0], arg_values[1].value, arg_values[2].value)
                 else:
-                    raise QubeRuntimeError(f"measure() takes 1 or 2 arguments, got {len(arg_values)}")
+                    raise QubeRuntimeError(f"measure() takes 1 to 3 arguments, got {len(arg_values)}")
             else:
                 result = self.builtin_functions[node.name](*arg_values)
             
@@ -486,7 +511,7 @@ class QubeInterpreter:
                 # 변수 상태 복원
                 self.variables = old_vars
             
-            print(f"✅ 함수 {node.name}() 실행 완료")
+            self.output.line(lambda: f"✅ 함수 {node.name}() 실행 완료", DEBUG)
             return result if result is not None else QubeValue(None, "null")
         
         else:
@@ -495,15 +520,17 @@ class QubeInterpreter:
     def _execute_for_loop_in_circuit(self, node: ForLoop):
         """🆕 회로 내부에서 for 반복문 실행"""
         
-        print(f"🔄 회로 내부에서 반복문 시작: {node.variable}")
+        self.output.line(lambda: f"🔄 회로 내부에서 반복문 시작: {node.variable}", DEBUG)
         
         # iterable 평가
         iterable = self._evaluate_expression(node.iterable)
         
-        print(f"🔄 반복 대상: {iterable.value}")
+        self.output.line(lambda: f"🔄 반복 대상: {iterable.value}", DEBUG)
+        trace_iterations = self.output.enabled(DEBUG)
         
         for item in iterable.value:
-            print(f"  🔄 반복 {node.variable} = {item}")
+            if trace_iterations:
+                self.output.line(f"  🔄 반복 {node.variable} = {item}", DEBUG)
             
             # 반복 변수 설정
             old_value = self.variables.get(node.variable)
@@ -523,7 +550,7 @@ class QubeInterpreter:
                 elif node.variable in self.variables:
                     del self.variables[node.variable]
         
-        print(f"🔄 반복문 완료")
+        self.output.line("🔄 반복문 완료", DEBUG)
         return None
 
     def _execute_for_loop_standard(self, node: ForLoop):
@@ -606,13 +633,13 @@ class QubeInterpreter:
     def _execute_reset_statement(self, node: ResetStatement):
         """reset 문 실행"""
         # 간단 구현: 큐빗을 |0⟩ 상태로 리셋
-        print("Reset operation (simulation)")
+        self.output.line("Reset operation (simulation)")
         return None
 
     def _execute_barrier_statement(self, node: BarrierStatement):
         """barrier 문 실행"""
         # 간단 구현: 로그만 출력
-        print("Barrier operation (simulation)")
+        self.output.line("Barrier operation (simulation)")
         return None
 
     def _execute_measure_statement(self, node: MeasureStatement):
@@ -697,12 +724,26 @@ class QubeInterpreter:
             return index_val.value
 
     # 🆕 회로 관련 내장 함수들
-    def _builtin_circuit_constructor(self, n_qubits: QubeValue) -> QubeValue:
-        """Circuit(n) - 새로운 양자 회로 생성"""
+    def _builtin_circuit_constructor(self, n_qubits: QubeValue, *options: QubeValue) -> QubeValue:
+        """Circuit(n) / Circuit(n, "single") / Circuit(n, "sparse") - 새로운 양자 회로 생성
+
+        추가 인자는 정밀도("double" | "single") 또는 백엔드 이름이며 순서는 상관없다.
+        """
         if n_qubits.type_name != "int":
             raise QubeTypeError("Circuit constructor requires integer argument")
         
-        circuit = QuantumCircuit(n_qubits.value)
+        precision_name = self.precision
+        storage_options = self._circuit_storage_options()
+        for option in options:
+            if option.type_name == "string" and option.value in ("double", "single"):
+                precision_name = option.value
+            elif option.type_name == "string" and option.value in BACKENDS:
+                storage_options["backend"] = option.value
+            else:
+                raise QubeTypeError(f'Circuit option must be "double", "single" or a backend ({", ".join(BACKENDS)})')
+        
+        # 지연 모드: 그리기/게이트 수 확인만 하는 회로는 상태 벡터를 할당하지 않음
+        circuit = QuantumCircuit(n_qubits.value, lazy=True, precision=precision_name, **storage_options)
         return QubeValue(circuit, "quantum_circuit")
 
     def _builtin_draw_circuit(self, circuit: QubeValue) -> QubeValue:
@@ -711,17 +752,125 @@ class QubeInterpreter:
             raise QubeTypeError("draw_circuit requires a quantum circuit")
         
         drawing = circuit.value.draw()
-        print(drawing)
+        self.output.write(drawing + "\n")
         return QubeValue(drawing, "string")
 
-    def _builtin_run_circuit(self, circuit: QubeValue) -> QubeValue:
-        """회로 실행"""
+    def _builtin_run_circuit(self, circuit: QubeValue, shots: QubeValue = None) -> QubeValue:
+        """회로 실행 - run_circuit(c, 1000)이면 counts 히스토그램 포함"""
         if circuit.type_name != "quantum_circuit":
             raise QubeTypeError("run_circuit requires a quantum circuit")
         
-        result = circuit.value.run(self.quantum_sim)
+        if shots is not None and (shots.type_name != "int" or shots.value < 1):
+            raise QubeTypeError("run_circuit shots must be a positive integer")
+        
+        result = circuit.value.run(self.quantum_sim, shots=shots.value if shots is not None else None)
         return QubeValue(result, "dict")
 
+    def _builtin_circuit_stats(self, circuit: QubeValue) -> QubeValue:
+        """circuit_stats(c) - 게이트 종류별 호출 수/시간/접근 바이트 표 출력 및 반환
+
+        시간과 바이트는 --profile로 실행했을 때만 기록된다.
+        """
+        if circuit.type_name != "quantum_circuit":
+            raise QubeTypeError("circuit_stats requires a quantum circuit")
+        
+        stats = circuit.value.stats()
+        self.output.line(f"회로 통계: {stats['n_qubits']}큐빗, 게이트 {stats['gate_count']}개, 깊이 {stats['depth']}, "
+                         f"백엔드 {stats['backend']}, 상태 벡터 {stats['state_vector_bytes'] / 2**20:.1f} MB", USER)
+        if not stats["profiled"]:
+            self.output.line("  (게이트별 시간은 --profile로 실행할 때 기록됩니다)", USER)
+        for name, entry in stats["gates"].items():
+            self.output.line(f"  {name:<8} {entry['count']:>6}회  {entry['time'] * 1e3:>9.3f} ms  "
+                             f"{entry['bytes'] / 2**20:>10.1f} MB", USER)
+        return QubeValue(stats, "dict")
+
+    def _builtin_expectation(self, circuit: QubeValue, paulis: QubeValue, coefficients: QubeValue = None) -> QubeValue:
+        """expectation(c, "ZZI") / expectation(c, ["ZZI", "IXX"], [1.0, -0.5]) - 파울리 문자열 (가중합) 기댓값
+
+        상태를 붕괴시키지 않는다. 문자열의 k번째 문자가 큐빗 k에 작용한다.
+        """
+        if circuit.type_name != "quantum_circuit":
+            raise QubeTypeError("expectation requires a quantum circuit")
+        
+        if paulis.type_name == "string":
+            pauli_terms = paulis.value
+            if coefficients is not None:
+                pauli_terms = [(coefficients.value, paulis.value)]
+        elif paulis.type_name == "array":
+            weights = [1.0] * len(paulis.value) if coefficients is None else coefficients.value
+            if len(weights) != len(paulis.value):
+                raise QubeTypeError("expectation needs one coefficient per Pauli string")
+            pauli_terms = list(zip(weights, paulis.value))
+        elif paulis.type_name == "dict":
+            pauli_terms = paulis.value
+        else:
+            raise QubeTypeError("expectation requires a Pauli string, an array of strings or a dict")
+        
+        try:
+            return QubeValue(circuit.value.expectation(pauli_terms), "float")
+        except ValueError as e:
+            raise QubeRuntimeError(str(e))
+
+    def _builtin_run_many(self, target: QubeValue, count: QubeValue, qubit_indices: QubeValue = None) -> QubeValue:
+        """run_many("Name", trials) / run_many(c, shots) - 프로세스 풀 병렬 실행
+
+        회로 정의 이름을 주면 trials번 독립적으로 인스턴스화해 측정한 히스토그램,
+        회로 값을 주면 현재 상태에서 shots번 샘플링한 히스토그램을 반환한다.
+        """
+        from .parallel import run_circuit_trials, sample_shot_batches
+        
+        if count.type_name != "int" or count.value < 1:
+            raise QubeTypeError("run_many count must be a positive integer")
+        
+        qubits = None
+        if qubit_indices is not None:
+            if not isinstance(qubit_indices.value, list):
+                raise QubeTypeError("Qubit indices must be provided as a list")
+            qubits = qubit_indices.value
+        
+        if target.type_name == "string":
+            if target.value not in self.circuits:
+                raise QubeCircuitError(f"회로 '{target.value}'을 찾을 수 없습니다")
+            counts = run_circuit_trials(self, target.value, count.value, self.workers, qubits)
+        elif target.type_name == "quantum_circuit":
+            counts = sample_shot_batches(target.value, count.value, self.workers, qubits)
+        else:
+            raise QubeTypeError("run_many requires a circuit name or a quantum circuit")
+        
+        return QubeValue(counts, "dict")
+
+    def _builtin_compile_circuit(self, target: QubeValue) -> QubeValue:
+        """compile_circuit(Ansatz) - 매개변수 회로 정의를 한 번만 해석해 컴파일
+
+        각도 매개변수는 기호로 남겨 두므로 bind_circuit으로 값만 바꿔 여러 번 실행할 수 있다.
+        """
+        if target.type_name == "circuit_definition":
+            circuit_name = target.value.name
+        elif target.type_name == "string":
+            circuit_name = target.value
+        else:
+            raise QubeTypeError("compile_circuit requires a circuit definition or name")
+        
+        circuit = self._create_circuit_instance(circuit_name, symbolic=True).value
+        try:
+            compiled = circuit.compile()
+        except ValueError as e:
+            raise QubeCircuitError(f"회로 '{circuit_name}' 컴파일 실패: {e}")
+        return QubeValue(compiled, "compiled_circuit")
+
+    def _builtin_bind_circuit(self, compiled: QubeValue, values: QubeValue) -> QubeValue:
+        """bind_circuit(compiled, [0.1, 0.2]) - 매개변수 값을 대입한 회로 생성 (정의 순서의 값 리스트)"""
+        if compiled.type_name != "compiled_circuit":
+            raise QubeTypeError("bind_circuit requires a compiled circuit")
+        if not isinstance(values.value, (list, dict)):
+            raise QubeTypeError("Parameter values must be provided as a list")
+        
+        try:
+            circuit = compiled.value.bind(values.value)
+        except ValueError as e:
+            raise QubeCircuitError(str(e))
+        return QubeValue(circuit, "quantum_circuit")
+
     # 기존 메서드들은 그대로 유지...
     def _execute_match(self, node: MatchStatement) -> Any:
         expr_value = self._evaluate_expression(node.expr)
@@ -808,7 +957,7 @@ class QubeInterpreter:
             for pattern, body in node.branches:
                 pattern_value = self._evaluate_expression(pattern)
                 
-                print(f"Superpose branch for {pattern_value}:")
+                self.output.line(lambda: f"Superpose branch for {pattern_value}:")
                 for stmt in body:
                     self._execute_statement(stmt)
     
@@ -1081,7 +1230,7 @@ class QubeInterpreter:
 
         # 🆕 회로 생성자 확인 (클래스보다 먼저)
         if name in self.circuits:
-            print(f"회로 생성: {name}")  # 디버그용
+            self.output.line(f"회로 생성: {name}")
             return self._create_circuit_instance(name, arg_values)                                                              
         
         if name in self.classes:
@@ -1094,8 +1243,10 @@ class QubeInterpreter:
                     result = self.builtin_functions[name](arg_values[0])
                 elif len(arg_values) == 2:
                     result = self.builtin_functions[name](arg_values[0], arg_values[1].value)
+                elif len(arg_values) == 3:
+                    result = self.builtin_functions[name](arg_values[0], arg_values[1].value, arg_values[2].value)
                 else:
-                    raise QubeRuntimeError(f"measure() takes 1 or 2 arguments, got {len(arg_values)}")
+                    raise QubeRuntimeError(f"measure() takes 1 to 3 arguments, got {len(arg_values)}")
             else:
                 result = self.builtin_functions[name](*arg_values)
             
@@ -1123,8 +1274,36 @@ class QubeInterpreter:
         else:
             raise NameError(f"Unknown function: {name}")
         
-    def _create_circuit_instance(self, circuit_name: str, args: list = None):
-        """회로 인스턴스 생성 - 에러 처리 개선"""
+    def _circuit_storage_options(self) -> dict:
+        """새 회로에 전달할 상태 벡터 저장/백엔드 옵션"""
+        return {
+            "storage": self.storage,
+            "scratch_dir": self.scratch_dir,
+            "memory_budget": self.memory_budget,
+            "backend": self.backend,
+            "max_bond_dimension": self.max_bond_dimension,
+            "truncation_threshold": self.truncation_threshold,
+            "peephole": self.peephole,
+            "profile": self.profile,
+            "tracer": self._circuit_tracer(),
+        }
+
+    def _circuit_tracer(self):
+        """DEBUG 출력이 켜져 있으면 회로 트레이스를 출력 sink로 보내는 Tracer (꺼져 있으면 None: 트레이스 비용 없음)"""
+        if not self.output.enabled(DEBUG):
+            return None
+        # 기록은 sink로 바로 내보내므로 보관하지 않음
+        return Tracer(sink=self._emit_trace_record, max_records=0)
+
+    def _emit_trace_record(self, record: TraceRecord):
+        self.output.line(lambda: f"DEBUG: {format_record(record)}", DEBUG)
+
+    def _create_circuit_instance(self, circuit_name: str, args: list = None, symbolic: bool = False):
+        """회로 인스턴스 생성 - 에러 처리 개선
+
+        매개변수가 있는 회로 정의는 args를 정의 순서대로 대입하고,
+        symbolic이면 값 대신 기호 매개변수(Parameter)를 대입한다 (compile_circuit용).
+        """
         if circuit_name not in self.circuits:
             raise QubeCircuitError(f"회로 '{circuit_name}'을 찾을 수 없습니다")
         
@@ -1134,12 +1313,25 @@ class QubeInterpreter:
         # 큐빗 수 검증
         if n_qubits <= 0:
             raise QubeCircuitError(f"잘못된 큐빗 수: {n_qubits}")
-        if n_qubits > 20:  # 메모리 제한
-            raise QubeCircuitError(f"큐빗 수가 너무 많습니다: {n_qubits} (최대 20)")
+        # 메모리 제한 (memmap 저장은 디스크 용량이 한계, 스태빌라이저/MPS/희소 백엔드는 상태 벡터를 만들지 않음)
+        if n_qubits > 20 and self.storage == "memory" and self.backend not in ("stabilizer", "mps", "sparse"):
+            raise QubeCircuitError(f"큐빗 수가 너무 많습니다: {n_qubits} (최대 20, 더 큰 회로는 --memmap 사용)")
+        
+        # 각도 매개변수 대입값
+        if symbolic:
+            from .quantum import Parameter
+            parameter_values = [QubeValue(Parameter(name), "parameter") for name in circuit_def.parameters]
+        else:
+            parameter_values = list(args or [])[:len(circuit_def.parameters)]
+            if len(parameter_values) < len(circuit_def.parameters):
+                raise QubeCircuitError(
+                    f"회로 '{circuit_name}'에 매개변수 {len(circuit_def.parameters)}개가 필요합니다 "
+                    f"({', '.join(circuit_def.parameters)})")
         
         try:
             from .quantum import QuantumCircuit
-            circuit_instance = QuantumCircuit(n_qubits)
+            circuit_instance = QuantumCircuit(n_qubits, lazy=True, precision=self.precision,
+                                              **self._circuit_storage_options())
         except Exception as e:
             raise QubeCircuitError(f"회로 생성 실패: {str(e)}")
         
@@ -1150,6 +1342,8 @@ class QubeInterpreter:
             # 회로 설정
             self.current_circuit = circuit_instance
             self.variables['__current_circuit__'] = QubeValue(circuit_instance, "quantum_circuit")
+            for name, value in zip(circuit_def.parameters, parameter_values):
+                self.variables[name] = value
             
             # 회로 본문 실행
             for i, stmt in enumerate(circuit_def.body):
@@ -1158,7 +1352,9 @@ class QubeInterpreter:
                 except QubeException as e:
                     # 위치 정보 추가
                     raise QubeCircuitError(f"회로 '{circuit_name}' {i+1}번째 명령에서 오류: {e.message}")
-                    
+            
+            if not symbolic:
+                self._attach_circuit_cache(circuit_instance)
             return QubeValue(circuit_instance, "quantum_circuit")
             
         finally:
@@ -1169,6 +1365,21 @@ class QubeInterpreter:
             elif hasattr(self, 'current_circuit'):
                 delattr(self, 'current_circuit')
     
+    def _attach_circuit_cache(self, circuit):
+        """같은 게이트 열을 기록한 인스턴스끼리 최종 상태를 공유 (한 번 시뮬레이션하고 여러 번 샘플링)
+
+        본문은 출력 등 부수 효과 때문에 매번 실행하지만 게이트 기록만 하므로 싸고,
+        비싼 상태 벡터 시뮬레이션은 캐시 키(게이트 열 해시)마다 한 번만 한다.
+        본문에서 중간 측정을 했거나 상태 벡터를 쓰지 않는 백엔드면 캐시하지 않는다.
+        """
+        if self.circuit_cache is None or circuit.storage != "memory" or circuit._circuit_state is not None:
+            return
+        if circuit.active_backend != "statevector":
+            return
+        key = circuit_key(circuit)
+        if key is not None:
+            circuit.use_state_cache(self.circuit_cache, key)
+    
     def _is_truthy(self, value: QubeValue) -> bool:
         """Determine if a value is truthy"""
         if value.type_name == "bool":
@@ -1286,13 +1497,34 @@ class QubeInterpreter:
         fidelity = self.quantum_sim.calculate_fidelity(state1.value, state2.value)
         return QubeValue(fidelity, "float")
     
-    def _builtin_entanglement(self, state: QubeValue) -> QubeValue:
+    def _builtin_entanglement(self, state: QubeValue, qubits: QubeValue = None) -> QubeValue:
+        """entanglement(state_or_circuit[, [큐빗...]]) - 이분할 얽힘 엔트로피 (비트)
+
+        qubits 부분계 (기본: 앞쪽 절반 큐빗)와 나머지 사이의 폰 노이만 엔트로피.
+        상태와 회로 모두 little-endian 번호 (큐빗 k는 상태 벡터 인덱스의 k번째 비트)를 쓰므로
+        회로와 그 회로의 상태는 같은 부분계를 가리킨다. a ⊗ b에서는 b의 큐빗이 0번부터다.
+        """
+        subsystem = None if qubits is None else list(qubits.value)
+        if state.type_name == "quantum_circuit":
+            return QubeValue(state.value.entanglement_entropy(subsystem), "float")
         if state.type_name != "quantum_state":
-            raise TypeError("Entanglement measure requires a quantum state")
+            raise TypeError("Entanglement measure requires a quantum state or circuit")
         
-        entanglement = self.quantum_sim.calculate_entanglement_measure(state.value)
+        entanglement = self.quantum_sim.calculate_entanglement_measure(state.value, subsystem)
         return QubeValue(entanglement, "float")
     
+    def _builtin_purity(self, state: QubeValue, qubits: QubeValue = None) -> QubeValue:
+        """purity(state_or_circuit[, [큐빗...]]) - 부분계의 순도 Tr(ρ²) (회로 기본: 앞쪽 절반 큐빗)
+
+        큐빗 번호는 entanglement()와 같은 little-endian (큐빗 k는 상태 벡터 인덱스의 k번째 비트)이다.
+        """
+        subsystem = None if qubits is None else list(qubits.value)
+        if state.type_name == "quantum_circuit":
+            return QubeValue(state.value.purity(subsystem), "float")
+        if state.type_name != "quantum_state":
+            raise TypeError("Purity requires a quantum state or circuit")
+        return QubeValue(state.value.purity(subsystem), "float")
+    
     def _builtin_trace(self, state: QubeValue) -> QubeValue:
         if state.type_name != "quantum_state":
             raise TypeError("Trace requires a quantum state")
@@ -1326,7 +1558,7 @@ class QubeInterpreter:
     # Built-in function implementations
     def _builtin_println(self, *args) -> QubeValue:
         if not args:
-            print()
+            self.output.write("\n")
             return QubeValue(None, "null")
         
         first_arg = args[0]
@@ -1353,16 +1585,16 @@ class QubeInterpreter:
             for value in values[:placeholder_count]:
                 result = result.replace('{}', str(value), 1)
             
-            print(result)
+            self.output.write(result + "\n")
         else:
             message = " ".join(str(arg.value) if hasattr(arg, 'value') else str(arg) for arg in args)
-            print(message)
+            self.output.write(message + "\n")
         
         return QubeValue(None, "null")
     
     def _builtin_print(self, *args) -> QubeValue:
         message = " ".join(str(arg.value) if hasattr(arg, 'value') else str(arg) for arg in args)
-        print(message, end='')
+        self.output.write(message)
         return QubeValue(None, "null")
     
     def _builtin_hadamard(self, qubit: QubeValue) -> QubeValue:
@@ -1425,9 +1657,13 @@ class QubeInterpreter:
         new_state = self.quantum_sim.apply_cnot(control.value, target.value)
         return QubeValue(new_state, "quantum_state")
     
-    def _builtin_measure(self, target, qubit_indices=None):
+    def _builtin_measure(self, target, qubit_indices=None, shots=None):
         """Enhanced measure function supporting both individual qubits and circuits"""
         
+        # Case 3: measure(circuit, [0,1,2], 1000) - 상태 붕괴 없이 shots번 샘플링한 히스토그램
+        if shots is not None:
+            return self._sample_circuit_with_indices(target, qubit_indices, shots)
+        
         # Case 1: measure(qubit) - 기존 개별 qubit 측정
         if qubit_indices is None:
             if not isinstance(target, QubeValue) or target.type_name != "qubit":
@@ -1476,6 +1712,28 @@ class QubeInterpreter:
         except Exception as e:
             raise QubeQuantumError(f"Circuit measurement failed: {str(e)}")
 
+    def _sample_circuit_with_indices(self, circuit_value, qubit_indices, shots):
+        """회로의 지정된 큐빗들을 shots번 샘플링 - {비트열 정수: 횟수}"""
+        if not hasattr(circuit_value, 'value') or not isinstance(circuit_value.value, QuantumCircuit):
+            raise QubeTypeError("First argument must be a quantum circuit for shot-based measurement")
+        
+        if not isinstance(qubit_indices, list):
+            raise QubeTypeError("Qubit indices must be provided as a list")
+        
+        if not isinstance(shots, int) or shots < 1:
+            raise QubeValueError(f"shots must be a positive integer, got {shots}")
+        
+        circuit = circuit_value.value
+        for idx in qubit_indices:
+            if not isinstance(idx, int) or idx < 0 or idx >= circuit.n_qubits:
+                raise QubeRuntimeError(f"Invalid qubit index {idx} for {circuit.n_qubits}-qubit circuit")
+        
+        try:
+            counts = circuit.sample_counts(shots, qubit_indices)
+        except ValueError as e:
+            raise QubeQuantumError(f"Circuit sampling failed: {str(e)}")
+        
+        return QubeValue(counts, "dict")
     
     def _builtin_len(self, obj: QubeValue) -> QubeValue:
         if obj.type_name == "array":
@@ -1933,6 +2191,7 @@ class QubeInterpreter:
         # 새로운 인터프리터 인스턴스로 모듈 실행
         module_interpreter = QubeInterpreter()
         module_interpreter.current_module_path = module_path
+        module_interpreter.output = self.output
         module_interpreter._execute_program(ast)
         
         # export된 심볼들만 캐시에 저장
@@ -1994,62 +2253,14 @@ class QubeInterpreter:
         return QubeValue(result, "bit")
 
     def _measure_circuit_qubit(self, circuit, qubit_index: int) -> int:
-        """회로 내 특정 큐빗 측정 - 정리 버전"""
-        # 상태 벡터 가져오기
-        state_vector = circuit.circuit_state.state_vector
-        
-        # |0⟩ 확률 계산
-        prob_0 = 0.0
-        for i in range(len(state_vector)):
-            if (i >> qubit_index) & 1 == 0:
-                prob_0 += abs(state_vector[i])**2
-        
-        # 확률적 측정
-        import random
-        result = 0 if random.random() < prob_0 else 1
-        
-        # 상태 붕괴
-        self._collapse_circuit_state(circuit, qubit_index, result)
-        
+        """회로 내 특정 큐빗 측정 (상태 벡터/스태빌라이저/MPS/희소 모두 QuantumCircuit.measure_qubit)"""
+        result = circuit.measure_qubit(qubit_index)
+        self.output.line(lambda: f"측정: q{qubit_index} = {result}, 상태 붕괴 완료")
+        if circuit.active_backend == "statevector":
+            state_vector = circuit.circuit_state.state_vector
+            self.output.line(lambda: f"새로운 상태 벡터: {state_vector[:8]}...", DEBUG)  # 처음 8개 진폭만 표시
         return result
 
-    def _collapse_circuit_state(self, circuit, qubit_index: int, result: int):
-        """측정 후 상태 붕괴 - 실제 구현"""
-        import numpy as np
-        
-        state_vector = circuit.circuit_state.state_vector
-        n_qubits = circuit.n_qubits
-        
-        # 새로운 상태 벡터 생성
-        new_state = np.zeros_like(state_vector)
-        
-        # 측정 결과에 해당하는 진폭들만 유지
-        norm = 0.0
-        for i in range(len(state_vector)):
-            # i의 이진 표현에서 qubit_index 번째 비트 확인
-            bit_value = (i >> qubit_index) & 1
-            
-            if bit_value == result:
-                new_state[i] = state_vector[i]
-                norm += abs(state_vector[i])**2
-        
-        # 정규화
-        if norm > 1e-10:  # 0이 아닌 경우만
-            new_state = new_state / np.sqrt(norm)
-        else:
-            # 불가능한 측정 결과인 경우 (이론적으로는 발생하지 않아야 함)
-            print(f"경고: 측정 결과 {result}의 확률이 0에 가까움")
-            new_state[0] = 1.0  # |000...⟩ 상태로 리셋
-        
-        # 회로 상태 업데이트
-        circuit.circuit_state.state_vector = new_state
-        
-        print(f"측정: q{qubit_index} = {result}, 상태 붕괴 완료")
-        
-        # 디버그 정보 (선택사항)
-        if hasattr(self, 'debug_mode') and self.debug_mode:
-            print(f"새로운 상태 벡터: {new_state[:8]}...")  # 처음 8개 진폭만 표시
-
     def _validate_and_apply_gate(self, circuit, gate_name: str, targets: list, params: list):
         """게이트 검증 및 적용"""
         
@@ -2102,55 +2313,56 @@ class QubeInterpreter:
         if var_name:
             if var_name in self.variables:
                 var = self.variables[var_name]
-                print(f"DEBUG: {var_name} = {var.value} (type: {var.type_name})")
+                self.output.line(f"DEBUG: {var_name} = {var.value} (type: {var.type_name})", DEBUG)
             else:
-                print(f"DEBUG: {var_name} not found")
-        else:
-            print("DEBUG: All variables:")
+                self.output.line(f"DEBUG: {var_name} not found", DEBUG)
+        elif self.output.enabled(DEBUG):
+            self.output.line("DEBUG: All variables:", DEBUG)
             for name, var in self.variables.items():
-                print(f"  {name} = {var.value} (type: {var.type_name})")
+                self.output.line(f"  {name} = {var.value} (type: {var.type_name})", DEBUG)
 
 
     def _measure_all_qubits_simultaneously(self, circuit, qubit_indices):
         """모든 큐빗을 동시에 측정하여 상태 붕괴 방지 - 비트 순서 수정"""
+        if circuit.active_backend != "statevector":
+            # Clifford 회로/MPS: 상태 벡터 없이 테이블 또는 MPS에서 1샷 샘플링
+            outcome = next(iter(circuit.sample_counts(1, qubit_indices)))
+            return [(outcome >> j) & 1 for j in range(len(qubit_indices))]
+        
         state_vector = circuit.circuit_state.state_vector
         n_qubits = circuit.n_qubits
         
-        # 🔍 디버깅: 상태 벡터와 확률 출력
-        probabilities = [abs(amp)**2 for amp in state_vector]
+        probabilities = state_vector.real**2 + state_vector.imag**2
+        trace = self.output.enabled(DEBUG)
         
-        print(f"DEBUG: 상태 벡터 확률:")
-        for i, prob in enumerate(probabilities):
-            if prob > 1e-10:  # 0이 아닌 확률만 출력
+        # 🔍 디버깅: 0이 아닌 확률 출력 (DEBUG 출력일 때만)
+        if trace:
+            self.output.line("DEBUG: 상태 벡터 확률:", DEBUG)
+            for i in np.flatnonzero(probabilities > 1e-10):
+                prob = probabilities[i]
                 binary = format(i, f'0{n_qubits}b')
-                print(f"  |{binary}⟩: {prob:.4f} ({prob*100:.1f}%)")
+                self.output.line(f"  |{binary}⟩: {prob:.4f} ({prob*100:.1f}%)", DEBUG)
         
         # 확률에 따라 하나의 기저 상태 선택
-        import random
-        rand_val = random.random()
-        print(f"DEBUG: 랜덤값 = {rand_val:.4f}")
-        
-        cumulative_prob = 0.0
-        
-        for i, prob in enumerate(probabilities):
-            cumulative_prob += prob
-            if rand_val < cumulative_prob:
-                # i번째 기저 상태가 측정됨
-                binary_result = format(i, f'0{n_qubits}b')
-                print(f"DEBUG: 선택된 상태 = |{binary_result}⟩ (인덱스 {i})")
-                
-                # 🔧 비트 순서 수정: 뒤에서부터 읽기 (LSB first)
-                results = []
-                for idx in qubit_indices:
-                    # 비트 순서를 뒤집어서 접근
-                    reversed_idx = n_qubits - 1 - idx
-                    results.append(int(binary_result[reversed_idx]))
-                
-                print(f"DEBUG: 수정된 반환 결과 = {results}")
-                return results
+        rand_val = np.random.random()
+        self.output.line(lambda: f"DEBUG: 랜덤값 = {rand_val:.4f}", DEBUG)
+        
+        # 누적 확률에서 rand_val < cumulative[i]인 첫 인덱스 (이진 탐색)
+        cumulative = np.cumsum(probabilities)
+        i = int(np.searchsorted(cumulative, rand_val, side='right'))
+        
+        if i < len(cumulative):
+            # i번째 기저 상태가 측정됨
+            self.output.line(lambda: f"DEBUG: 선택된 상태 = |{format(i, f'0{n_qubits}b')}⟩ (인덱스 {i})", DEBUG)
+            
+            # 🔧 비트 순서 수정: q_k는 인덱스의 k번째 비트 (LSB first)
+            results = [(i >> idx) & 1 for idx in qubit_indices]
+            
+            self.output.line(lambda: f"DEBUG: 수정된 반환 결과 = {results}", DEBUG)
+            return results
         
         # 안전장치 (확률 합이 1이 아닌 경우)
-        print("DEBUG: 안전장치 발동 - 모든 0 반환")
+        self.output.line("DEBUG: 안전장치 발동 - 모든 0 반환", DEBUG)
         return [0] * len(qubit_indices)
     
     def _resolve_range_expression(self, range_expr, n_qubits: int):
@@ -2199,7 +2411,6 @@ class QubeInterpreter:
                     circuit.s(qubit_idx)
                 elif gate_name == "T":
                     circuit.t(qubit_idx)
-                print(f"DEBUG: {gate_name} 게이트 적용됨 - 큐빗 [{qubit_idx}]")
         
         elif gate_name == 'CZ':
             # 다중 제어 CZ 게이트
@@ -2214,7 +2425,6 @@ class QubeInterpreter:
             else:
                 # 5큐빗 이상은 범용 구현 사용
                 circuit.controlled_z_n(*target_indices)
-            print(f"DEBUG: CZ 게이트 적용됨 - 큐빗 {target_indices}")
         
         elif gate_name == 'CNOT':
             # CNOT: 마지막이 타겟, 나머지가 제어
@@ -2222,10 +2432,15 @@ class QubeInterpreter:
                 control = target_indices[0]
                 target = target_indices[1]
                 circuit.cnot(control, target)
-                print(f"DEBUG: CNOT 게이트 적용됨 - 제어: {control}, 타겟: {target}")
             else:
                 raise QubeQuantumError("CNOT 게이트는 최소 2개 큐빗이 필요합니다")
-        
+
+        elif gate_name in ['CCX', 'TOFFOLI', 'MCX']:
+            # 다중 제어 X: 마지막이 타겟, 나머지가 제어
+            if len(target_indices) < 2:
+                raise QubeQuantumError(f"{gate_name} 게이트는 최소 2개 큐빗이 필요합니다")
+            circuit.mcx(*target_indices)
+
         elif gate_name in ['RX', 'RY', 'RZ']:
             # 회전 게이트 - 매개변수 필요
             if len(parameters) != 1:
@@ -2239,7 +2454,6 @@ class QubeInterpreter:
                     circuit.ry(angle, qubit_idx)
                 elif gate_name == "RZ":
                     circuit.rz(angle, qubit_idx)
-                print(f"DEBUG: {gate_name}({angle}) 게이트 적용됨 - 큐빗 [{qubit_idx}]")
         
         else:
             raise QubeQuantumError(f"지원하지 않는 게이트: {gate_name}")
\ No newline at end of file
@@ -0,0 +1,466 @@
+"""
+kernels.py - 상태 벡터 게이트 커널
+
+Qube 큐빗 순서는 little-endian (q0가 최하위 비트)이므로 큐빗 k는
+기저 상태 인덱스의 k번째 비트에 대응한다. 모든 커널은 전달받은 상태 벡터를
+제자리(in-place)에서 갱신하고 같은 배열을 반환한다.
+
+# 단일 큐빗 게이트: 2^n x 2^n 연산자 없이 O(2^n)
+h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+apply_single_qubit_gate(state_vector, h, 2)  # q2에 H 적용
+
+# 청크 처리: 한 번에 2^16개 진폭씩 (np.memmap 상태 벡터의 메모리 사용량 제한)
+apply_single_qubit_gate(state_vector, h, 2, chunk_size=1 << 16)
+
+# 멀티스레드: 큰 상태 벡터는 서로 겹치지 않는 청크로 나눠 스레드 풀에서 처리
+set_num_threads(8)
+
+# 배치: (K, 2^n) 배열도 그대로 받는다 (앞쪽 축은 배치 축, 모든 행에 같은 게이트)
+apply_controlled_x(states, [0], 1)
+apply_batched_single_qubit_gate(states, rx_matrices, 0)  # rx_matrices: (K, 2, 2), 행마다 다른 게이트
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# 스레드 병렬화 설정 (set_num_threads로 변경)
+# NumPy 내부 루프는 GIL을 놓으므로 서로 겹치지 않는 청크들을 여러 스레드가 동시에 갱신할 수 있다
+_num_threads = 1
+_parallel_threshold = 1 << 18  # 이보다 작은 상태 벡터는 스레드 오버헤드가 더 커서 단일 스레드로 처리
+_executor = None
+
+
+def set_num_threads(num_threads: int = None, threshold: int = None):
+    """게이트 커널 스레드 수 설정 (None이면 CPU 코어 수, 1이면 단일 스레드)
+
+    threshold(진폭 수) 이상인 상태 벡터만 청크로 나눠 병렬 처리한다.
+    청크마다 임시 배열을 만들므로 memmap 회로의 메모리 사용량은 최대 스레드 수만큼 늘어난다.
+    """
+    global _num_threads, _parallel_threshold, _executor
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    if num_threads < 1:
+        raise ValueError(f"num_threads must be positive, got {num_threads}")
+    if threshold is not None:
+        _parallel_threshold = threshold
+    if num_threads != _num_threads and _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    _num_threads = num_threads
+
+
+def get_num_threads() -> int:
+    return _num_threads
+
+
+def _qubit_view(state_vector: np.ndarray, qubit: int) -> np.ndarray:
+    """상태 벡터를 (2^(n-k-1), 2, 2^k) 뷰로 변환 (복사 없음)"""
+    return state_vector.reshape(-1, 2, 1 << qubit)
+
+
+def _n_qubits(state_vector: np.ndarray) -> int:
+    return state_vector.shape[-1].bit_length() - 1
+
+
+def chunk_assignments(n_qubits: int, qubits, chunk_size: int = None):
+    """게이트 큐빗 이외의 상위 큐빗 비트를 고정해 상태 벡터를 청크로 나누기
+
+    각 청크는 {큐빗: 비트값} dict로 표현되며, 고정되지 않은 축들의 진폭 수가
+    chunk_size 이하가 되도록 한다 (게이트 큐빗은 절대 고정하지 않음).
+    상위 큐빗부터 고정하므로 청크 안의 진폭은 연속된 구간들로 이루어진다.
+    chunk_size가 None이거나 상태 벡터가 충분히 작으면 빈 dict 하나(= 전체)를 반환한다.
+    """
+    if chunk_size is None or (1 << n_qubits) <= chunk_size:
+        return [{}]
+    free = [q for q in range(n_qubits - 1, -1, -1) if q not in qubits]
+    n_fixed = min(len(free), n_qubits - (max(chunk_size, 1).bit_length() - 1))
+    fixed = free[:n_fixed]
+    return [{q: (assignment >> j) & 1 for j, q in enumerate(fixed)} for assignment in range(1 << n_fixed)]
+
+
+def _kernel_chunks(state_vector: np.ndarray, qubits, chunk_size: int = None):
+    """커널이 처리할 청크 목록 (메모리 예산 청크 + 스레드 병렬화를 위한 분할)"""
+    size = state_vector.size
+    if _num_threads > 1 and size >= _parallel_threshold:
+        # 스레드마다 청크가 여러 개 돌아가도록 잘게 나눠 부하 불균형 완화
+        parallel_chunk = max(size // (_num_threads * 4), 1)
+        chunk_size = parallel_chunk if chunk_size is None else min(chunk_size, parallel_chunk)
+    return chunk_assignments(_n_qubits(state_vector), qubits, chunk_size)
+
+
+def _map_chunks(func, chunks) -> list:
+    """청크별 작업 실행 (청크가 여러 개이고 스레드가 설정돼 있으면 스레드 풀에서)"""
+    global _executor
+    if _num_threads > 1 and len(chunks) > 1:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_num_threads, thread_name_prefix="qube-kernel")
+        return list(_executor.map(func, chunks))
+    return [func(chunk) for chunk in chunks]
+
+
+def _mix_pair(a0: np.ndarray, a1: np.ndarray, gate: np.ndarray):
+    """큐빗 |0⟩/|1⟩ 성분 슬라이스 쌍에 2x2 게이트를 제자리 적용"""
+    g00, g01 = gate[0, 0], gate[0, 1]
+    g10, g11 = gate[1, 0], gate[1, 1]
+
+    if g01 == 0 and g10 == 0:
+        # 대각 게이트 (Z, S, T, RZ): 위상만 곱하기
+        if g00 != 1:
+            a0 *= g00
+        if g11 != 1:
+            a1 *= g11
+    elif g00 == 0 and g11 == 0:
+        # 반대각 게이트 (X, Y): 슬라이스 교환 후 위상 곱하기
+        tmp = a0.copy()
+        a0[...] = a1
+        a1[...] = tmp
+        if g01 != 1:
+            a0 *= g01
+        if g10 != 1:
+            a1 *= g10
+    else:
+        # 일반 2x2 게이트 (H, RX, RY, ...)
+        tmp = a0.copy()
+        a0 *= g00
+        a0 += g01 * a1
+        a1 *= g11
+        a1 += g10 * tmp
+
+
+def apply_single_qubit_gate(state_vector: np.ndarray, gate: np.ndarray, qubit: int,
+                            chunk_size: int = None) -> np.ndarray:
+    """2x2 게이트를 지정된 큐빗에 제자리 적용
+
+    상태 벡터를 (2^(n-k-1), 2, 2^k)로 reshape하면 가운데 축이 큐빗 k의
+    |0⟩/|1⟩ 성분이 되므로, 두 슬라이스만 갱신하면 된다.
+    chunk_size를 지정하면 임시 배열이 chunk_size 진폭을 넘지 않도록 나눠서 처리한다.
+    """
+    chunks = _kernel_chunks(state_vector, [qubit], chunk_size)
+    if chunks == [{}]:
+        view = _qubit_view(state_vector, qubit)
+        _mix_pair(view[:, 0, :], view[:, 1, :], gate)
+        return state_vector
+
+    def apply_chunk(fixed):
+        a0 = _fixed_bits_view(state_vector, {**fixed, qubit: 0})
+        a1 = _fixed_bits_view(state_vector, {**fixed, qubit: 1})
+        _mix_pair(a0, a1, gate)
+
+    _map_chunks(apply_chunk, chunks)
+    return state_vector
+
+
+def apply_batched_single_qubit_gate(states: np.ndarray, gates: np.ndarray, qubit: int) -> np.ndarray:
+    """(K, 2^n) 배치 상태의 k번째 행에 gates[k] (2x2)를 제자리 적용 (파라미터 스윕용)
+
+    게이트 계수를 (K, 1, 1)로 브로드캐스트하므로 배치 전체가 한 번의 벡터화 연산이다.
+    """
+    view = states.reshape(states.shape[0], -1, 2, 1 << qubit)
+    a0 = view[:, :, 0, :]
+    a1 = view[:, :, 1, :]
+    g00, g01 = gates[:, 0, 0, None, None], gates[:, 0, 1, None, None]
+    g10, g11 = gates[:, 1, 0, None, None], gates[:, 1, 1, None, None]
+
+    tmp = a0.copy()
+    a0 *= g00
+    a0 += g01 * a1
+    a1 *= g11
+    a1 += g10 * tmp
+    return states
+
+
+def _fixed_bits_view(state_vector: np.ndarray, fixed_bits: dict) -> np.ndarray:
+    """지정된 큐빗 비트가 고정된 진폭들의 strided 뷰 반환 (복사 없음)
+
+    상태 벡터를 (2,)*n 텐서로 보면 큐빗 k는 축 n-1-k에 대응한다.
+    fixed_bits = {큐빗: 비트값} 에 해당하는 축만 길이 1 슬라이스로 고정한다
+    (모든 축이 고정돼도 스칼라가 아닌 뷰가 반환되도록).
+    배치 상태 (K, 2^n)이면 앞쪽 배치 축은 그대로 둔다.
+    """
+    n_qubits = _n_qubits(state_vector)
+    batch_shape = state_vector.shape[:-1]
+    tensor = state_vector.reshape(batch_shape + (2,) * n_qubits)
+    index = [slice(None)] * (len(batch_shape) + n_qubits)
+    for qubit, bit in fixed_bits.items():
+        index[len(batch_shape) + n_qubits - 1 - qubit] = slice(bit, bit + 1)
+    return tensor[tuple(index)]
+
+
+def apply_controlled_x(state_vector: np.ndarray, controls, target: int, chunk_size: int = None) -> np.ndarray:
+    """다중 제어 X (CNOT, Toffoli, ...)를 제자리 적용
+
+    모든 제어 비트가 1인 부분공간에서 타겟 비트가 0/1인 두 진폭 묶음을 교환한다.
+    비트마스크로 선택되는 인덱스 쌍 (i, i ^ (1 << target))의 교환과 같다.
+    """
+    def swap_chunk(chunk):
+        fixed = dict(chunk)
+        fixed.update({control: 1 for control in controls})
+        fixed[target] = 0
+        amps_0 = _fixed_bits_view(state_vector, fixed)
+        fixed[target] = 1
+        amps_1 = _fixed_bits_view(state_vector, fixed)
+
+        tmp = amps_0.copy()
+        amps_0[...] = amps_1
+        amps_1[...] = tmp
+
+    _map_chunks(swap_chunk, _kernel_chunks(state_vector, list(controls) + [target], chunk_size))
+    return state_vector
+
+
+def apply_controlled_phase(state_vector: np.ndarray, qubits, phase: complex = -1,
+                           chunk_size: int = None) -> np.ndarray:
+    """다중 제어 위상 게이트 (CZ, CCZ, CCCZ, ...)를 제자리 적용
+
+    대각 게이트이므로 지정된 큐빗이 모두 1인 진폭들에만 phase를 곱한다.
+    선택은 strided 뷰로 하므로 인덱스 배열이나 문자열 변환이 필요 없다.
+    """
+    def phase_chunk(chunk):
+        amps = _fixed_bits_view(state_vector, {**chunk, **{qubit: 1 for qubit in qubits}})
+        amps *= phase
+
+    _map_chunks(phase_chunk, _kernel_chunks(state_vector, qubits, chunk_size))
+    return state_vector
+
+
+def apply_multi_qubit_gate(state_vector: np.ndarray, gate: np.ndarray, qubits,
+                           chunk_size: int = None) -> np.ndarray:
+    """2^k x 2^k 게이트를 k개 큐빗에 제자리 적용 (퓨전된 게이트용)
+
+    게이트 행렬의 로컬 인덱스는 little-endian: qubits[j]가 로컬 인덱스의 j번째 비트.
+    2^k개의 strided 뷰를 (2^k, 청크/2^k) 행렬로 모아 게이트와 한 번의 행렬 곱(BLAS)을 하고
+    결과 행을 다시 뷰에 쓴다 (임시 배열은 청크 크기의 두 배). 대각 게이트는 위상만 곱한다.
+    """
+    if len(qubits) == 1:
+        return apply_single_qubit_gate(state_vector, gate, qubits[0], chunk_size)
+
+    dim = 1 << len(qubits)
+    diagonal = np.diag(gate)
+    if np.any(gate - np.diag(diagonal)):
+        diagonal = None
+
+    def apply_chunk(chunk):
+        views = []
+        for local in range(dim):
+            fixed = dict(chunk)
+            fixed.update({qubit: (local >> j) & 1 for j, qubit in enumerate(qubits)})
+            views.append(_fixed_bits_view(state_vector, fixed))
+        if diagonal is not None:
+            # 대각 게이트 (퓨전된 제어 위상 등): 위상만 곱하기
+            for view, phase in zip(views, diagonal):
+                if phase != 1:
+                    view *= phase
+            return
+        mixed = gate @ np.stack(views).reshape(dim, -1)
+        for view, row in zip(views, mixed):
+            view[...] = row.reshape(view.shape)
+
+    _map_chunks(apply_chunk, _kernel_chunks(state_vector, qubits, chunk_size))
+    return state_vector
+
+
+def marginal_probabilities(probabilities: np.ndarray, qubits) -> np.ndarray:
+    """지정된 큐빗들의 주변 확률 분포
+
+    결과 인덱스는 little-endian: qubits[j]가 결과 인덱스의 j번째 비트.
+    나머지 큐빗 축은 (2,)*n 텐서에서 합산으로 제거한다.
+    """
+    n_qubits = _n_qubits(probabilities)
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("Qubit indices must be different")
+    return _marginal_of_tensor(probabilities.reshape((2,) * n_qubits), n_qubits, qubits)
+
+
+def _marginal_of_tensor(tensor: np.ndarray, n_qubits: int, qubits) -> np.ndarray:
+    """(2,)*n 확률 텐서 (고정된 축은 길이 1)에서 qubits 이외의 축을 합산"""
+    other_axes = tuple(n_qubits - 1 - q for q in range(n_qubits) if q not in qubits)
+    marginal = tensor.sum(axis=other_axes) if other_axes else tensor
+
+    # 남은 축은 큐빗 번호 내림차순 → qubits[-1]이 최상위 비트가 되도록 재배열
+    kept = sorted(qubits, reverse=True)
+    order = [kept.index(q) for q in reversed(qubits)]
+    return np.transpose(marginal, order).reshape(-1)
+
+
+def state_marginal_probabilities(state_vector: np.ndarray, qubits, chunk_size: int = None) -> np.ndarray:
+    """상태 벡터에서 바로 주변 확률 계산 (전체 확률 벡터를 만들지 않고 청크별로 누적)"""
+    n_qubits = _n_qubits(state_vector)
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("Qubit indices must be different")
+
+    def chunk_marginal(chunk):
+        amps = _fixed_bits_view(state_vector, chunk)
+        return _marginal_of_tensor(amps.real**2 + amps.imag**2, n_qubits, qubits)
+
+    marginal = np.zeros(1 << len(qubits))
+    for partial in _map_chunks(chunk_marginal, _kernel_chunks(state_vector, qubits, chunk_size)):
+        marginal += partial
+    return marginal
+
+
+def flip_overlap_marginal(state_vector: np.ndarray, flip_qubits, qubits, chunk_size: int = None) -> np.ndarray:
+    """conj(ψ[b ⊕ flip]) ψ[b]를 qubits 비트별로 합산한 길이 2^k 벡터 (qubits[j]가 j번째 비트)
+
+    flip 큐빗 비트 반전은 (2,)*n 텐서 축 뒤집기 뷰이므로 복사 없이 청크별로 누적한다.
+    """
+    n_qubits = _n_qubits(state_vector)
+    qubits = list(qubits)
+    flip_axes = tuple(n_qubits - 1 - q for q in flip_qubits)
+
+    def chunk_overlap(chunk):
+        amps = _fixed_bits_view(state_vector, chunk)
+        partner = np.flip(amps, flip_axes) if flip_axes else amps
+        return _marginal_of_tensor(partner.conj() * amps, n_qubits, qubits)
+
+    marginal = np.zeros(1 << len(qubits), dtype=complex)
+    chunks = _kernel_chunks(state_vector, set(flip_qubits) | set(qubits), chunk_size)
+    for partial in _map_chunks(chunk_overlap, chunks):
+        marginal += partial
+    return marginal
+
+
+def _subsystem_matrix(tensor: np.ndarray, n_qubits: int, qubits) -> np.ndarray:
+    """(2,)*n 진폭 텐서 (고정된 축은 길이 1)를 (2^k, 나머지) 행렬로 (행 인덱스는 qubits[j]가 j번째 비트)"""
+    axes = [n_qubits - 1 - q for q in reversed(qubits)]
+    rest = [axis for axis in range(n_qubits) if axis not in axes]
+    return np.transpose(tensor, axes + rest).reshape(1 << len(qubits), -1)
+
+
+def reduced_density_matrix(state_vector: np.ndarray, qubits, chunk_size: int = None) -> np.ndarray:
+    """qubits 부분계의 축소 밀도 행렬 Tr_나머지 |ψ⟩⟨ψ| (2^k x 2^k, qubits[j]가 j번째 비트)
+
+    ψ를 (2^k, 2^(n-k)) 행렬 M으로 보면 ρ = M M†이므로 4^n 크기의 전체 밀도 행렬은 만들지 않는다.
+    나머지 큐빗 비트를 고정한 청크마다 M의 열 묶음을 곱해 누적한다.
+    """
+    n_qubits = _n_qubits(state_vector)
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("Qubit indices must be different")
+
+    def chunk_gram(chunk):
+        block = _subsystem_matrix(_fixed_bits_view(state_vector, chunk), n_qubits, qubits)
+        return block @ block.conj().T
+
+    density = np.zeros((1 << len(qubits), 1 << len(qubits)), dtype=state_vector.dtype)
+    for partial in _map_chunks(chunk_gram, _kernel_chunks(state_vector, qubits, chunk_size)):
+        density += partial
+    return density
+
+
+def _smaller_side(n_qubits: int, qubits) -> list:
+    """이분할에서 큐빗 수가 적은 쪽 (축소 밀도 행렬이 작음, 스펙트럼은 양쪽이 같음)"""
+    rest = [q for q in range(n_qubits) if q not in qubits]
+    return list(qubits) if len(qubits) <= len(rest) else rest
+
+
+def schmidt_coefficients(state_vector: np.ndarray, qubits, chunk_size: int = None) -> np.ndarray:
+    """qubits | 나머지 이분할의 슈미트 계수 (내림차순, 제곱합 1)
+
+    (2^k, 2^(n-k)) 행렬 M의 특이값이므로 더 작은 쪽 부분계의 M M† 고윳값의 제곱근으로 구한다
+    (특이값 분해보다 빠르고 청크 처리 가능, 1e-8보다 작은 계수는 정밀도가 떨어지지만 엔트로피에는 영향이 없다).
+    """
+    density = reduced_density_matrix(state_vector, _smaller_side(_n_qubits(state_vector), qubits), chunk_size)
+    coefficients = np.sqrt(np.clip(np.linalg.eigvalsh(density)[::-1], 0.0, None))
+    return coefficients / np.linalg.norm(coefficients)
+
+
+def subsystem_purity(state_vector: np.ndarray, qubits, chunk_size: int = None) -> float:
+    """qubits 부분계의 순도 Tr(ρ²) (더 작은 쪽 축소 밀도 행렬의 프로베니우스 노름 제곱, 고윳값 분해 없음)"""
+    density = reduced_density_matrix(state_vector, _smaller_side(_n_qubits(state_vector), qubits), chunk_size)
+    return float(np.sum(density.real**2 + density.imag**2) / np.trace(density).real**2)
+
+
+def state_norm(state_vector: np.ndarray, chunk_size: int = None) -> float:
+    """상태 벡터의 2-노름 (chunk_size를 지정하면 연속 구간별로 나눠서 계산)"""
+    if chunk_size is None or state_vector.size <= chunk_size:
+        return float(np.linalg.norm(state_vector))
+    total = 0.0
+    for start in range(0, state_vector.size, chunk_size):
+        block = state_vector[start:start + chunk_size]
+        total += float(np.vdot(block, block).real)
+    return float(np.sqrt(total))
+
+
+def sample_counts(probabilities: np.ndarray, shots: int) -> dict:
+    """확률 분포에서 shots번 샘플링한 히스토그램 {기저 상태 인덱스: 횟수}
+
+    다항분포에서 한 번에 뽑으므로 샷 수와 무관하게 O(2^n)이다.
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    counts = np.random.multinomial(shots, probabilities / probabilities.sum())
+    outcomes = np.flatnonzero(counts)
+    return dict(zip(outcomes.tolist(), counts[outcomes].tolist()))
+
+
+def bit_rows_to_indices(bits: np.ndarray) -> list:
+    """비트 행렬의 각 행(bits[:, j]가 j번째 비트)을 기저 상태 인덱스로 (63큐빗 이상은 파이썬 정수)"""
+    bits = np.asarray(bits, dtype=np.int64)
+    if bits.shape[1] < 63:
+        return (bits @ (1 << np.arange(bits.shape[1], dtype=np.int64))).tolist()
+    return [int("".join("1" if b else "0" for b in row[::-1]), 2) for row in bits]
+
+
+def qubit_probability(state_vector: np.ndarray, qubit: int, value: int = 1, chunk_size: int = None) -> float:
+    """큐빗을 측정했을 때 value(0/1)가 나올 확률 (단일 큐빗 주변 확률)"""
+    chunks = _kernel_chunks(state_vector, [qubit], chunk_size)
+    if chunks == [{}]:
+        amps = _qubit_view(state_vector, qubit)[:, value, :]
+        return float(np.linalg.norm(amps) ** 2)
+
+    def chunk_probability(chunk):
+        amps = _fixed_bits_view(state_vector, {**chunk, qubit: value})
+        return float(np.sum(amps.real**2 + amps.imag**2))
+
+    return sum(_map_chunks(chunk_probability, chunks))
+
+
+def collapse_qubit(state_vector: np.ndarray, qubit: int, value: int, probability: float = None,
+                   chunk_size: int = None) -> np.ndarray:
+    """측정 결과 value로 상태를 제자리 붕괴 (반대쪽 진폭 0, 남은 진폭 재정규화)
+
+    probability는 value가 나올 확률. 생략하면 새로 계산한다.
+    """
+    if probability is None:
+        probability = qubit_probability(state_vector, qubit, value, chunk_size)
+    scale = np.sqrt(probability)
+    chunks = _kernel_chunks(state_vector, [qubit], chunk_size)
+    if chunks == [{}]:
+        view = _qubit_view(state_vector, qubit)
+        view[:, 1 - value, :] = 0
+        view[:, value, :] /= scale
+        return state_vector
+
+    def collapse_chunk(chunk):
+        _fixed_bits_view(state_vector, {**chunk, qubit: 1 - value})[...] = 0
+        kept = _fixed_bits_view(state_vector, {**chunk, qubit: value})
+        kept /= scale
+
+    _map_chunks(collapse_chunk, chunks)
+    return state_vector
+
+
+def scale_state(state_vector: np.ndarray, factor: float, chunk_size: int = None) -> np.ndarray:
+    """상태 벡터 전체에 factor를 제자리 곱하기 (재정규화용, memmap도 RAM 사본 없이 청크 단위)"""
+    def scale_chunk(chunk):
+        view = _fixed_bits_view(state_vector, chunk)
+        view *= factor
+
+    _map_chunks(scale_chunk, _kernel_chunks(state_vector, [], chunk_size))
+    return state_vector
+
+
+def measure_qubit(state_vector: np.ndarray, qubit: int, chunk_size: int = None) -> int:
+    """큐빗 하나를 측정해 결과(0/1)를 뽑고 상태를 제자리 붕괴 (난수는 np.random)
+
+    회로 중간 측정, run()의 측정, 인터프리터 measure가 모두 이 함수를 거치므로
+    np.random.seed 하나로 샘플링과 섞인 실행도 재현된다.
+    """
+    prob_zero = qubit_probability(state_vector, qubit, 0, chunk_size)
+    result = 0 if np.random.random() < prob_zero else 1
+    collapse_qubit(state_vector, qubit, result, 1.0 - prob_zero if result else prob_zero, chunk_size)
+    return result
@@ -0,0 +1,344 @@
+"""
+mps.py - 행렬 곱 상태(MPS) 시뮬레이션
+
+큐빗마다 (χ_왼쪽, 2, χ_오른쪽) 텐서 하나를 두고 인접한 텐서들을 SVD로 다시 나누며 게이트를 적용한다.
+결합 차원 χ를 max_bond_dimension으로 제한하고 작은 특이값을 잘라내므로 얽힘이 적은 얕은 회로는
+50-100큐빗도 O(n χ^3) 메모리/시간으로 시뮬레이션된다. 잘라낸 특이값 제곱합은 truncation_error에 누적되므로
+0이 아니면 결과가 근사값이라는 뜻이다.
+
+state = MPSState(100, max_bond_dimension=32)
+state.apply_unitary(h, [0])
+for q in range(99):
+    state.apply_unitary(cnot, [q, q + 1])    # 로컬 행렬은 little-endian (qubits[j]가 j번째 비트)
+counts = state.sample_counts(1000, [0, 99])
+state.truncation_error                       # 0.0이면 정확한 결과
+
+떨어진 큐빗에 작용하는 게이트는 인접 SWAP으로 큐빗을 옮겨 적용하고 되돌리지 않는다
+(사이트 순서 site_qubits를 추적하므로 결과의 큐빗 순서는 그대로).
+"""
+
+import numpy as np
+from collections import Counter
+from typing import Dict, List
+
+from .kernels import bit_rows_to_indices
+
+
+# 기본 최대 결합 차원과 잘라내기 임계값 (버린 특이값 제곱합의 상대 비율)
+DEFAULT_MAX_BOND_DIMENSION = 64
+DEFAULT_TRUNCATION_THRESHOLD = 1e-10
+
+# 샘플링할 때 한 번에 진행하는 샷 수 (샷 x χ 환경 벡터 메모리 제한)
+SAMPLE_BATCH_SIZE = 1 << 14
+
+# 큐빗 하나의 X^x Z^z 연산자 ([x][z])
+_FLIP_PHASE_OPERATORS = ((np.eye(2), np.diag([1.0, -1.0])),
+                         (np.array([[0.0, 1.0], [1.0, 0.0]]), np.array([[0.0, -1.0], [1.0, 0.0]])))
+
+
+class MPSState:
+    """n큐빗 MPS 상태 (|0...0⟩에서 시작, 직교 중심 하나를 유지하는 mixed-canonical 형태)"""
+    def __init__(self, n_qubits: int, max_bond_dimension: int = DEFAULT_MAX_BOND_DIMENSION,
+                 truncation_threshold: float = DEFAULT_TRUNCATION_THRESHOLD, dtype=np.complex128):
+        if max_bond_dimension < 1:
+            raise ValueError(f"max_bond_dimension must be positive, got {max_bond_dimension}")
+        self.n_qubits = n_qubits
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_threshold = truncation_threshold
+        self.dtype = np.dtype(dtype)
+        self.truncation_error = 0.0  # 잘라낸 특이값 제곱합 (상대 비율)의 누적
+        self.sites = []
+        for _ in range(n_qubits):
+            site = np.zeros((1, 2, 1), dtype=self.dtype)
+            site[0, 0, 0] = 1.0
+            self.sites.append(site)
+        self.site_qubits = list(range(n_qubits))  # 사이트 → 큐빗
+        self.qubit_sites = list(range(n_qubits))  # 큐빗 → 사이트
+        self.center = 0  # 직교 중심 사이트 (왼쪽은 left-, 오른쪽은 right-orthonormal)
+
+    def copy(self) -> 'MPSState':
+        state = MPSState.__new__(MPSState)
+        state.__dict__.update(self.__dict__)
+        state.sites = [site.copy() for site in self.sites]
+        state.site_qubits = list(self.site_qubits)
+        state.qubit_sites = list(self.qubit_sites)
+        return state
+
+    @property
+    def bond_dimensions(self) -> List[int]:
+        """인접 사이트 사이의 결합 차원들 (길이 n-1)"""
+        return [site.shape[2] for site in self.sites[:-1]]
+
+    # === 정준형 유지 ===
+
+    def _move_center(self, target: int):
+        """QR 분해로 직교 중심을 target 사이트로 이동"""
+        while self.center < target:
+            site = self.sites[self.center]
+            left, _, right = site.shape
+            q, r = np.linalg.qr(site.reshape(left * 2, right))
+            self.sites[self.center] = q.reshape(left, 2, -1)
+            self.sites[self.center + 1] = np.tensordot(r, self.sites[self.center + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > target:
+            site = self.sites[self.center]
+            left, _, right = site.shape
+            q, r = np.linalg.qr(site.reshape(left, 2 * right).T)
+            self.sites[self.center] = q.T.reshape(-1, 2, right)
+            self.sites[self.center - 1] = np.tensordot(self.sites[self.center - 1], r.T, axes=(2, 0))
+            self.center -= 1
+
+    def _truncated_svd(self, matrix: np.ndarray):
+        """SVD 후 max_bond_dimension/truncation_threshold에 따라 특이값을 잘라내고 다시 정규화"""
+        u, s, vh = np.linalg.svd(matrix, full_matrices=False)
+        weights = s**2
+        total = weights.sum()
+        # 뒤에서부터 버린 가중치 누적 합이 임계값 이하인 만큼 버림
+        discarded = np.cumsum(weights[::-1])[::-1] / total
+        keep = max(1, int(np.sum(discarded > self.truncation_threshold)))
+        keep = min(keep, self.max_bond_dimension)
+        if keep < s.size:
+            error = float(weights[keep:].sum() / total)
+            self.truncation_error += error
+            s = s[:keep] / np.sqrt(1.0 - error)
+        return u[:, :keep], s[:keep].astype(self.dtype), vh[:keep]
+
+    def _split_block(self, theta: np.ndarray, start: int):
+        """(χ_l, 2, ..., 2, χ_r) 블록을 start부터 k개 사이트로 다시 나누기 (직교 중심은 마지막 사이트)"""
+        k = theta.ndim - 2
+        left = theta.shape[0]
+        for offset in range(k - 1):
+            matrix = theta.reshape(left * 2, -1)
+            u, s, vh = self._truncated_svd(matrix)
+            self.sites[start + offset] = u.reshape(left, 2, -1)
+            left = u.shape[1]
+            theta = (s[:, None] * vh).reshape((left,) + theta.shape[2:])
+        self.sites[start + k - 1] = theta.reshape(left, 2, -1)
+        self.center = start + k - 1
+
+    def _contract_block(self, start: int, k: int) -> np.ndarray:
+        theta = self.sites[start]
+        for offset in range(1, k):
+            theta = np.tensordot(theta, self.sites[start + offset], axes=(-1, 0))
+        return theta
+
+    def _swap_sites(self, site: int):
+        """인접 사이트 site, site+1의 큐빗 교환 (SWAP 게이트)"""
+        self._move_center(site)
+        theta = self._contract_block(site, 2).transpose(0, 2, 1, 3)
+        self._split_block(theta, site)
+        a, b = self.site_qubits[site], self.site_qubits[site + 1]
+        self.site_qubits[site], self.site_qubits[site + 1] = b, a
+        self.qubit_sites[a], self.qubit_sites[b] = site + 1, site
+
+    # === 게이트 ===
+
+    def apply_unitary(self, matrix: np.ndarray, qubits: List[int]):
+        """qubits에 작용하는 2^k x 2^k 유니터리 적용 (로컬 인덱스는 little-endian: qubits[j]가 j번째 비트)"""
+        k = len(qubits)
+        matrix = np.asarray(matrix, dtype=self.dtype)
+
+        if k == 1:
+            site = self.qubit_sites[qubits[0]]
+            self.sites[site] = np.einsum('ab,lbr->lar', matrix, self.sites[site])
+            return
+
+        # 큐빗들을 사이트 순서대로 가장 왼쪽 큐빗 옆으로 모아 연속 블록 만들기
+        ordered = sorted(qubits, key=lambda q: self.qubit_sites[q])
+        start = self.qubit_sites[ordered[0]]
+        for offset, qubit in enumerate(ordered[1:], 1):
+            while self.qubit_sites[qubit] > start + offset:
+                self._swap_sites(self.qubit_sites[qubit] - 1)
+
+        self._move_center(start)
+        theta = self._contract_block(start, k)
+
+        # 게이트 텐서 축: reshape는 big-endian이므로 축 a가 qubits[k-1-a]
+        gate = matrix.reshape([2] * (2 * k))
+        axis_of = {qubit: k - 1 - j for j, qubit in enumerate(qubits)}
+        block_qubits = self.site_qubits[start:start + k]
+        in_axes = [k + axis_of[q] for q in block_qubits]
+        theta = np.tensordot(gate, theta, axes=(in_axes, list(range(1, k + 1))))
+        # 결과 축: 게이트 출력 k개 (축 a) + χ_l + χ_r → (χ_l, 블록 순서 출력들, χ_r)
+        theta = theta.transpose([k] + [axis_of[q] for q in block_qubits] + [k + 1])
+        self._split_block(theta, start)
+
+    def apply_gate(self, gate):
+        """QuantumGate 하나 적용 (행렬로 표현할 수 있는 게이트만)"""
+        from .optimizer import gate_unitary
+        unitary = gate_unitary(gate)
+        if unitary is None:
+            raise ValueError(f"Unsupported gate for MPS simulation: {gate.name}")
+        qubits, matrix = unitary
+        self.apply_unitary(matrix, qubits)
+
+    # === 측정 ===
+
+    def measure(self, qubit: int) -> int:
+        """큐빗 측정 후 상태 붕괴"""
+        site = self.qubit_sites[qubit]
+        self._move_center(site)
+        tensor = self.sites[site]
+        weights = np.sum(np.abs(tensor)**2, axis=(0, 2))
+        prob_zero = weights[0] / weights.sum()
+        result = 0 if np.random.random() < prob_zero else 1
+        probability = prob_zero if result == 0 else 1.0 - prob_zero
+        tensor = tensor.copy()
+        tensor[:, 1 - result, :] = 0
+        self.sites[site] = tensor / np.sqrt(probability * weights.sum())
+        return result
+
+    def sample_counts(self, shots: int, qubits: List[int] = None) -> Dict[int, int]:
+        """상태를 붕괴시키지 않고 shots번 샘플링한 히스토그램 (qubits[j]가 j번째 비트)
+
+        직교 중심을 첫 사이트로 옮기면 오른쪽이 모두 right-orthonormal이므로, 사이트를 왼쪽부터
+        조건부 확률로 하나씩 뽑으면 정확한 샘플이 된다 (샷들은 행렬 곱 한 번에 같이 진행).
+        """
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        self._move_center(0)
+        last_site = max(self.qubit_sites[q] for q in qubits)
+        position = {qubit: j for j, qubit in enumerate(qubits)}
+
+        counts = Counter()
+        for start in range(0, shots, SAMPLE_BATCH_SIZE):
+            batch = min(SAMPLE_BATCH_SIZE, shots - start)
+            environment = np.ones((batch, 1), dtype=self.dtype)
+            bits = np.zeros((batch, len(qubits)), dtype=np.int64)
+            for site in range(last_site + 1):
+                tensor = self.sites[site]
+                branch_zero = environment @ tensor[:, 0, :]
+                branch_one = environment @ tensor[:, 1, :]
+                weight_zero = np.sum(np.abs(branch_zero)**2, axis=1)
+                weight_one = np.sum(np.abs(branch_one)**2, axis=1)
+                ones = np.random.random(batch) * (weight_zero + weight_one) >= weight_zero
+                chosen = np.where(ones[:, None], branch_one, branch_zero)
+                environment = chosen / np.sqrt(np.where(ones, weight_one, weight_zero))[:, None]
+                qubit = self.site_qubits[site]
+                if qubit in position:
+                    bits[:, position[qubit]] = ones
+            counts.update(bit_rows_to_indices(bits))
+        return dict(sorted(counts.items()))
+
+    def marginal_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """측정 큐빗들의 결과 확률 (길이 2^k, qubits[j]가 j번째 비트)
+
+        결과 가지마다 축소 밀도 환경 (χ x χ)을 왼쪽부터 전파한다 (측정하지 않는 사이트는 합산).
+        """
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        self._move_center(0)
+        last_site = max(self.qubit_sites[q] for q in qubits)
+        position = {qubit: j for j, qubit in enumerate(qubits)}
+
+        environments = np.ones((1, 1, 1), dtype=self.dtype)
+        keys = np.zeros(1, dtype=np.int64)
+        for site in range(last_site + 1):
+            tensor = self.sites[site]
+            branches = [np.einsum('kij,ia,jb->kab', environments, tensor[:, b, :].conj(), tensor[:, b, :])
+                        for b in (0, 1)]
+            qubit = self.site_qubits[site]
+            if qubit in position:
+                environments = np.concatenate(branches)
+                keys = np.concatenate([keys, keys | (1 << position[qubit])])
+            else:
+                environments = branches[0] + branches[1]
+
+        probabilities = np.zeros(1 << len(qubits))
+        probabilities[keys] = np.einsum('kii->k', environments).real
+        return probabilities / probabilities.sum()
+
+    def pauli_expectations(self, flip_mask: int, phase_masks: List[int]) -> np.ndarray:
+        """위상 마스크마다 ⟨X^x Z^z⟩ (x = flip_mask, z = 위상 마스크, k번째 비트가 큐빗 k)
+
+        직교 중심을 첫 사이트로 옮기고 연산자가 있는 마지막 사이트까지만 전달 행렬 (χ x χ)을 전파한다
+        (그 오른쪽은 right-orthonormal이라 항등).
+        """
+        self._move_center(0)
+        norm = float(np.vdot(self.sites[0], self.sites[0]).real)
+        values = []
+        for phase_mask in phase_masks:
+            support = flip_mask | phase_mask
+            last_site = max((self.qubit_sites[q] for q in range(support.bit_length()) if (support >> q) & 1),
+                            default=-1)
+            environment = np.ones((1, 1), dtype=self.dtype)
+            for site in range(last_site + 1):
+                qubit = self.site_qubits[site]
+                operator = _FLIP_PHASE_OPERATORS[(flip_mask >> qubit) & 1][(phase_mask >> qubit) & 1]
+                tensor = self.sites[site]
+                environment = np.einsum('ij,iak,ab,jbl->kl', environment, tensor.conj(), operator, tensor)
+            values.append(np.trace(environment) / norm)
+        return np.array(values, dtype=complex)
+
+    # === 얽힘 ===
+
+    def schmidt_coefficients(self, qubits: List[int]):
+        """qubits가 사이트 순서로 앞쪽 또는 뒤쪽 연속 구간이면 그 결합의 슈미트 계수 (내림차순, 아니면 None)
+
+        직교 중심을 결합 왼쪽 사이트로 옮기면 그 사이트 텐서의 특이값이 곧 슈미트 계수다 (O(χ^3)).
+        """
+        n = self.n_qubits
+        sites = sorted(self.qubit_sites[q] for q in qubits)
+        k = len(sites)
+        if k == 0 or k == n:
+            return np.ones(1)
+        if sites == list(range(k)):
+            bond = k
+        elif sites == list(range(n - k, n)):
+            bond = n - k
+        else:
+            return None
+        self._move_center(bond - 1)
+        site = self.sites[bond - 1]
+        left, _, right = site.shape
+        coefficients = np.linalg.svd(site.reshape(left * 2, right), compute_uv=False)
+        return coefficients / np.linalg.norm(coefficients)
+
+    def reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """qubits 부분계의 축소 밀도 행렬 (2^k x 2^k, qubits[j]가 행/열 인덱스의 j번째 비트)
+
+        직교 중심을 첫 사이트로 옮기고 부분계의 마지막 사이트까지 환경 (2^m, 2^m, χ, χ)을 전파한다
+        (부분계 사이트는 열어 두고 나머지는 합산, 오른쪽은 right-orthonormal이라 항등). O(n 4^k χ^3).
+        """
+        qubits = list(qubits)
+        k = len(qubits)
+        if k == 0:
+            return np.ones((1, 1), dtype=self.dtype)
+        self._move_center(0)
+        members = set(qubits)
+        last_site = max(self.qubit_sites[q] for q in qubits)
+
+        environment = np.ones((1, 1, 1, 1), dtype=self.dtype)
+        open_qubits = []  # 열린 인덱스 큐빗 (사이트 순서, 앞쪽이 상위 비트)
+        for site in range(last_site + 1):
+            tensor = self.sites[site]
+            qubit = self.site_qubits[site]
+            if qubit in members:
+                environment = np.einsum('abij,isk,jtl->asbtkl', environment, tensor, tensor.conj())
+                d = environment.shape[0] * 2
+                environment = environment.reshape(d, d, tensor.shape[2], tensor.shape[2])
+                open_qubits.append(qubit)
+            else:
+                environment = np.einsum('abij,isk,jsl->abkl', environment, tensor, tensor.conj())
+        density = np.einsum('abii->ab', environment).reshape([2] * (2 * k))
+
+        # 큰 축이 상위 비트인 reshape 순서: qubits[k-1], ..., qubits[0]
+        axes = [open_qubits.index(q) for q in reversed(qubits)]
+        density = density.transpose(axes + [k + axis for axis in axes]).reshape(1 << k, 1 << k)
+        return density / np.trace(density).real
+
+    # === 상태 벡터 변환 ===
+
+    def write_state_vector(self, state_vector: np.ndarray, chunk_size: int = None):
+        """0으로 초기화된 상태 벡터에 이 상태의 진폭 채우기 (memmap도 그대로 사용)
+
+        MPS 축약 결과는 메모리에 한 번 만들어지므로 chunk_size는 쓰지 않는다.
+        """
+        state_vector[:] = self.to_state_vector()
+
+    def to_state_vector(self) -> np.ndarray:
+        """전체 상태 벡터로 변환 (작은 회로 검증용, little-endian)"""
+        theta = self._contract_block(0, self.n_qubits).reshape([2] * self.n_qubits)
+        # 사이트 축 s의 큐빗은 site_qubits[s]; big-endian reshape이므로 축 순서는 큐빗 n-1, ..., 0
+        theta = theta.transpose([self.qubit_sites[q] for q in reversed(range(self.n_qubits))])
+        return theta.reshape(-1)
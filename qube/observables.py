@@ -0,0 +1,118 @@
+"""
+observables.py - 파울리 문자열 기댓값
+
+관측량은 파울리 문자열의 가중합 H = Σ c_t P_t로 주고, 상태를 붕괴시키지 않고 ⟨ψ|H|ψ⟩를 계산한다.
+문자열의 k번째 문자가 큐빗 k에 작용한다 (I, X, Y, Z; 문자열이 짧으면 나머지 큐빗은 I).
+
+파울리 문자열은 비트 반전 마스크 x (X, Y 위치)와 위상 마스크 z (Z, Y 위치)로
+P|b⟩ = i^{|x&z|} (-1)^{|b&z|} |b ⊕ x⟩ 이므로
+⟨ψ|P|ψ⟩ = i^{|x&z|} Σ_b conj(ψ[b ⊕ x]) ψ[b] (-1)^{|b&z|} 이다.
+반전 마스크가 같은 항들(예: Z/I만으로 된 항 전부)은 conj(ψ[b ⊕ x]) ψ[b]를 공유하므로
+상태를 한 번만 훑어 위상 큐빗들에 대한 주변 합을 구한 뒤, 항마다 그 작은 벡터에 패리티 부호만 곱한다.
+
+terms = parse_pauli_terms({"ZZI": 1.0, "IZZ": 1.0, "XII": -0.5}, 3)
+energy = expectation_value(terms, lambda flip, phases: state_vector_expectations(state_vector, flip, phases))
+"""
+
+from collections import defaultdict
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from .kernels import flip_overlap_marginal
+
+
+PAULI_LETTERS = "IXYZ"
+
+# (계수, 반전 마스크 x, 위상 마스크 z) - 마스크의 k번째 비트가 큐빗 k
+PauliTerm = Tuple[float, int, int]
+
+
+def _pauli_masks(pauli: str, n_qubits: int) -> Tuple[int, int]:
+    """파울리 문자열 → (반전 마스크, 위상 마스크)"""
+    pauli = pauli.upper()
+    if len(pauli) > n_qubits:
+        raise ValueError(f"Pauli string '{pauli}' is longer than the circuit ({n_qubits} qubits)")
+    flip_mask = phase_mask = 0
+    for qubit, letter in enumerate(pauli):
+        if letter not in PAULI_LETTERS:
+            raise ValueError(f"Invalid Pauli letter '{letter}' in '{pauli}' (use I, X, Y, Z)")
+        if letter in "XY":
+            flip_mask |= 1 << qubit
+        if letter in "YZ":
+            phase_mask |= 1 << qubit
+    return flip_mask, phase_mask
+
+
+def parse_pauli_terms(pauli_terms, n_qubits: int) -> List[PauliTerm]:
+    """"XZIY" 문자열, {문자열: 계수} dict, 또는 (계수, 문자열) 쌍/문자열 목록 → PauliTerm 목록 (계수 생략은 1)"""
+    if isinstance(pauli_terms, str):
+        pairs = [(1.0, pauli_terms)]
+    elif isinstance(pauli_terms, dict):
+        pairs = [(coefficient, pauli) for pauli, coefficient in pauli_terms.items()]
+    else:
+        pairs = [(1.0, item) if isinstance(item, str) else item for item in pauli_terms]
+    terms = []
+    for coefficient, pauli in pairs:
+        if np.iscomplexobj(coefficient) and np.imag(coefficient) != 0:
+            raise ValueError(f"Pauli coefficients must be real, got {coefficient}")
+        terms.append((float(np.real(coefficient)), *_pauli_masks(pauli, n_qubits)))
+    return terms
+
+
+def mask_qubits(mask: int) -> List[int]:
+    """마스크에서 1인 비트의 큐빗 번호들 (오름차순)"""
+    return [qubit for qubit in range(mask.bit_length()) if (mask >> qubit) & 1]
+
+
+def mask_parities(values: np.ndarray, mask: int) -> np.ndarray:
+    """각 값의 (값 & mask) 비트 수 패리티 (0/1)"""
+    parity = np.zeros(values.shape, dtype=np.int64)
+    for qubit in mask_qubits(mask):
+        parity ^= (values >> qubit) & 1
+    return parity
+
+
+def _walsh_hadamard(vector: np.ndarray) -> np.ndarray:
+    """길이 2^k 벡터의 (정규화하지 않은) 월시-아다마르 변환: 결과[m] = Σ_l v[l] (-1)^{|l&m|}"""
+    k = vector.size.bit_length() - 1
+    tensor = vector.astype(complex).reshape((2,) * k)
+    for axis in range(k):
+        even, odd = np.take(tensor, 0, axis=axis), np.take(tensor, 1, axis=axis)
+        tensor = np.stack([even + odd, even - odd], axis=axis)
+    return tensor.reshape(-1)
+
+
+def state_vector_expectations(state_vector: np.ndarray, flip_mask: int, phase_masks: List[int],
+                              chunk_size: int = None) -> np.ndarray:
+    """반전 마스크가 같은 항들의 Σ_b conj(ψ[b ⊕ x]) ψ[b] (-1)^{|b&z|} (상태 벡터를 한 번만 훑음)"""
+    union = 0
+    for phase_mask in phase_masks:
+        union |= phase_mask
+    qubits = mask_qubits(union)
+    marginal = flip_overlap_marginal(state_vector, mask_qubits(flip_mask), qubits, chunk_size)
+
+    # 위상 마스크를 주변 합 인덱스 (qubits[j]가 j번째 비트)로 압축
+    local_masks = [sum(1 << j for j, qubit in enumerate(qubits) if (phase_mask >> qubit) & 1)
+                   for phase_mask in phase_masks]
+    if len(local_masks) > len(qubits):
+        # 항이 많으면 변환 한 번으로 모든 부호 패턴의 합을 구함 (k 2^k)
+        return _walsh_hadamard(marginal)[local_masks]
+    local = np.arange(marginal.size, dtype=np.int64)
+    return np.array([np.sum(marginal * (1 - 2 * mask_parities(local, mask))) for mask in local_masks])
+
+
+def expectation_value(terms: List[PauliTerm],
+                      group_expectations: Callable[[int, List[int]], np.ndarray]) -> float:
+    """Σ c_t ⟨P_t⟩ (group_expectations(x, [z...])는 반전 마스크 그룹마다 한 번 호출)"""
+    groups = defaultdict(list)
+    for coefficient, flip_mask, phase_mask in terms:
+        groups[flip_mask].append((coefficient, phase_mask))
+
+    total = 0.0
+    for flip_mask, group in groups.items():
+        values = group_expectations(flip_mask, [phase_mask for _, phase_mask in group])
+        for (coefficient, phase_mask), value in zip(group, values):
+            # Y = iXZ 이므로 Y 하나마다 i
+            total += coefficient * (1j ** bin(flip_mask & phase_mask).count("1") * value).real
+    return float(total)
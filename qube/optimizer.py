@@ -0,0 +1,325 @@
+"""
+optimizer.py - 양자 회로 최적화 패스
+
+QuantumCircuit.gates 리스트를 받아 시뮬레이션 전에 변환된 게이트 리스트를 반환한다.
+원본 게이트 리스트는 수정하지 않는다 (draw() 등은 원본을 그대로 사용).
+
+# 핍홀 최적화: H·H, X·X, CNOT·CNOT 상쇄, RZ(a)·RZ(b) → RZ(a+b), 항등 회전 제거
+optimized = peephole_optimize(circuit.gates)
+removed = len(circuit.gates) - len(optimized)
+
+# 게이트 퓨전: 같은 1~2큐빗에 연속 적용되는 게이트를 하나의 유니터리로 합치기
+fused = fuse_gates(circuit.gates, max_fused_width=2)
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .quantum import QuantumGate, QuantumSimulator, GATE_MATRICES, rotation_matrix
+
+
+FUSED_GATE_NAME = "FUSED"
+
+# 같은 큐빗에 두 번 연속 적용하면 항등인 단일 큐빗 게이트 (제어 X/Z 계열은 이름으로 판별)
+SELF_INVERSE_GATES = frozenset({"H", "X", "Y", "Z"})
+
+# 계산 기저에서 대각인 단일 큐빗 게이트 (대각 게이트끼리는 교환 가능)
+DIAGONAL_GATES = frozenset({"I", "Z", "S", "T", "RZ"})
+
+ROTATION_GATES = ("RX", "RY", "RZ")
+
+# 상태 벡터 한 번 순회의 상대 비용 (단일 큐빗 게이트 = 1, 20큐빗에서 측정)
+# 제어 X는 진폭 교환, 제어 Z는 부호 반전만 하므로 일반 2큐빗 유니터리 순회보다 훨씬 싸다
+CONTROLLED_X_SWEEP_COST = 0.25
+CONTROLLED_Z_SWEEP_COST = 0.1
+TWO_QUBIT_SWEEP_COST = 1.8
+
+# 회전 각이 4π의 배수에서 이만큼 이내이면 항등으로 보고 제거 (2π는 전역 위상 -1이므로 유지)
+ROTATION_IDENTITY_TOLERANCE = 1e-12
+
+
+def gate_unitary(gate: QuantumGate, simulator: QuantumSimulator = None) -> Optional[Tuple[List[int], np.ndarray]]:
+    """게이트의 (큐빗 리스트, 로컬 유니터리 행렬) 반환. 행렬로 표현할 수 없으면 None
+
+    로컬 인덱스는 little-endian: 큐빗 리스트의 j번째 큐빗이 j번째 비트.
+    고정 게이트와 회전 행렬은 모듈 수준 공유 테이블/캐시에서 가져온다 (simulator 인자는 호환성을 위해 유지).
+    """
+    if gate.name == FUSED_GATE_NAME:
+        return list(gate.target_qubits), gate.matrix
+
+    if gate.is_parametric:
+        # 기호 매개변수 게이트는 bind 전까지 행렬이 없음 (퓨전 경계)
+        return None
+
+    if gate.name in GATE_MATRICES and not gate.control_qubits:
+        return [gate.target_qubits[0]], GATE_MATRICES[gate.name]
+
+    if gate.name in ["RX", "RY", "RZ"]:
+        return [gate.target_qubits[0]], rotation_matrix(gate.name[1], gate.parameters[0])
+
+    if gate.name == "CNOT" or (gate.name.endswith("X") and gate.control_qubits):
+        # 다중 제어 X: 제어 비트가 모두 1이면 타겟 비트(마지막 로컬 비트) 플립
+        qubits = list(gate.control_qubits) + [gate.target_qubits[0]]
+        dim = 1 << len(qubits)
+        controls_mask = (1 << (len(qubits) - 1)) - 1
+        target_bit = 1 << (len(qubits) - 1)
+        matrix = np.zeros((dim, dim), dtype=complex)
+        for col in range(dim):
+            row = col ^ target_bit if (col & controls_mask) == controls_mask else col
+            matrix[row, col] = 1
+        return qubits, matrix
+
+    if gate.name.lstrip("C") == "Z":
+        # CZ, CCZ, ...: 모든 비트가 1인 기저 상태만 -1
+        qubits = list(gate.control_qubits) + list(gate.target_qubits)
+        dim = 1 << len(qubits)
+        diagonal = np.ones(dim, dtype=complex)
+        diagonal[dim - 1] = -1
+        return qubits, np.diag(diagonal)
+
+    return None
+
+
+def _embed(matrix: np.ndarray, gate_qubits: List[int], block_qubits: List[int]) -> np.ndarray:
+    """gate_qubits에 작용하는 행렬을 block_qubits 전체 공간의 행렬로 확장"""
+    k = len(gate_qubits)
+    if gate_qubits == block_qubits[:k]:
+        return np.kron(np.eye(1 << (len(block_qubits) - k)), matrix)  # 하위 비트
+    if gate_qubits == block_qubits[len(block_qubits) - k:]:
+        return np.kron(matrix, np.eye(1 << (len(block_qubits) - k)))  # 상위 비트
+    positions = [block_qubits.index(q) for q in gate_qubits]
+    gate_mask = sum(1 << p for p in positions)
+    index = np.arange(1 << len(block_qubits))
+    local = sum(((index >> p) & 1) << j for j, p in enumerate(positions))
+    rest = index & ~gate_mask
+    # 게이트 밖 비트가 같은 (행, 열)만 게이트 행렬 원소, 나머지는 0
+    return np.where(rest[:, None] == rest[None, :], matrix[local[:, None], local[None, :]], 0).astype(complex)
+
+
+def sweep_cost(gate: QuantumGate) -> float:
+    """게이트 하나를 적용하는 상태 벡터 순회의 상대 비용 (단일 큐빗 게이트 = 1)"""
+    width = len(set(gate.control_qubits) | set(gate.target_qubits))
+    if gate.name == FUSED_GATE_NAME:
+        if width == 1 or _is_diagonal_matrix(gate.matrix):
+            return 1.0  # 대각 행렬은 위상만 곱함
+        return TWO_QUBIT_SWEEP_COST * 2**(width - 2)
+    if _is_controlled_x(gate):
+        return CONTROLLED_X_SWEEP_COST
+    if _is_controlled_z(gate):
+        return CONTROLLED_Z_SWEEP_COST
+    return 1.0
+
+
+def _is_diagonal_matrix(matrix: np.ndarray) -> bool:
+    return not np.any(matrix - np.diag(np.diag(matrix)))
+
+
+class _FusionBlock:
+    """퓨전 중인 게이트 묶음 (큐빗 리스트 + 누적 유니터리 + 원래 게이트들)"""
+    def __init__(self, qubits: List[int], matrix: np.ndarray, gate: QuantumGate):
+        self.qubits = qubits
+        self.matrix = matrix
+        self.gates = [gate]  # 합쳐진 원래 게이트들 (퓨전이 손해면 이걸 그대로 내보냄)
+
+    def absorb(self, qubits: List[int], matrix: np.ndarray, gates: List[QuantumGate]):
+        """뒤에 오는 게이트를 누적 행렬에 곱하기 (필요하면 블록 큐빗 확장)"""
+        new_qubits = self.qubits + [q for q in qubits if q not in self.qubits]
+        if new_qubits != self.qubits:
+            self.matrix = _embed(self.matrix, self.qubits, new_qubits)
+            self.qubits = new_qubits
+        if qubits != self.qubits:
+            matrix = _embed(matrix, qubits, self.qubits)
+        self.matrix = matrix @ self.matrix
+        self.gates.extend(gates)
+
+    def to_gates(self) -> List[QuantumGate]:
+        if len(self.gates) == 1:
+            # 하나짜리 블록은 원래 게이트 그대로 (전용 커널이 더 빠름)
+            return self.gates
+        fused = QuantumGate(FUSED_GATE_NAME, list(self.qubits), matrix=self.matrix,
+                            fused_names=[name for gate in self.gates for name in _source_names(gate)])
+        if len(self.qubits) > 1 and self._unfused_cost() <= sweep_cost(fused):
+            # 다중 큐빗 블록: 단일 큐빗 퓨전만 하고 제어 X/Z는 전용 커널로 두는 쪽이 싸면 그쪽
+            # (예: H·CNOT은 4x4 순회 한 번보다 단일 큐빗 순회 + 진폭 교환이 빠르다)
+            return fuse_gates(self.gates, max_fused_width=1)
+        return [fused]
+
+    def _unfused_cost(self) -> float:
+        """단일 큐빗 퓨전만 했을 때의 순회 비용 (큐빗별 단일 큐빗 게이트 연속 구간은 한 번)"""
+        cost = 0.0
+        in_run = set()  # 단일 큐빗 게이트 구간이 열려 있는 큐빗
+        for gate in self.gates:
+            qubits = set(gate.control_qubits) | set(gate.target_qubits)
+            if len(qubits) == 1:
+                if not qubits <= in_run:
+                    cost += 1.0
+                    in_run |= qubits
+            else:
+                cost += sweep_cost(gate)
+                in_run -= qubits
+        return cost
+
+
+def _source_names(gate: QuantumGate) -> List[str]:
+    """게이트가 나타내는 원래 게이트 이름들 (퓨전된 게이트는 합쳐진 게이트들)"""
+    return list(gate.fused_names) if gate.fused_names else [gate.name]
+
+
+def fuse_gates(gates: List[QuantumGate], max_fused_width: int = 2) -> List[QuantumGate]:
+    """같은 큐빗(최대 max_fused_width개)에 연속 작용하는 게이트들을 하나의 유니터리로 퓨전
+
+    서로 다른 큐빗에 작용하는 블록들은 교환 가능하므로 큐빗별로 열린 블록을 유지하고,
+    새 게이트가 블록과 겹치는데 합치면 폭을 초과하는 경우에만 해당 블록을 내보낸다.
+    다중 큐빗 블록은 sweep_cost로 따져 원래 게이트들(단일 큐빗 퓨전만 적용)보다 쌀 때만 합친다.
+    퓨전 후 상태 벡터 전체 순회 횟수는 출력 게이트 수와 같다.
+    """
+    if max_fused_width < 1:
+        return list(gates)
+
+    fused: List[QuantumGate] = []
+    open_blocks: List[_FusionBlock] = []
+    block_of: Dict[int, _FusionBlock] = {}  # 큐빗 -> 그 큐빗을 포함하는 열린 블록
+
+    def blocks_touching(qubits):
+        return list({id(block_of[q]): block_of[q] for q in qubits if q in block_of}.values())
+
+    def flush(blocks):
+        for block in blocks:
+            open_blocks.remove(block)
+            for q in block.qubits:
+                del block_of[q]
+            fused.extend(block.to_gates())
+
+    for gate in gates:
+        gate_qubits = set(gate.control_qubits) | set(gate.target_qubits)
+        unitary = gate_unitary(gate) if len(gate_qubits) <= max_fused_width else None
+        if unitary is None:
+            # 퓨전 불가 게이트: 겹치는 블록만 먼저 내보내고 그대로 추가
+            flush(blocks_touching(gate_qubits))
+            fused.append(gate)
+            continue
+
+        qubits, matrix = unitary
+        touching = blocks_touching(qubits)
+        union = set(qubits).union(*(block.qubits for block in touching))
+
+        if touching and len(union) <= max_fused_width:
+            # 겹치는 블록들을 하나로 합친 뒤 게이트 흡수 (서로 다른 큐빗 블록은 교환 가능)
+            block = touching[0]
+            for other in touching[1:]:
+                block.absorb(other.qubits, other.matrix, other.gates)
+                open_blocks.remove(other)
+            block.absorb(qubits, matrix, [gate])
+            for q in block.qubits:
+                block_of[q] = block
+        else:
+            flush(touching)
+            block = _FusionBlock(list(qubits), matrix, gate)
+            open_blocks.append(block)
+            for q in qubits:
+                block_of[q] = block
+
+    flush(list(open_blocks))
+    return fused
+
+
+# === 핍홀 최적화 ===
+
+def _is_controlled_x(gate: QuantumGate) -> bool:
+    return gate.name == "CNOT" or (gate.name.endswith("X") and bool(gate.control_qubits))
+
+
+def _is_controlled_z(gate: QuantumGate) -> bool:
+    return gate.name.lstrip("C") == "Z" and gate.name != "Z"
+
+
+def _is_diagonal(gate: QuantumGate) -> bool:
+    """계산 기저에서 대각인 게이트인지 (Z, S, T, RZ, CZ, CCZ, ...)"""
+    if gate.name in DIAGONAL_GATES:
+        return not gate.control_qubits
+    return _is_controlled_z(gate)
+
+
+def _is_identity(gate: QuantumGate) -> bool:
+    """I 게이트 또는 각도가 4π의 배수인 회전"""
+    if gate.name == "I":
+        return True
+    if gate.name not in ROTATION_GATES or gate.is_parametric or np.ndim(gate.parameters[0]) != 0:
+        return False
+    angle = float(gate.parameters[0]) % (4 * np.pi)
+    return min(angle, 4 * np.pi - angle) < ROTATION_IDENTITY_TOLERANCE
+
+
+def _cancels(first: QuantumGate, second: QuantumGate) -> bool:
+    """두 게이트를 연속 적용하면 항등인지 (자기 자신이 역원인 같은 게이트 쌍)"""
+    if first.name != second.name or first.matrix is not None or second.matrix is not None:
+        return False
+    if first.name in SELF_INVERSE_GATES and not first.control_qubits:
+        return first.target_qubits == second.target_qubits
+    if _is_controlled_x(first):
+        return (first.target_qubits == second.target_qubits
+                and set(first.control_qubits) == set(second.control_qubits))
+    if _is_controlled_z(first):
+        # 제어 Z는 큐빗에 대해 대칭이므로 큐빗 집합만 비교
+        return (set(first.control_qubits) | set(first.target_qubits)
+                == set(second.control_qubits) | set(second.target_qubits))
+    return False
+
+
+def _merge_rotations(first: QuantumGate, second: QuantumGate) -> Optional[QuantumGate]:
+    """같은 축, 같은 큐빗 회전 두 개를 각도 합 회전 하나로 (기호/배열 각도는 합치지 않음)"""
+    if first.name != second.name or first.name not in ROTATION_GATES:
+        return None
+    if first.target_qubits != second.target_qubits or first.is_parametric or second.is_parametric:
+        return None
+    angles = first.parameters[0], second.parameters[0]
+    if np.ndim(angles[0]) != 0 or np.ndim(angles[1]) != 0:
+        return None
+    return QuantumGate(first.name, list(first.target_qubits), parameters=[float(angles[0]) + float(angles[1])])
+
+
+def peephole_optimize(gates: List[QuantumGate]) -> List[QuantumGate]:
+    """역원 쌍 상쇄, 같은 축 회전 병합, 항등 회전 제거
+
+    새 게이트마다 같은 큐빗을 건드리는 이전 게이트를 최근 것부터 거슬러 올라가며 짝을 찾는다.
+    대각 게이트는 다른 대각 게이트를 건너뛸 수 있으므로 Z·CZ·Z나 RZ·CCZ·RZ도 상쇄/병합되고,
+    상쇄된 게이트는 사라지므로 H·X·X·H 같은 중첩 쌍도 한 번의 순회로 모두 지워진다.
+    """
+    optimized: List[Optional[QuantumGate]] = []
+    by_qubit: Dict[int, List[int]] = {}  # 큐빗별로 그 큐빗을 건드리는 optimized 인덱스 (오름차순)
+
+    for gate in gates:
+        if _is_identity(gate):
+            continue
+        qubits = list(dict.fromkeys(list(gate.control_qubits) + list(gate.target_qubits)))
+        for qubit in qubits:
+            stack = by_qubit.setdefault(qubit, [])
+            while stack and optimized[stack[-1]] is None:
+                stack.pop()
+
+        absorbed = False
+        previous = None
+        for index in heapq.merge(*(reversed(by_qubit[q]) for q in qubits), reverse=True):
+            if index == previous or optimized[index] is None:
+                continue
+            previous = index
+            other = optimized[index]
+            if _cancels(other, gate):
+                optimized[index] = None
+                absorbed = True
+                break
+            merged = _merge_rotations(other, gate)
+            if merged is not None:
+                optimized[index] = None if _is_identity(merged) else merged
+                absorbed = True
+                break
+            if not (_is_diagonal(gate) and _is_diagonal(other)):
+                break
+
+        if not absorbed:
+            for qubit in qubits:
+                by_qubit[qubit].append(len(optimized))
+            optimized.append(gate)
+
+    return [gate for gate in optimized if gate is not None]
@@ -0,0 +1,68 @@
+"""
+output.py - 인터프리터 출력 sink
+
+인터프리터의 모든 출력은 OutputSink를 거친다. 메시지마다 수준(USER, INFO, DEBUG)이 있고
+sink의 verbosity보다 높은 수준의 메시지는 버린다. 끈 수준의 메시지는 문자열 대신 문자열을 만드는
+함수로 넘기면 포맷 비용도 들지 않는다. 남은 출력은 버퍼에 모았다가 buffer_size를 넘거나
+flush()할 때 한 번에 쓴다 (인터프리터는 run()이 끝날 때 flush).
+
+output = OutputSink(verbosity=QUIET)                 # println/print 출력만
+output.write("hello\n")                              # USER
+output.line(f"회로 생성: {name}")                     # INFO - QUIET에서는 버림
+output.line(lambda: f"확률 {probabilities}", DEBUG)  # DEBUG일 때만 포맷
+output.flush()
+"""
+
+import sys
+from typing import Callable, List, TextIO, Union
+
+
+# 출력 수준 (sink verbosity 이하인 메시지만 출력)
+SILENT = -1  # 아무것도 출력하지 않음 (병렬 시행 워커)
+USER = 0     # 사용자 코드의 println/print, draw_circuit/circuit_stats 표
+INFO = 1     # 회로 정의/생성, 측정 결과 등 진행 메시지
+DEBUG = 2    # 게이트별/반복별 메시지, 확률 덤프
+
+QUIET = USER
+
+VERBOSITY_LEVELS = {"silent": SILENT, "quiet": QUIET, "normal": INFO, "debug": DEBUG}
+
+# 기본 버퍼 크기 (문자 수, 넘으면 스트림에 씀)
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class OutputSink:
+    """수준별로 거르고 버퍼링하는 출력 sink (stream이 None이면 flush할 때의 sys.stdout)"""
+    def __init__(self, stream: TextIO = None, verbosity: int = INFO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.verbosity = verbosity
+        self.buffer_size = buffer_size
+        self._chunks: List[str] = []
+        self._buffered = 0
+
+    def enabled(self, level: int) -> bool:
+        return level <= self.verbosity
+
+    def write(self, text: str, level: int = USER):
+        """text를 그대로 출력 (줄바꿈 없음)"""
+        if level > self.verbosity or not text:
+            return
+        self._chunks.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def line(self, message: Union[str, Callable[[], str]], level: int = INFO):
+        """한 줄 출력 (message가 함수면 켜진 수준일 때만 호출해 문자열을 만듦)"""
+        if level > self.verbosity:
+            return
+        self.write((message() if callable(message) else message) + "\n", level)
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self._chunks:
+            text = "".join(self._chunks)
+            self._chunks.clear()
+            self._buffered = 0
+            stream.write(text)
+        stream.flush()
@@ -0,0 +1,194 @@
+"""
+parallel.py - 프로세스 풀 병렬 실행
+
+서로 독립적인 회로 인스턴스 생성(시행)과 샷 배치를 ProcessPoolExecutor로 나눠 실행한다.
+시행/배치마다 미리 정한 시드를 쓰고 결과를 키 순서로 합치므로 워커 수와 관계없이
+같은 결과가 나온다 (부모 프로세스에서 np.random.seed를 고정하면 재현 가능).
+
+# "Grover" 회로 정의를 1000번 인스턴스화하고 측정한 히스토그램
+counts = run_circuit_trials(interpreter, "Grover", 1000, workers=8)
+
+# 회로 하나에서 10^7 샷을 배치로 나눠 샘플링
+counts = sample_shot_batches(circuit, 10**7, workers=8)
+"""
+
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+from .cache import StateCache
+from .kernels import sample_counts
+from .output import OutputSink, SILENT
+
+
+# 샷 배치 크기 (워커 수가 아니라 이 크기로 나눠야 워커 수와 무관하게 결과가 같음)
+SHOT_BATCH_SIZE = 1 << 20
+
+# 시행 배치 하나에 묶는 최대 시행 수 (작업 직렬화 오버헤드 분산)
+TRIAL_BATCH_SIZE = 64
+
+
+def resolve_workers(workers: int = None) -> int:
+    """워커 수 결정 (None 또는 0이면 CPU 코어 수)"""
+    if not workers:
+        return os.cpu_count() or 1
+    if workers < 0:
+        raise ValueError(f"workers must be non-negative, got {workers}")
+    return workers
+
+
+def interpreter_snapshot(interpreter) -> dict:
+    """워커 프로세스에서 회로를 다시 인스턴스화하는 데 필요한 인터프리터 상태
+
+    회로/함수/클래스 정의와 직렬화 가능한 전역 변수만 포함한다
+    (양자 회로 값은 상태 벡터가 커서 제외).
+    """
+    variables = {}
+    for name, value in interpreter.variables.items():
+        if value.type_name == "quantum_circuit":
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        variables[name] = value
+
+    return {
+        "circuits": dict(interpreter.circuits),
+        "functions": dict(interpreter.functions),
+        "classes": dict(interpreter.classes),
+        "variables": variables,
+        "options": {
+            "precision": interpreter.precision,
+            "storage": interpreter.storage,
+            "scratch_dir": interpreter.scratch_dir,
+            "memory_budget": interpreter.memory_budget,
+            "backend": interpreter.backend,
+            "max_bond_dimension": interpreter.max_bond_dimension,
+            "truncation_threshold": interpreter.truncation_threshold,
+            "peephole": interpreter.peephole,
+            "profile": interpreter.profile,
+            # 캐시 내용은 프로세스마다 따로 채우고 용량 설정만 전달
+            "circuit_cache": None if interpreter.circuit_cache is None else StateCache(interpreter.circuit_cache.max_bytes),
+        },
+    }
+
+
+def _restore_interpreter(snapshot: dict):
+    from .interpreter import QubeInterpreter
+
+    interpreter = QubeInterpreter()
+    interpreter.circuits.update(snapshot["circuits"])
+    interpreter.functions.update(snapshot["functions"])
+    interpreter.classes.update(snapshot["classes"])
+    interpreter.variables.update(snapshot["variables"])
+    for name, value in snapshot["options"].items():
+        setattr(interpreter, name, value)
+    return interpreter
+
+
+@contextmanager
+def _seeded(seed: int):
+    """전역 난수 상태를 seed로 고정했다가 복원 (현재 프로세스에서 실행돼도 호출자의 난수열에 영향 없음)"""
+    python_state, numpy_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(python_state)
+        np.random.set_state(numpy_state)
+
+
+def _run_trial_batch(snapshot: dict, circuit_name: str, seeds: List[int], qubits) -> Dict[int, int]:
+    """시행 배치 실행 (워커 프로세스): 시드마다 회로를 새로 인스턴스화하고 1샷 측정"""
+    interpreter = _restore_interpreter(snapshot)
+    # 시행마다 나오는 회로 생성/측정 메시지는 만들지도 않음
+    interpreter.output = OutputSink(verbosity=SILENT)
+    counts = {}
+    for seed in seeds:
+        with _seeded(seed):
+            circuit = interpreter._create_circuit_instance(circuit_name).value
+            trial_qubits = list(range(circuit.n_qubits)) if qubits is None else qubits
+            trial_counts = circuit.sample_counts(1, trial_qubits)
+        for outcome, count in trial_counts.items():
+            counts[outcome] = counts.get(outcome, 0) + count
+    return counts
+
+
+def _sample_batch(probabilities: np.ndarray, shots: int, seed: int) -> Dict[int, int]:
+    """샷 배치 샘플링 (워커 프로세스)"""
+    with _seeded(seed):
+        return sample_counts(probabilities, shots)
+
+
+def _sample_backend_batch(state, qubits: List[int], shots: int, seed: int) -> Dict[int, int]:
+    """스태빌라이저/MPS/희소 상태에서 샷 배치 샘플링 (워커 프로세스)"""
+    with _seeded(seed):
+        return state.sample_counts(shots, qubits)
+
+
+def _merge_counts(partials) -> Dict[int, int]:
+    merged = {}
+    for partial in partials:
+        for outcome, count in partial.items():
+            merged[outcome] = merged.get(outcome, 0) + count
+    return dict(sorted(merged.items()))
+
+
+def _map_tasks(func, tasks: List[tuple], workers: int) -> list:
+    """작업 목록 실행 (워커가 1이면 현재 프로세스에서 순서대로)"""
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+
+def run_circuit_trials(interpreter, circuit_name: str, trials: int, workers: int = 1,
+                       qubits: List[int] = None) -> Dict[int, int]:
+    """회로 정의를 trials번 독립적으로 인스턴스화하고 측정한 결과 히스토그램
+
+    키는 측정 큐빗들의 비트열 정수 (qubits[j]가 j번째 비트, 생략하면 전체 큐빗).
+    회로 본문의 중간 측정도 시행마다 고정된 시드로 실행된다.
+    """
+    if trials < 1:
+        raise ValueError(f"trials must be positive, got {trials}")
+    if circuit_name not in interpreter.circuits:
+        raise ValueError(f"Unknown circuit: {circuit_name}")
+
+    seeds = np.random.randint(0, 2**31, size=trials).tolist()
+    snapshot = interpreter_snapshot(interpreter)
+    tasks = [(snapshot, circuit_name, seeds[start:start + TRIAL_BATCH_SIZE], qubits)
+             for start in range(0, trials, TRIAL_BATCH_SIZE)]
+    return _merge_counts(_map_tasks(_run_trial_batch, tasks, resolve_workers(workers)))
+
+
+def sample_shot_batches(circuit, shots: int, workers: int = 1, qubits: List[int] = None) -> Dict[int, int]:
+    """회로의 현재 상태에서 shots번 샘플링 (SHOT_BATCH_SIZE 배치로 나눠 병렬 처리)
+
+    상태 벡터 회로는 주변 확률을 부모 프로세스에서 한 번만 계산해 워커에 전달하므로
+    중간 측정으로 붕괴된 상태도 그대로 샘플링된다. 스태빌라이저/MPS/희소 백엔드는 2^k 주변 확률 대신
+    백엔드 상태를 넘기고 배치마다 그 상태의 sample_counts를 호출한다.
+    """
+    if shots < 1:
+        raise ValueError(f"shots must be positive, got {shots}")
+    if qubits is None:
+        qubits = list(range(circuit.n_qubits))
+
+    batch_sizes = [min(SHOT_BATCH_SIZE, shots - start) for start in range(0, shots, SHOT_BATCH_SIZE)]
+    seeds = np.random.randint(0, 2**31, size=len(batch_sizes)).tolist()
+    if circuit.active_backend != "statevector":
+        for qubit in qubits:
+            circuit._check_qubit(qubit)
+        state = circuit._simulation_state()
+        tasks = [(state, qubits, size, seed) for size, seed in zip(batch_sizes, seeds)]
+        return _merge_counts(_map_tasks(_sample_backend_batch, tasks, resolve_workers(workers)))
+
+    probabilities = circuit.marginal_probabilities(qubits)
+    tasks = [(probabilities, size, seed) for size, seed in zip(batch_sizes, seeds)]
+    return _merge_counts(_map_tasks(_sample_batch, tasks, resolve_workers(workers)))
@@ -23,11 +23,12 @@ class Program(ASTNode):
 
 # 🆕 양자 회로 관련 AST 노드들
 class CircuitDefinition(ASTNode):
-    """circuit 정의: circuit Bell(2) { ... }"""
-    def __init__(self, name: str, n_qubits: int, body: List[ASTNode]):
+    """circuit 정의: circuit Bell(2) { ... }, circuit Ansatz(2, theta, gamma) { ... }"""
+    def __init__(self, name: str, n_qubits: int, body: List[ASTNode], parameters: List[str] = None):
         self.name = name
         self.n_qubits = n_qubits
         self.body = body
+        self.parameters = parameters or []  # 기호 매개변수 이름들 (회전 각도)
 
 class CircuitInstantiation(ASTNode):
     """회로 인스턴스화: circuit = Bell(2)"""
@@ -398,10 +399,15 @@ class QubeParser:
         circuit_name = self._current_token().value
         self._advance()
         
-        # 매개변수 (큐빗 개수)
+        # 매개변수 (큐빗 개수, 이어서 선택적인 각도 매개변수 이름들)
         self._expect(TokenType.LPAREN)
         n_qubits = int(self._current_token().value)
         self._advance()
+        parameters = []
+        while self._current_token().type == TokenType.COMMA:
+            self._advance()
+            parameters.append(self._current_token().value)
+            self._expect(TokenType.IDENTIFIER)
         self._expect(TokenType.RPAREN)
         
         # 회로 본문
@@ -417,7 +423,7 @@ class QubeParser:
                 body.append(stmt)
         
         self._expect(TokenType.RBRACE)
-        return CircuitDefinition(circuit_name, n_qubits, body)
+        return CircuitDefinition(circuit_name, n_qubits, body, parameters)
     
     def _parse_apply_statement(self) -> ApplyStatement:
         """apply 문 파싱: 범위 문법 지원
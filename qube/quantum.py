@@ -11,24 +11,189 @@ circuit.set_debug(False)  # 비활성화
 
 # N큐빗 제어 Z 게이트 사용
 circuit.controlled_z_n(0, 1, 2, 3, 4)  # 5큐빗 제어 Z
+
+# 지연 모드: 게이트는 기록만 하고 상태 벡터는 처음 관측할 때 시뮬레이션
+lazy_circuit = QuantumCircuit(20, lazy=True)
+
+# 단정밀도 (complex64): 상태 벡터 메모리 절반
+single_circuit = QuantumCircuit(24, precision="single")
+
+# 메모리 매핑: 상태 벡터를 스크래치 파일에 두고 메모리 예산(바이트) 단위 청크로 처리
+big_circuit = QuantumCircuit(32, storage="memmap", scratch_dir="/scratch", memory_budget=512 * 2**20)
+
+# 스태빌라이저 백엔드: Clifford 회로는 수천 큐빗도 다항 시간으로 측정/샘플링
+ghz = QuantumCircuit(1000, backend="stabilizer").h(0)
+for q in range(999):
+    ghz.cnot(q, q + 1)
+counts = ghz.sample_counts(1000, [0, 999])
+
+# MPS 백엔드: 얽힘이 적은 1D 회로는 100큐빗도 결합 차원 상한 안에서 시뮬레이션
+chain = QuantumCircuit(100, backend="mps", max_bond_dimension=32)
+for q in range(99):
+    chain.h(q).cnot(q, q + 1)
+counts = chain.sample_counts(1000)
+print(chain.truncation_error)  # 절단으로 버린 확률 질량 (0이면 정확)
+
+# 희소 백엔드: 기저 상태만 옮기는 오라클 회로는 0이 아닌 진폭만 저장
+oracle = QuantumCircuit(40, backend="sparse").x(0).cnot(0, 39).ccz(0, 39, 5)
+
+# 기호 매개변수: 한 번 컴파일하고 값만 바꿔 여러 번 bind
+theta = Parameter("theta")
+ansatz = QuantumCircuit(2, lazy=True).h(0).ry(theta, 1).cnot(0, 1).rz(2 * theta, 1)
+compiled = ansatz.compile()
+for value in np.linspace(0, np.pi, 16):
+    state = compiled.bind({"theta": value}).get_state_vector()
+
+# 프로파일링: 게이트 종류별 호출 수, 누적 시간, 접근 바이트 (끄면 게이트 경로에 추가 비용 없음)
+profiled = QuantumCircuit(16, profile=True).h(0).cnot(0, 1)
+print(profiled.stats()["gates"]["CNOT"])    # {"count": 1, "time": ..., "bytes": ...}
+
+# 트레이스: 게이트마다 구조화된 기록 (끄면 tracer=None이라 메시지 포맷/확률 계산이 전혀 없음)
+tracer = Tracer()
+traced = QuantumCircuit(8, tracer=tracer).h(0).cnot(0, 1)
+print(tracer.records[-1].name, tracer.records[-1].qubits)   # CNOT (0, 1)
 """
 
 import numpy as np
-from typing import Dict, Any, Union, List, Tuple
+from typing import Callable, Dict, Any, Union, List, Tuple
 import cmath
+import numbers
+import tempfile
+import time
+from functools import lru_cache, partial
+from types import MappingProxyType
+
+from .tracing import Tracer, print_record
+from .kernels import (apply_single_qubit_gate, apply_controlled_x, apply_controlled_phase,
+                      apply_multi_qubit_gate, marginal_probabilities, sample_counts,
+                      qubit_probability, collapse_qubit, measure_qubit, scale_state,
+                      state_marginal_probabilities, state_norm,
+                      reduced_density_matrix, schmidt_coefficients, subsystem_purity, _smaller_side)
+
+# 상태 벡터 정밀도: "double" = complex128 (기본), "single" = complex64
+PRECISIONS = {
+    "double": np.complex128,
+    "single": np.complex64,
+}
+
+
+# 상태 벡터 저장 방식: "memory" = 일반 ndarray, "memmap" = 스크래치 파일에 매핑된 np.memmap
+STORAGES = ("memory", "memmap")
+
+# 시뮬레이션 백엔드: "auto" = Clifford 회로의 측정/샘플링은 스태빌라이저 테이블, 그 외 상태 벡터
+# "statevector" = 항상 상태 벡터, "stabilizer" = Clifford 게이트만 허용하고 테이블로 측정/샘플링
+# "mps" = 행렬곱 상태 (결합 차원 상한으로 절단하는 근사, 얽힘이 적은 1D 회로용)
+# "sparse" = 0이 아닌 진폭만 저장 (오라클 위주 회로용, 채움 비율이 커지면 상태 벡터로 전환)
+BACKENDS = ("auto", "statevector", "stabilizer", "mps", "sparse")
+
+# 스태빌라이저/MPS 백엔드 상태를 상태 벡터로 내보낼 수 있는 최대 큐빗 수 (complex128이면 1 GiB)
+MAX_EXPORT_QUBITS = 26
+
+# MPS/희소 백엔드 상태에서 축소 밀도 행렬 (4^k 원소)을 만들 수 있는 최대 부분계 큐빗 수
+MAX_REDUCED_QUBITS = 12
+
+# 게이트 퓨전을 하는 최소 큐빗 수: 이보다 작은 상태 벡터는 게이트 하나 적용이 퓨전 패스의 게이트당 비용
+# (수십 µs)보다 싸서 퓨전이 오히려 느리다 (한 번 퓨전해 여러 번 bind하는 컴파일된 회로는 예외)
+FUSION_MIN_QUBITS = 14
+
+# memmap 저장 시 memory_budget을 지정하지 않았을 때의 기본 메모리 예산 (바이트)
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+
+def _norm_tolerance(dtype) -> float:
+    """정규화 검사 허용 오차 (단정밀도는 반올림 오차가 커서 완화)"""
+    return 1e-5 if np.dtype(dtype) in (np.complex64, np.float32) else 1e-10
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """공유 테이블용 읽기 전용 배열"""
+    array.setflags(write=False)
+    return array
+
+
+# 이름이 있는 상태들 (모든 QuantumSimulator가 공유, create_qubit은 복사본을 반환)
+PREDEFINED_STATES = MappingProxyType({
+    "|0⟩": _frozen(np.array([1.0, 0.0])),
+    "|1⟩": _frozen(np.array([0.0, 1.0])),
+    "|+⟩": _frozen(np.array([1/np.sqrt(2), 1/np.sqrt(2)])),
+    "|-⟩": _frozen(np.array([1/np.sqrt(2), -1/np.sqrt(2)])),
+    "|+i⟩": _frozen(np.array([1/np.sqrt(2), 1j/np.sqrt(2)])),
+    "|-i⟩": _frozen(np.array([1/np.sqrt(2), -1j/np.sqrt(2)])),
+    
+    # Multi-qubit states
+    "|00⟩": _frozen(np.array([1.0, 0.0, 0.0, 0.0])),
+    "|01⟩": _frozen(np.array([0.0, 1.0, 0.0, 0.0])),
+    "|10⟩": _frozen(np.array([0.0, 0.0, 1.0, 0.0])),
+    "|11⟩": _frozen(np.array([0.0, 0.0, 0.0, 1.0])),
+    
+    # Bell states
+    "|Φ+⟩": _frozen(np.array([1/np.sqrt(2), 0.0, 0.0, 1/np.sqrt(2)])),
+    "|Φ-⟩": _frozen(np.array([1/np.sqrt(2), 0.0, 0.0, -1/np.sqrt(2)])),
+    "|Ψ+⟩": _frozen(np.array([0.0, 1/np.sqrt(2), 1/np.sqrt(2), 0.0])),
+    "|Ψ-⟩": _frozen(np.array([0.0, 1/np.sqrt(2), -1/np.sqrt(2), 0.0])),
+    
+    # 3-qubit states
+    "|000⟩": _frozen(np.array([1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0])),
+    "|GHZ⟩": _frozen(np.array([1/np.sqrt(2), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1/np.sqrt(2)])),
+    "|W⟩": _frozen(np.array([0.0, 1/np.sqrt(3), 1/np.sqrt(3), 0.0, 1/np.sqrt(3), 0.0, 0.0, 0.0])),
+})
+
+# 고정 단일 큐빗 게이트 행렬 (complex128, 읽기 전용)
+GATE_MATRICES = MappingProxyType({
+    'I': _frozen(np.array([[1, 0], [0, 1]], dtype=complex)),
+    'X': _frozen(np.array([[0, 1], [1, 0]], dtype=complex)),
+    'Y': _frozen(np.array([[0, -1j], [1j, 0]], dtype=complex)),
+    'Z': _frozen(np.array([[1, 0], [0, -1]], dtype=complex)),
+    'H': _frozen(np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)),
+    'S': _frozen(np.array([[1, 0], [0, 1j]], dtype=complex)),
+    'T': _frozen(np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex)),
+})
+
+# 회전 행렬 캐시 크기 ((축, 각도) 조합 수; 변분 회로의 각도 스윕도 충분히 담는 크기)
+ROTATION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=ROTATION_CACHE_SIZE)
+def _cached_rotation_matrix(axis: str, angle: float) -> np.ndarray:
+    half = angle / 2
+    if axis == 'X':
+        matrix = np.array([[np.cos(half), -1j*np.sin(half)],
+                           [-1j*np.sin(half), np.cos(half)]])
+    elif axis == 'Y':
+        matrix = np.array([[np.cos(half), -np.sin(half)],
+                           [np.sin(half), np.cos(half)]], dtype=complex)
+    elif axis == 'Z':
+        matrix = np.array([[np.exp(-1j*half), 0],
+                           [0, np.exp(1j*half)]])
+    else:
+        raise ValueError(f"Unknown rotation axis: {axis}")
+    return _frozen(matrix)
+
+
+def rotation_matrix(axis: str, angle: float) -> np.ndarray:
+    """RX/RY/RZ 회전 게이트 행렬 (읽기 전용, (축, 각도)별 LRU 캐시)"""
+    return _cached_rotation_matrix(axis.upper(), float(angle))
+
 
 class QuantumState:
-    def __init__(self, state_vector: np.ndarray, n_qubits: int = None):
+    def __init__(self, state_vector: np.ndarray, n_qubits: int = None, chunk_size: int = None):
         self.state_vector = state_vector
         self.n_qubits = n_qubits or int(np.log2(len(state_vector)))
+        self.chunk_size = chunk_size  # 커널 청크 크기 (진폭 수, None이면 한 번에 처리)
         self.is_measured = False
         self._validate_state()
     
     def _validate_state(self):
         """Validate that the state is normalized"""
-        norm = np.linalg.norm(self.state_vector)
-        if abs(norm - 1.0) > 1e-10:
-            self.state_vector = self.state_vector / norm
+        norm = state_norm(self.state_vector, self.chunk_size)
+        if abs(norm - 1.0) > _norm_tolerance(self.state_vector.dtype):
+            if isinstance(self.state_vector, np.memmap):
+                # memmap은 제자리에서 청크 단위로 (나누면 전체 크기의 RAM 배열이 생김)
+                scale_state(self.state_vector, 1.0 / norm, self.chunk_size)
+            else:
+                # 메모리 배열은 호출자 배열을 바꾸지 않도록 새 배열
+                # (스칼라 타입을 맞춰 나누면 complex64 상태가 complex128로 승격되지 않음)
+                self.state_vector = self.state_vector / self.state_vector.real.dtype.type(norm)
     
     def prob_zero(self) -> float:
         """Probability of measuring |0⟩ on the first qubit"""
@@ -42,22 +207,35 @@ class QuantumState:
             return abs(self.state_vector[1]) ** 2
         return 0.0
     
-    def purity(self) -> float:
-        """Calculate the purity of the quantum state"""
-        # For pure states, purity = 1
-        return 1.0  # Assuming pure states for now
+    def _state_bits(self, qubits: List[int]) -> List[int]:
+        """큐빗 번호 검사 (QuantumCircuit과 같은 little-endian: 큐빗 k는 인덱스의 k번째 비트)"""
+        for qubit in qubits:
+            if qubit < 0 or qubit >= self.n_qubits:
+                raise ValueError(f"Qubit index {qubit} out of range")
+        return list(qubits)
     
-    def entropy(self) -> float:
-        """Calculate von Neumann entropy"""
-        # For pure states, entropy = 0
-        return 0.0
+    def reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """qubits 부분계의 축소 밀도 행렬 (나머지 큐빗을 부분 대각합으로 제거, 2^k x 2^k)
+
+        QuantumCircuit.reduced_density_matrix와 같이 qubits[j]가 행/열 인덱스의 j번째 비트다.
+        """
+        return reduced_density_matrix(self.state_vector, self._state_bits(qubits), self.chunk_size)
+    
+    def purity(self, qubits: List[int] = None) -> float:
+        """qubits 부분계의 순도 Tr(ρ²) (None이면 전체 상태: 순수 상태이므로 1)"""
+        return subsystem_purity(self.state_vector, self._state_bits(qubits or []), self.chunk_size)
+    
+    def entropy(self, qubits: List[int] = None) -> float:
+        """qubits 부분계의 폰 노이만 엔트로피 -Σ λ log2 λ (비트, None이면 전체 상태: 0)"""
+        schmidt = schmidt_coefficients(self.state_vector, self._state_bits(qubits or []), self.chunk_size)
+        return _von_neumann_entropy(schmidt)
     
     def get_amplitudes(self) -> List[complex]:
         """Get the complex amplitudes"""
         return self.state_vector.tolist()
     
     def tensor_product(self, other: 'QuantumState') -> 'QuantumState':
-        """Compute tensor product with another quantum state"""
+        """Compute tensor product with another quantum state (other의 큐빗이 아래쪽 번호 0..m-1)"""
         new_state = np.kron(self.state_vector, other.state_vector)
         return QuantumState(new_state, self.n_qubits + other.n_qubits)
     
@@ -69,43 +247,20 @@ class QuantumState:
         if qubit_index >= self.n_qubits:
             raise ValueError(f"Qubit index {qubit_index} out of range")
         
-        # Calculate probabilities for the specified qubit
-        prob_0 = self._calculate_qubit_prob(qubit_index, 0)
-        
-        result = 0 if np.random.random() < prob_0 else 1
-        
-        # Collapse the state
-        self._collapse_state(qubit_index, result)
+        result = measure_qubit(self.state_vector, qubit_index, self.chunk_size)
         self.is_measured = True
         
         return result
     
     def _calculate_qubit_prob(self, qubit_index: int, value: int) -> float:
         """Calculate probability of measuring specific value on specific qubit"""
-        prob = 0.0
-        for i, amplitude in enumerate(self.state_vector):
-            binary_rep = format(i, f'0{self.n_qubits}b')
-            if int(binary_rep[qubit_index]) == value:
-                prob += abs(amplitude) ** 2
-        return prob
+        return qubit_probability(self.state_vector, qubit_index, value, self.chunk_size)
     
     def _collapse_state(self, qubit_index: int, measured_value: int):
         """Collapse the state after measurement"""
-        new_amplitudes = []
-        norm_factor = 0.0
-        
-        for i, amplitude in enumerate(self.state_vector):
-            binary_rep = format(i, f'0{self.n_qubits}b')
-            if int(binary_rep[qubit_index]) == measured_value:
-                new_amplitudes.append(amplitude)
-                norm_factor += abs(amplitude) ** 2
-            else:
-                new_amplitudes.append(0.0)
-        
-        # Normalize
-        norm_factor = np.sqrt(norm_factor)
-        if norm_factor > 0:
-            self.state_vector = np.array(new_amplitudes) / norm_factor
+        probability = qubit_probability(self.state_vector, qubit_index, measured_value, self.chunk_size)
+        if probability > 0:
+            collapse_qubit(self.state_vector, qubit_index, measured_value, probability, self.chunk_size)
     
     def __str__(self) -> str:
         """String representation of the quantum state"""
@@ -126,15 +281,92 @@ class QuantumState:
                         parts.append(f"({amp.real:.3f}+{amp.imag:.3f}i)|{binary}⟩")
             return " + ".join(parts)
 
+def _von_neumann_entropy(schmidt: np.ndarray) -> float:
+    """슈미트 계수 → 이분할 얽힘 엔트로피 (비트 단위)"""
+    weights = schmidt**2
+    weights = weights[weights > np.finfo(float).eps]  # 반올림 오차로 남은 0 근처 고윳값 제외
+    return float(max(0.0, -np.sum(weights * np.log2(weights))))
+
 # 🆕 양자 회로 빌더 클래스들
+class Parameter:
+    """기호 회전 각도 (bind 시점에 값이 정해지는 회로 매개변수)
+
+    scale * 값 + offset 형태의 1차식까지 표현하므로 RZ(2 * gamma), RX(-theta) 같은 각도도 기록할 수 있다.
+    """
+    def __init__(self, name: str, scale: float = 1.0, offset: float = 0.0):
+        self.name = name
+        self.scale = scale
+        self.offset = offset
+
+    def resolve(self, values: Dict[str, float]) -> float:
+        """매개변수 값 사전으로 실제 각도 계산"""
+        if self.name not in values:
+            raise ValueError(f"Unbound parameter: {self.name}")
+        return self.scale * float(values[self.name]) + self.offset
+
+    def _affine(self, scale: float, offset: float) -> 'Parameter':
+        return Parameter(self.name, self.scale * scale, self.offset * scale + offset)
+
+    def __mul__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        return self._affine(other, 0.0)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        return self._affine(1.0 / other, 0.0)
+
+    def __add__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        return self._affine(1.0, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        return self._affine(1.0, -other)
+
+    def __rsub__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        return self._affine(-1.0, other)
+
+    def __neg__(self):
+        return self._affine(-1.0, 0.0)
+
+    def __str__(self) -> str:
+        text = self.name if self.scale == 1 else f"{self.scale:g}*{self.name}"
+        if self.offset:
+            text += f"{self.offset:+g}"
+        return text
+
+    def __repr__(self) -> str:
+        return f"Parameter({self})"
+
+    def __format__(self, spec: str) -> str:
+        # draw()의 f"{angle:.2f}" 같은 숫자 포맷에서도 이름으로 표시
+        return str(self)
+
 class QuantumGate:
     """양자 게이트 표현 클래스"""
     def __init__(self, name: str, target_qubits: List[int], control_qubits: List[int] = None, 
-                 parameters: List[float] = None):
+                 parameters: List[float] = None, matrix: np.ndarray = None, fused_names: List[str] = None):
         self.name = name
         self.target_qubits = target_qubits
         self.control_qubits = control_qubits or []
         self.parameters = parameters or []
+        self.matrix = matrix  # 퓨전된 게이트의 유니터리 (target_qubits 순서, little-endian)
+        self.fused_names = list(fused_names or [])  # 퓨전된 게이트: 합쳐진 원래 게이트 이름들 (적용 순서)
+    
+    @property
+    def is_parametric(self) -> bool:
+        """기호 매개변수(Parameter)를 포함하는지 여부"""
+        return any(isinstance(p, Parameter) for p in self.parameters)
     
     def __str__(self) -> str:
         if self.control_qubits:
@@ -146,205 +378,395 @@ class QuantumGate:
 
 class QuantumCircuit:
     """양자 회로 빌더 클래스"""
-    def __init__(self, n_qubits: int, debug_mode: bool = False):
+    def __init__(self, n_qubits: int, debug_mode: bool = False, max_fused_width: int = 2,
+                 lazy: bool = False, precision: str = "double", storage: str = "memory",
+                 scratch_dir: str = None, memory_budget: int = None, backend: str = "auto",
+                 max_bond_dimension: int = 64, truncation_threshold: float = 1e-10,
+                 prune_threshold: float = 1e-12, max_fill_ratio: float = 1 / 16, peephole: bool = False,
+                 profile: bool = False, tracer: Tracer = None):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision} (choose from {', '.join(PRECISIONS)})")
+        if storage not in STORAGES:
+            raise ValueError(f"Unknown storage: {storage} (choose from {', '.join(STORAGES)})")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
+        if backend in ("stabilizer", "mps", "sparse"):
+            lazy = True  # 상태 벡터는 명시적으로 요청할 때만 할당
+        if max_bond_dimension < 1:
+            raise ValueError(f"max_bond_dimension must be positive, got {max_bond_dimension}")
         self.n_qubits = n_qubits
         self.debug_mode = debug_mode  # 🆕 DEBUG 제어
+        # 트레이스 기록기 (None이면 트레이스 비용 없음, debug_mode는 "DEBUG: ..."를 출력하는 기록기)
+        self.tracer = tracer if tracer is not None else (Tracer(sink=print_record) if debug_mode else None)
+        self.max_fused_width = max_fused_width  # 게이트 퓨전 최대 큐빗 수 (0이면 퓨전 안 함)
+        self.peephole = peephole  # 시뮬레이션 전에 역원 쌍 상쇄/회전 병합 패스 실행
+        self.gates_removed = 0  # 핍홀 최적화로 제거된 게이트 수 (누적)
+        self.profile = profile  # 게이트별 호출 수/시간/접근 바이트 기록 (stats())
+        self._profile = {}  # 게이트 이름 → [호출 수, 누적 시간(초), 접근 바이트]
+        self._fused_passes = 0  # 프로파일링 중 적용한 퓨전 게이트 수 (상태 벡터 순회 횟수)
+        self.lazy = lazy  # 지연 모드: 게이트는 기록만 하고 관측 시점에 시뮬레이션
+        self.precision = precision
+        self.dtype = np.dtype(PRECISIONS[precision])  # 상태 벡터 dtype (게이트 행렬도 이 타입으로 변환)
+        self.storage = storage
+        self.scratch_dir = scratch_dir  # memmap 파일 위치 (None이면 시스템 임시 디렉터리)
+        if memory_budget is None and storage == "memmap":
+            memory_budget = DEFAULT_MEMORY_BUDGET
+        self.memory_budget = memory_budget
+        self.chunk_size = self._chunk_size_for_budget(memory_budget)
+        self.backend = backend
+        self.max_bond_dimension = max_bond_dimension  # MPS 결합 차원 상한
+        self.truncation_threshold = truncation_threshold  # MPS 특이값 절단 임계값 (상대값)
+        self.prune_threshold = prune_threshold  # 희소 상태에서 버릴 진폭 크기
+        self.max_fill_ratio = max_fill_ratio  # 희소 상태 채움 비율이 이를 넘으면 상태 벡터로 전환
+        self._backend_state = None  # 스태빌라이저 테이블/MPS (처음 측정/샘플링할 때 생성)
+        self._backend_gate_count = 0  # 백엔드 상태에 이미 반영된 게이트 수
+        self._backend_collapsed = False  # 테이블에서 중간 측정을 했는지 (auto 백엔드는 상태 벡터로 옮기기 전까지 테이블 사용)
+        self._backend_measurements = 0  # 백엔드 상태에서 한 중간 측정 수
+        self._exported_version = None  # 상태 벡터로 내보낸 백엔드 상태의 (게이트 수, 측정 수)
+        self._clifford = True
+        self._clifford_checked = 0  # Clifford 여부를 검사한 게이트 수
         self.gates = []
         self.measurements = []
         self.qubits = [QuantumState(np.array([1.0, 0.0]), 1) for _ in range(n_qubits)]
-        self.circuit_state = None
-        self._initialize_circuit_state()
+        self._circuit_state = None
+        self._applied_gate_count = 0  # circuit_state에 이미 반영된 게이트 수
+        self._shared_state = False  # 상태 벡터를 StateCache와 공유 중 (읽기 전용, 바꾸기 전에 복사)
+        self._state_cache = None  # (캐시, 키, 게이트 수): 그 게이트까지 처음 시뮬레이션한 상태를 저장할 곳
+        if not lazy:
+            self._initialize_circuit_state()
         self._gate_count = 0  # 디버깅용
     
+    def _chunk_size_for_budget(self, memory_budget: int) -> int:
+        """메모리 예산(바이트)으로 처리할 수 있는 청크 크기 (2의 거듭제곱 진폭 수)
+
+        커널은 청크 하나당 원본 복사본과 연산 임시 배열을 만들므로 예산의 1/4만 청크에 할당한다.
+        """
+        if memory_budget is None:
+            return None
+        amplitudes = max(memory_budget // (4 * self.dtype.itemsize), 2)
+        return 1 << (amplitudes.bit_length() - 1)
+    
+    def _allocate_state_vector(self) -> np.ndarray:
+        """|0...0⟩ 초기화용 0 상태 벡터 할당 (저장 방식에 따라 ndarray 또는 np.memmap)"""
+        size = 2**self.n_qubits
+        if self.storage == "memmap":
+            # 이름 없는 임시 파일: mmap이 파일 디스크립터를 유지하고 배열이 해제되면 파일도 사라짐
+            # 새 파일은 0으로 채워진 sparse 파일이므로 따로 초기화할 필요가 없음
+            with tempfile.TemporaryFile(dir=self.scratch_dir, prefix="qube_state_") as scratch:
+                return np.memmap(scratch, dtype=self.dtype, mode="w+", shape=(size,))
+        return np.zeros(size, dtype=self.dtype)
+    
+    def _copy_state_vector(self, state_vector: np.ndarray) -> np.ndarray:
+        """같은 저장 방식의 상태 벡터 복사본 (memmap은 청크 단위로 복사)"""
+        if self.storage != "memmap":
+            return state_vector.copy()
+        copy = self._allocate_state_vector()
+        for start in range(0, state_vector.size, self.chunk_size):
+            copy[start:start + self.chunk_size] = state_vector[start:start + self.chunk_size]
+        return copy
+    
     def _initialize_circuit_state(self):
-        """모든 큐빗을 |000...⟩ 상태로 초기화"""
-        initial_state = np.zeros(2**self.n_qubits, dtype=complex)
-        initial_state[0] = 1.0  # |000...⟩
-        self.circuit_state = QuantumState(initial_state, self.n_qubits)
+        """모든 큐빗을 |000...⟩ 상태로 초기화
+
+        희소 상태와 auto 백엔드에서 중간 측정한 스태빌라이저 테이블은 그 상태를 그대로 옮긴다.
+        """
+        initial_state = self._allocate_state_vector()
+        if self.active_backend == "sparse":
+            sparse_state = self._simulation_state()
+            sparse_state.write_state_vector(initial_state, self.chunk_size)
+            self._trace(lambda: f"희소 상태 → 상태 벡터 전환 (진폭 {sparse_state.nnz}개, "
+                                f"채움 비율 {sparse_state.fill_ratio:.3f})")
+            self._applied_gate_count = self._backend_gate_count
+            self._backend_state = None
+        elif self._backend_collapsed and self.backend == "auto":
+            self._simulation_state().write_state_vector(initial_state, self.chunk_size)
+            self._trace(lambda: "중간 측정한 스태빌라이저 테이블 → 상태 벡터 전환")
+            self._applied_gate_count = self._backend_gate_count
+            self._backend_state = None
+            self._backend_collapsed = False
+        else:
+            initial_state[0] = 1.0  # |000...⟩
+        self._circuit_state = QuantumState(initial_state, self.n_qubits, self.chunk_size)
+    
+    @property
+    def circuit_state(self) -> QuantumState:
+        """현재 회로 상태 (지연 모드에서는 처음 관측할 때 대기 중인 게이트를 시뮬레이션)"""
+        self._apply_pending_gates()
+        return self._circuit_state
+    
+    @circuit_state.setter
+    def circuit_state(self, state: QuantumState):
+        self._circuit_state = state
+        self._shared_state = False
+    
+    def writable_state_vector(self) -> np.ndarray:
+        """제자리에서 바꿀 상태 벡터 (캐시와 공유 중이면 먼저 복사)"""
+        state = self.circuit_state
+        if self._shared_state:
+            state.state_vector = state.state_vector.copy()
+            self._shared_state = False
+        return state.state_vector
+    
+    def use_state_cache(self, cache, key: str):
+        """지금까지 기록된 게이트의 최종 상태를 cache[key]와 공유
+
+        캐시에 있으면 시뮬레이션 없이 그 상태 벡터를 쓰고, 없으면 처음 시뮬레이션할 때 저장한다.
+        """
+        state_vector = cache.get(key)
+        if state_vector is not None:
+            self._circuit_state = QuantumState(state_vector, self.n_qubits, self.chunk_size)
+            self._applied_gate_count = len(self.gates)
+            self._shared_state = True
+        else:
+            self._state_cache = (cache, key, len(self.gates))
+    
+    @property
+    def is_materialized(self) -> bool:
+        """상태 벡터가 할당되어 있고 모든 게이트가 반영되었는지 여부"""
+        return self._circuit_state is not None and self._applied_gate_count == len(self.gates)
     
-    # === DEBUG 헬퍼 메서드들 ===
+    def _add_gate(self, gate: 'QuantumGate') -> 'QuantumCircuit':
+        """게이트 기록 (즉시 모드에서는 바로 상태 업데이트)"""
+        if gate.is_parametric and not self.lazy:
+            raise ValueError("Symbolic parameters require a lazy circuit (QuantumCircuit(n, lazy=True))")
+        if self.backend == "stabilizer":
+            from .stabilizer import is_clifford_gate
+            if not is_clifford_gate(gate):
+                raise ValueError(f"Non-Clifford gate {gate.name} is not supported by the stabilizer backend")
+        elif self.backend in ("mps", "sparse") and gate.is_parametric:
+            raise ValueError(f"Symbolic parameters are not supported by the {self.backend} backend (bind() first)")
+        elif self._backend_collapsed and self.backend == "auto":
+            from .stabilizer import is_clifford_gate
+            if not is_clifford_gate(gate):
+                # 중간 측정 결과가 반영된 테이블에서 상태 벡터로 넘어가 이후 게이트를 이어서 시뮬레이션
+                self._initialize_circuit_state()
+        self.gates.append(gate)
+        self._gate_count += 1
+        if self.backend == "sparse" and self._circuit_state is None:
+            # 희소 상태는 게이트마다 바로 갱신하고 너무 채워지면 상태 벡터로 전환
+            if self._simulation_state().fill_ratio > self.max_fill_ratio:
+                self._initialize_circuit_state()
+        if not self.lazy:
+            self._apply_pending_gates()
+        return self
     
-    def _debug_print(self, message: str):
-        """조건부 DEBUG 출력"""
-        if self.debug_mode:
-            print(f"DEBUG: {message}")
+    def _apply_pending_gates(self):
+        """아직 상태에 반영되지 않은 게이트들을 최적화 패스를 거쳐 시뮬레이션"""
+        if self.backend in ("stabilizer", "mps"):
+            self._export_backend_state()
+            return
+        if self._circuit_state is None:
+            self._initialize_circuit_state()
+        
+        if self._applied_gate_count == len(self.gates):
+            return
+        
+        pending = self.gates[self._applied_gate_count:]
+        self._applied_gate_count = len(self.gates)
+        self.writable_state_vector()
+        
+        simulator = _SIMULATOR
+        # 프로파일링/트레이스 여부는 배치마다 한 번만 확인 (둘 다 꺼져 있으면 게이트 경로는 그대로)
+        apply_gate = self._apply_gate_profiled if self.profile else self._apply_gate
+        if self.tracer is not None:
+            apply_gate = partial(self._apply_gate_traced, apply_gate)
+        for gate in self._optimized_gates(pending):
+            self._circuit_state = apply_gate(gate, self._circuit_state, simulator)
+        
+        if self._state_cache is not None:
+            cache, key, gate_count = self._state_cache
+            self._state_cache = None
+            # 캐시 키를 만든 뒤 게이트가 더 추가됐으면 다른 상태이므로 저장하지 않음
+            if gate_count == self._applied_gate_count:
+                self._shared_state = cache.put(key, self._circuit_state.state_vector)
+    
+    # === DEBUG / 트레이스 ===
+    
+    def _trace(self, build: Callable[[], str]):
+        """트레이스가 켜져 있을 때만 build()로 메시지를 만들어 기록"""
+        if self.tracer is not None:
+            self.tracer.message(build)
 
     def set_debug(self, enabled: bool):
-        """DEBUG 모드 토글"""
+        """DEBUG 모드 토글 (켜면 "DEBUG: ..."를 출력하는 기록기, 끄면 트레이스 없음)"""
         self.debug_mode = enabled
+        self.tracer = Tracer(sink=print_record) if enabled else None
         return self
 
-    def _format_state_vector(self, state_vector, max_states=16):
-        """상태 벡터를 적절한 크기로 포맷"""
-        probabilities = [abs(amp)**2 for amp in state_vector[:max_states]]
-        if len(state_vector) > max_states:
-            return probabilities + ["..."]
-        return probabilities
+    def set_tracer(self, tracer: Tracer = None):
+        """트레이스 기록기 교체 (None이면 끔)"""
+        self.tracer = tracer
+        return self
+
+    def _apply_gate_traced(self, apply_gate, gate: QuantumGate, state: QuantumState, simulator) -> QuantumState:
+        """apply_gate + 게이트/큐빗/시간/적용 후 확률 트레이스 기록"""
+        start = time.perf_counter()
+        state = apply_gate(gate, state, simulator)
+        self.tracer.gate(gate, time.perf_counter() - start, state.state_vector)
+        return state
+    
+    @property
+    def parameters(self) -> List[str]:
+        """회로에 쓰인 기호 매개변수 이름 (처음 등장한 순서)"""
+        names = [p.name for gate in self.gates for p in gate.parameters if isinstance(p, Parameter)]
+        return list(dict.fromkeys(names))
+    
+    # === 스태빌라이저/MPS 백엔드 ===
+    
+    def _is_clifford(self) -> bool:
+        """게이트가 모두 Clifford인지 여부 (새로 추가된 게이트만 검사)"""
+        from .stabilizer import is_clifford_gate
+        for gate in self.gates[self._clifford_checked:]:
+            self._clifford = self._clifford and is_clifford_gate(gate)
+        self._clifford_checked = len(self.gates)
+        return self._clifford
+    
+    @property
+    def active_backend(self) -> str:
+        """측정/샘플링에 실제로 쓰는 백엔드 ("statevector" | "stabilizer" | "mps" | "sparse")
+
+        auto 백엔드는 상태 벡터가 아직 할당되지 않았고 게이트가 모두 Clifford일 때 테이블을 쓴다
+        (테이블에서 중간 측정을 한 뒤에는 Clifford가 아닌 게이트가 오거나 상태 벡터를 요청할 때까지
+        그 테이블을 쓰고, 그때 측정 결과가 반영된 테이블을 상태 벡터로 옮긴다).
+        sparse 백엔드는 상태 벡터로 전환하기 전까지만 "sparse"다.
+        """
+        if self.backend in ("stabilizer", "mps"):
+            return self.backend
+        if self.backend == "sparse":
+            return "sparse" if self._circuit_state is None else "statevector"
+        if self._backend_collapsed:
+            return "stabilizer"
+        if self.backend == "auto" and self._circuit_state is None and self._is_clifford():
+            return "stabilizer"
+        return "statevector"
+    
+    @property
+    def uses_stabilizer(self) -> bool:
+        """측정/샘플링에 스태빌라이저 테이블을 쓰는지 여부"""
+        return self.active_backend == "stabilizer"
+    
+    @property
+    def truncation_error(self) -> float:
+        """MPS 절단으로 버린 확률 질량의 누적값 (정확한 백엔드는 0.0)"""
+        if self.active_backend != "mps":
+            return 0.0
+        return self._simulation_state().truncation_error
+    
+    def _simulation_state(self):
+        """대기 중인 게이트를 반영한 스태빌라이저 테이블, MPS 또는 희소 상태"""
+        if self._backend_state is None:
+            if self.active_backend == "mps":
+                from .mps import MPSState
+                self._backend_state = MPSState(self.n_qubits, self.max_bond_dimension,
+                                               self.truncation_threshold, self.dtype)
+            elif self.active_backend == "sparse":
+                from .sparse import SparseState
+                self._backend_state = SparseState(self.n_qubits, self.prune_threshold, self.dtype)
+            else:
+                from .stabilizer import StabilizerState
+                self._backend_state = StabilizerState(self.n_qubits)
+        tracer = self.tracer
+        for gate in self._peephole_gates(self.gates[self._backend_gate_count:]):
+            if self.profile or tracer is not None:
+                start = time.perf_counter()
+                self._backend_state.apply_gate(gate)
+                elapsed = time.perf_counter() - start
+                if self.profile:
+                    self._record_profile(gate.name, elapsed, 0)
+                if tracer is not None:
+                    tracer.gate(gate, elapsed)
+            else:
+                self._backend_state.apply_gate(gate)
+        self._backend_gate_count = len(self.gates)
+        return self._backend_state
+    
+    def _export_backend_state(self):
+        """스태빌라이저/MPS 백엔드의 상태 벡터: 그 백엔드 상태 하나에서 만든 사본
+
+        상태 벡터로 따로 시뮬레이션하지 않으므로 중간 측정 결과도 항상 같다.
+        게이트나 측정으로 백엔드 상태가 바뀌었을 때만 다시 만든다.
+        """
+        version = (len(self.gates), self._backend_measurements)
+        if self._circuit_state is not None and self._exported_version == version:
+            return
+        if self.n_qubits > MAX_EXPORT_QUBITS:
+            raise ValueError(f"State vector of {self.n_qubits} qubits is unavailable on the {self.backend} backend "
+                             f"(at most {MAX_EXPORT_QUBITS} qubits; use sample_counts/marginal_probabilities)")
+        state = self._simulation_state()
+        state_vector = self._allocate_state_vector()
+        state.write_state_vector(state_vector, self.chunk_size)
+        self._circuit_state = QuantumState(state_vector, self.n_qubits, self.chunk_size)
+        self._applied_gate_count = len(self.gates)
+        self._shared_state = True  # 바꾸려면 복사 (백엔드 상태에는 반영되지 않음)
+        self._exported_version = version
+    
+    def measure_qubit(self, qubit: int) -> int:
+        """큐빗 하나를 중간 측정하고 상태를 붕괴시킨 결과 (0/1)"""
+        self._check_qubit(qubit)
+        if self.active_backend != "statevector":
+            state = self._simulation_state()
+            self._backend_measurements += 1
+            # auto 백엔드는 측정 결과가 반영된 테이블을 계속 써야 한다 (희소 상태는 전환할 때 그대로 옮겨짐)
+            self._backend_collapsed = self.active_backend == "stabilizer"
+            return state.measure(qubit)
+        
+        return measure_qubit(self.writable_state_vector(), qubit, self.chunk_size)
+    
+    def compile(self) -> 'CompiledCircuit':
+        """기호 매개변수 회로를 재사용 가능한 실행 형태로 컴파일"""
+        return CompiledCircuit(self)
+    
+    def _check_qubit(self, qubit: int):
+        if qubit < 0 or qubit >= self.n_qubits:
+            raise ValueError(f"Qubit index {qubit} out of range")
     
     # === 단일 큐빗 게이트들 ===
     
     def h(self, qubit: int) -> 'QuantumCircuit':
         """하다마드 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"H 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("H", [qubit]))
-        
-        # 실제 상태 업데이트
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("H", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"H 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"H 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("H", [qubit]))
 
     def x(self, qubit: int) -> 'QuantumCircuit':
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"X 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        
-        self.gates.append(QuantumGate("X", [qubit]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("X", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"X 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"X 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        """Pauli-X 게이트 추가 및 상태 업데이트"""
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("X", [qubit]))
 
     def y(self, qubit: int) -> 'QuantumCircuit':
         """Pauli-Y 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"Y 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("Y", [qubit]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("Y", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"Y 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"Y 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("Y", [qubit]))
 
     def z(self, qubit: int) -> 'QuantumCircuit':
         """Pauli-Z 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"Z 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("Z", [qubit]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("Z", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"Z 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"Z 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("Z", [qubit]))
 
     def s(self, qubit: int) -> 'QuantumCircuit':
         """S 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"S 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("S", [qubit]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("S", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"S 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"S 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("S", [qubit]))
 
     def t(self, qubit: int) -> 'QuantumCircuit':
         """T 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"T 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("T", [qubit]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_single_gate_to_circuit("T", self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"T 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"T 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("T", [qubit]))
 
     # === 회전 게이트들 ===
     def rx(self, angle: float, qubit: int) -> 'QuantumCircuit':
         """RX 회전 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"RX({angle:.3f}) 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("RX", [qubit], parameters=[angle]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_rotation_to_circuit("X", angle, self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"RX({angle:.3f}) 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"RX({angle:.3f}) 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("RX", [qubit], parameters=[angle]))
 
     def ry(self, angle: float, qubit: int) -> 'QuantumCircuit':
         """RY 회전 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"RY({angle:.3f}) 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("RY", [qubit], parameters=[angle]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_rotation_to_circuit("Y", angle, self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"RY({angle:.3f}) 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"RY({angle:.3f}) 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("RY", [qubit], parameters=[angle]))
 
     def rz(self, angle: float, qubit: int) -> 'QuantumCircuit':
         """RZ 회전 게이트 추가 및 상태 업데이트"""
-        if qubit < 0 or qubit >= self.n_qubits:
-            raise ValueError(f"Qubit index {qubit} out of range")
-        
-        self._debug_print(f"RZ({angle:.3f}) 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-            
-        self.gates.append(QuantumGate("RZ", [qubit], parameters=[angle]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_rotation_to_circuit("Z", angle, self.circuit_state, qubit, self.debug_mode)
-        
-        self._debug_print(f"RZ({angle:.3f}) 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector, 8)}")
-        self._debug_print(f"RZ({angle:.3f}) 게이트 적용됨 - 큐빗 {qubit}")
-        
-        self._gate_count += 1
-        return self
+        self._check_qubit(qubit)
+        return self._add_gate(QuantumGate("RZ", [qubit], parameters=[angle]))
 
     # === 2큐빗 게이트들 ===
     def cnot(self, control: int, target: int) -> 'QuantumCircuit':
@@ -354,18 +776,24 @@ class QuantumCircuit:
         if control == target:
             raise ValueError("Control and target qubits must be different")
         
-        self._debug_print(f"CNOT 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector)}")
-            
-        self.gates.append(QuantumGate("CNOT", [target], control_qubits=[control]))
+        return self._add_gate(QuantumGate("CNOT", [target], control_qubits=[control]))
+
+    def mcx(self, *qubits) -> 'QuantumCircuit':
+        """다중 제어 X 게이트 (마지막 큐빗이 타겟, 나머지가 제어)"""
+        n_controls = len(qubits) - 1
         
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_cnot_to_circuit(self.circuit_state, control, target, self.debug_mode)
+        if n_controls < 1:
+            raise ValueError("At least 2 qubits required for controlled X gate")
         
-        self._debug_print(f"CNOT 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector)}")
-        self._debug_print(f"CNOT({control}, {target}) 게이트 적용됨")
+        if any(q < 0 or q >= self.n_qubits for q in qubits):
+            raise ValueError(f"Qubit indices out of range")
         
-        self._gate_count += 1
-        return self
+        if len(set(qubits)) != len(qubits):
+            raise ValueError("All qubits must be different")
+        
+        # 게이트 이름 생성 (CNOT, CCX, CCCX, ...)
+        gate_name = "CNOT" if n_controls == 1 else "C" * n_controls + "X"
+        return self._add_gate(QuantumGate(gate_name, [qubits[-1]], control_qubits=list(qubits[:-1])))
 
     def cz(self, control: int, target: int) -> 'QuantumCircuit':
         """CZ 게이트 추가 및 상태 업데이트"""
@@ -374,18 +802,7 @@ class QuantumCircuit:
         if control == target:
             raise ValueError("Control and target qubits must be different")
         
-        self._debug_print(f"CZ 게이트 적용 전 상태: {self._format_state_vector(self.circuit_state.state_vector)}")
-            
-        self.gates.append(QuantumGate("CZ", [target], control_qubits=[control]))
-        
-        simulator = QuantumSimulator()
-        self.circuit_state = simulator.apply_cz_to_circuit(self.circuit_state, control, target, self.debug_mode)
-        
-        self._debug_print(f"CZ 게이트 적용 후 상태: {self._format_state_vector(self.circuit_state.state_vector)}")
-        self._debug_print(f"CZ({control}, {target}) 게이트 적용됨")
-        
-        self._gate_count += 1
-        return self
+        return self._add_gate(QuantumGate("CZ", [target], control_qubits=[control]))
     
     def ccz(self, control1: int, control2: int, target: int) -> 'QuantumCircuit':
         """CCZ (Controlled-Controlled-Z) 게이트 추가 및 상태 업데이트"""
@@ -395,42 +812,7 @@ class QuantumCircuit:
         if len(set([control1, control2, target])) != 3:
             raise ValueError("Control and target qubits must be different")
         
-        self.gates.append(QuantumGate("CCZ", [control1, control2, target]))
-        
-        # CCZ 게이트 직접 구현: 세 큐빗이 모두 1일 때만 위상 뒤집기
-        n_qubits = self.n_qubits
-        state_vector = self.circuit_state.state_vector.copy()
-        
-        self._debug_print(f"CCZ 적용 전 상태: {self._format_state_vector(state_vector)}")
-        
-        target_states = []
-        
-        # 각 상태에 대해 세 큐빗이 모두 1인지 확인
-        for i in range(len(state_vector)):
-            binary = format(i, f'0{n_qubits}b')
-            
-            # 큐빗 순서: Qube는 little-endian (q0가 최하위)
-            control1_bit = int(binary[n_qubits-1-control1])
-            control2_bit = int(binary[n_qubits-1-control2])
-            target_bit = int(binary[n_qubits-1-target])
-            
-            # 세 큐빗이 모두 1이면 위상 뒤집기
-            if control1_bit == 1 and control2_bit == 1 and target_bit == 1:
-                state_vector[i] = -state_vector[i]
-                target_states.append(f"|{binary}⟩")
-                self._debug_print(f"CCZ 위상 뒤집기 - 상태 |{binary}⟩ (인덱스 {i})")
-        
-        # 상태 업데이트
-        self.circuit_state.state_vector = state_vector
-        
-        self._debug_print(f"CCZ 적용 후 상태: {self._format_state_vector(state_vector)}")
-        self._debug_print(f"CCZ({control1}, {control2}, {target}) 게이트 적용됨")
-        
-        if target_states:
-            self._debug_print(f"위상 뒤집기 적용된 상태들: {', '.join(target_states)}")
-        
-        self._gate_count += 1
-        return self
+        return self._add_gate(QuantumGate("CCZ", [control1, control2, target]))
     
     def cccz(self, control1: int, control2: int, control3: int, target: int) -> 'QuantumCircuit':
         """CCCZ (Controlled-Controlled-Controlled-Z) 게이트 추가 및 상태 업데이트"""
@@ -442,44 +824,7 @@ class QuantumCircuit:
         if len(set(qubits)) != 4:
             raise ValueError("All control and target qubits must be different")
         
-        self.gates.append(QuantumGate("CCCZ", qubits))
-        
-        # CCCZ 게이트 직접 구현: 네 큐빗이 모두 1일 때만 위상 뒤집기
-        n_qubits = self.n_qubits
-        state_vector = self.circuit_state.state_vector.copy()
-        
-        self._debug_print(f"CCCZ 적용 전 상태: {self._format_state_vector(state_vector)}")
-        
-        target_states = []
-        
-        # 각 상태에 대해 네 큐빗이 모두 1인지 확인
-        for i in range(len(state_vector)):
-            binary = format(i, f'0{n_qubits}b')
-            
-            # 지정된 큐빗들의 상태 확인
-            control1_bit = int(binary[n_qubits-1-control1])
-            control2_bit = int(binary[n_qubits-1-control2])
-            control3_bit = int(binary[n_qubits-1-control3])
-            target_bit = int(binary[n_qubits-1-target])
-            
-            # 네 큐빗이 모두 1이면 위상 뒤집기
-            if (control1_bit == 1 and control2_bit == 1 and 
-                control3_bit == 1 and target_bit == 1):
-                state_vector[i] = -state_vector[i]
-                target_states.append(f"|{binary}⟩")
-                self._debug_print(f"CCCZ 위상 뒤집기 - 상태 |{binary}⟩ (인덱스 {i})")
-        
-        # 상태 업데이트
-        self.circuit_state.state_vector = state_vector
-        
-        self._debug_print(f"CCCZ 적용 후 상태: {self._format_state_vector(state_vector)}")
-        self._debug_print(f"CCCZ({control1}, {control2}, {control3}, {target}) 게이트 적용됨")
-        
-        if target_states:
-            self._debug_print(f"위상 뒤집기 적용된 상태들: {', '.join(target_states)}")
-        
-        self._gate_count += 1
-        return self
+        return self._add_gate(QuantumGate("CCCZ", qubits))
     
     # === 🆕 N큐빗 범용 제어 Z 게이트 ===
     
@@ -498,45 +843,7 @@ class QuantumCircuit:
         
         # 게이트 이름 생성 (CZ, CCZ, CCCZ, CCCCZ, ...)
         gate_name = "C" * (n_controls - 1) + "Z"
-        self.gates.append(QuantumGate(gate_name, list(qubits)))
-        
-        # N큐빗 제어 Z 게이트 구현
-        n_qubits = self.n_qubits
-        state_vector = self.circuit_state.state_vector.copy()
-        
-        self._debug_print(f"{gate_name} 적용 전 상태: {self._format_state_vector(state_vector)}")
-        
-        target_states = []
-        
-        # 각 상태에 대해 모든 지정된 큐빗이 1인지 확인
-        for i in range(len(state_vector)):
-            binary = format(i, f'0{n_qubits}b')
-            
-            # 모든 지정된 큐빗이 1인지 확인
-            all_ones = True
-            for qubit in qubits:
-                qubit_bit = int(binary[n_qubits-1-qubit])
-                if qubit_bit != 1:
-                    all_ones = False
-                    break
-            
-            # 모든 큐빗이 1이면 위상 뒤집기
-            if all_ones:
-                state_vector[i] = -state_vector[i]
-                target_states.append(f"|{binary}⟩")
-                self._debug_print(f"{gate_name} 위상 뒤집기 - 상태 |{binary}⟩ (인덱스 {i})")
-        
-        # 상태 업데이트
-        self.circuit_state.state_vector = state_vector
-        
-        self._debug_print(f"{gate_name} 적용 후 상태: {self._format_state_vector(state_vector)}")
-        self._debug_print(f"{gate_name}({', '.join(map(str, qubits))}) 게이트 적용됨")
-        
-        if target_states:
-            self._debug_print(f"위상 뒤집기 적용된 상태들: {', '.join(target_states)}")
-        
-        self._gate_count += 1
-        return self
+        return self._add_gate(QuantumGate(gate_name, list(qubits)))
     
     # 상태 검사 메서드 추가
     def get_state_vector(self) -> np.ndarray:
@@ -549,8 +856,8 @@ class QuantumCircuit:
     
     def is_normalized(self) -> bool:
         """상태가 정규화되었는지 확인"""
-        norm = np.linalg.norm(self.circuit_state.state_vector)
-        return abs(norm - 1.0) < 1e-10
+        norm = state_norm(self.circuit_state.state_vector, self.chunk_size)
+        return abs(norm - 1.0) < _norm_tolerance(self.circuit_state.state_vector.dtype)
     
     def depth(self) -> int:
         """회로 깊이 반환"""
@@ -568,23 +875,150 @@ class QuantumCircuit:
         return self
     
     # === 회로 실행 ===
-    def run(self, simulator=None) -> Dict[str, Any]:
-        """회로를 실행하고 결과 반환"""
-        if simulator is None:
-            simulator = QuantumSimulator()
-        
-        # 초기 상태로 시작
-        current_state = self.circuit_state
-        
-        # 모든 게이트 순서대로 적용
-        for gate in self.gates:
-            current_state = self._apply_gate(gate, current_state, simulator)
-        
-        # 측정 수행
+    def sample_counts(self, shots: int, qubits: List[int] = None) -> Dict[int, int]:
+        """상태를 붕괴시키지 않고 shots번 측정한 히스토그램 반환
+
+        키는 측정 큐빗들의 비트열을 정수로 본 값 (qubits[j]가 j번째 비트).
+        확률 벡터는 한 번만 계산하고 모든 샷을 한 번의 벡터화 호출로 뽑는다.
+        """
+        if shots < 1:
+            raise ValueError(f"shots must be positive, got {shots}")
+        if self.active_backend != "statevector":
+            # 주변 확률 벡터(2^k) 없이 테이블/MPS에서 바로 샘플링
+            if qubits is None:
+                qubits = list(range(self.n_qubits))
+            for qubit in qubits:
+                self._check_qubit(qubit)
+            return self._simulation_state().sample_counts(shots, qubits)
+        return sample_counts(self.marginal_probabilities(qubits), shots)
+    
+    def marginal_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """지정된 큐빗들의 주변 확률 분포 (qubits[j]가 결과 인덱스의 j번째 비트)"""
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        for qubit in qubits:
+            self._check_qubit(qubit)
+        
+        if self.active_backend != "statevector":
+            return self._simulation_state().marginal_probabilities(qubits)
+        
+        state_vector = self.circuit_state.state_vector
+        if self.chunk_size is not None:
+            # 전체 확률 벡터를 만들지 않고 청크별로 주변 확률 누적
+            return state_marginal_probabilities(state_vector, qubits, self.chunk_size)
+        probabilities = state_vector.real**2 + state_vector.imag**2
+        if list(qubits) != list(range(self.n_qubits)):
+            probabilities = marginal_probabilities(probabilities, qubits)
+        return probabilities
+
+    # === 부분계 / 얽힘 ===
+    def _subsystem(self, qubits: List[int] = None) -> List[int]:
+        """이분할의 한쪽 큐빗들 (None이면 앞쪽 절반)"""
+        if qubits is None:
+            return list(range(self.n_qubits // 2))
+        for qubit in qubits:
+            self._check_qubit(qubit)
+        return list(qubits)
+    
+    def reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """qubits 부분계의 축소 밀도 행렬 (2^k x 2^k, qubits[j]가 행/열 인덱스의 j번째 비트)
+
+        MPS/희소 백엔드는 상태 벡터를 만들지 않고 백엔드 상태에서 계산한다 (최대 MAX_REDUCED_QUBITS큐빗).
+        """
+        qubits = self._subsystem(qubits)
+        if self.active_backend == "statevector":
+            return reduced_density_matrix(self.circuit_state.state_vector, qubits, self.chunk_size)
+        return self._backend_reduced_density_matrix(qubits)
+    
+    def purity(self, qubits: List[int] = None) -> float:
+        """qubits 부분계 (기본: 앞쪽 절반 큐빗)의 순도 Tr(ρ²)"""
+        qubits = self._subsystem(qubits)
+        if self.active_backend == "statevector":
+            return subsystem_purity(self.circuit_state.state_vector, qubits, self.chunk_size)
+        if self.active_backend == "stabilizer":
+            return 2.0 ** -self._simulation_state().entanglement_entropy(qubits)
+        return float(np.sum(self._backend_schmidt_coefficients(qubits)**4))
+    
+    def entanglement_entropy(self, qubits: List[int] = None) -> float:
+        """qubits 부분계 (기본: 앞쪽 절반 큐빗)와 나머지 사이의 폰 노이만 얽힘 엔트로피 (비트)
+
+        상태를 (2^k, 2^(n-k)) 행렬로 본 슈미트 분해로 계산하므로 4^n 크기의 밀도 행렬을 만들지 않는다.
+        스태빌라이저 테이블은 GF(2) 계수로, MPS는 결합의 특이값으로, 희소 상태는 저장된 진폭으로 계산한다.
+        """
+        qubits = self._subsystem(qubits)
+        if self.active_backend == "statevector":
+            return _von_neumann_entropy(schmidt_coefficients(self.circuit_state.state_vector, qubits, self.chunk_size))
+        if self.active_backend == "stabilizer":
+            return float(self._simulation_state().entanglement_entropy(qubits))
+        return _von_neumann_entropy(self._backend_schmidt_coefficients(qubits))
+    
+    def _backend_reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """MPS/희소 상태의 축소 밀도 행렬 (스태빌라이저 테이블은 지원하지 않음)"""
+        if self.active_backend == "stabilizer":
+            raise ValueError("Reduced density matrices are unavailable on the stabilizer backend "
+                             "(use purity/entanglement_entropy)")
+        if len(qubits) > MAX_REDUCED_QUBITS:
+            raise ValueError(f"Reduced density matrix of {len(qubits)} qubits is too large for the "
+                             f"{self.active_backend} backend (at most {MAX_REDUCED_QUBITS} qubits)")
+        return self._simulation_state().reduced_density_matrix(qubits)
+    
+    def _backend_schmidt_coefficients(self, qubits: List[int]) -> np.ndarray:
+        """MPS/희소 상태의 이분할 슈미트 계수
+
+        MPS에서 사이트 순서로 앞/뒤 연속 구간이 아닌 부분계는 더 작은 쪽의 축소 밀도 행렬 고윳값으로 구한다.
+        """
+        schmidt = self._simulation_state().schmidt_coefficients(qubits)
+        if schmidt is None:
+            density = self._backend_reduced_density_matrix(_smaller_side(self.n_qubits, qubits))
+            schmidt = np.sqrt(np.clip(np.linalg.eigvalsh(density)[::-1], 0.0, None))
+        return schmidt
+
+    def expectation(self, pauli_terms) -> float:
+        """파울리 문자열 가중합의 기댓값 (상태를 붕괴시키지 않음)
+
+        pauli_terms는 "XZIY" 문자열, {문자열: 계수} dict, 또는 (계수, 문자열) 쌍 목록이고
+        문자열의 k번째 문자가 큐빗 k에 작용한다. 비트 반전 위치(X, Y)가 같은 항들은 상태를 한 번만 훑는다.
+        """
+        from .observables import parse_pauli_terms, expectation_value, state_vector_expectations
+        terms = parse_pauli_terms(pauli_terms, self.n_qubits)
+        if self.active_backend != "statevector":
+            return expectation_value(terms, self._simulation_state().pauli_expectations)
+        state_vector = self.circuit_state.state_vector
+        return expectation_value(terms, lambda flip_mask, phase_masks: state_vector_expectations(
+            state_vector, flip_mask, phase_masks, self.chunk_size))
+
+    def run(self, simulator=None, shots: int = None) -> Dict[str, Any]:
+        """회로를 실행하고 결과 반환 (simulator 인자는 호환성을 위해 유지)
+
+        shots를 지정하면 상태를 붕괴시키지 않고 측정 큐빗(없으면 전체)을
+        shots번 샘플링한 "counts" 히스토그램을 함께 반환한다.
+        스태빌라이저/MPS/희소 백엔드를 쓰면 final_state는 StabilizerState/MPSState/SparseState이고,
+        MPS는 누적 절단 오차 "truncation_error"를 함께 반환한다.
+        """
+        if self.active_backend != "statevector":
+            return self._run_backend_state(shots)
+        if shots is not None:
+            qubits = list(dict.fromkeys(self.measurements)) or list(range(self.n_qubits))
+            return {
+                "final_state": QuantumState(self._copy_state_vector(self.circuit_state.state_vector),
+                                            self.n_qubits, self.chunk_size),
+                "counts": self.sample_counts(shots, qubits),
+                "shots": shots,
+                "measured_qubits": qubits,
+                "circuit_depth": len(self.gates),
+                "gate_count": len(self.gates)
+            }
+        
+        # 게이트가 모두 반영된 회로 상태에서 시작 (지연 모드에서는 여기서 시뮬레이션)
+        # 측정이 상태를 붕괴시키므로 회로 상태는 복사해서 사용
+        current_state = QuantumState(self._copy_state_vector(self.circuit_state.state_vector),
+                                     self.n_qubits, self.chunk_size)
+        
+        # 측정 수행 (중간 측정과 같은 little-endian 측정/붕괴, 같은 큐빗을 다시 측정하면 같은 결과)
         measurement_results = {}
         for qubit_index in self.measurements:
             if qubit_index < current_state.n_qubits:
-                result = current_state.measure(qubit_index)
+                result = measure_qubit(current_state.state_vector, qubit_index, self.chunk_size)
                 measurement_results[f"qubit_{qubit_index}"] = result
         
         return {
@@ -594,28 +1028,137 @@ class QuantumCircuit:
             "gate_count": len(self.gates)
         }
     
+    def _run_backend_state(self, shots: int = None) -> Dict[str, Any]:
+        """run()의 스태빌라이저/MPS/희소 버전 (측정은 백엔드 상태 복사본에서 수행)"""
+        final_state = self._simulation_state().copy()
+        result = {"final_state": final_state}
+        if shots is not None:
+            qubits = list(dict.fromkeys(self.measurements)) or list(range(self.n_qubits))
+            result.update({"counts": self.sample_counts(shots, qubits), "shots": shots, "measured_qubits": qubits})
+        else:
+            result["measurements"] = {f"qubit_{q}": final_state.measure(q) for q in self.measurements}
+        if self.active_backend == "mps":
+            result["truncation_error"] = final_state.truncation_error
+        result.update({"circuit_depth": len(self.gates), "gate_count": len(self.gates)})
+        return result
+    
+    def _peephole_gates(self, gates: List[QuantumGate]) -> List[QuantumGate]:
+        """peephole이 켜져 있으면 핍홀 최적화를 거친 게이트 리스트 (제거된 수는 gates_removed에 누적)"""
+        if not self.peephole or len(gates) < 2:
+            return gates
+        from .optimizer import peephole_optimize
+        optimized = peephole_optimize(gates)
+        removed = len(gates) - len(optimized)
+        if removed:
+            self.gates_removed += removed
+            self._trace(lambda: f"핍홀 최적화: 게이트 {len(gates)}개 중 {removed}개 제거")
+        return optimized
+    
+    def _optimized_gates(self, gates: List[QuantumGate] = None, fuse: bool = None) -> List[QuantumGate]:
+        """시뮬레이션에 사용할 게이트 리스트 (최적화 패스 적용)
+
+        fuse가 None이면 FUSION_MIN_QUBITS 이상인 회로만 퓨전한다.
+        """
+        from .optimizer import fuse_gates
+        gates = self._peephole_gates(self.gates if gates is None else gates)
+        if fuse is None:
+            fuse = self.n_qubits >= FUSION_MIN_QUBITS
+        return fuse_gates(gates, self.max_fused_width) if fuse else gates
+    
+    # === 프로파일링 ===
+    
+    def set_profiling(self, enabled: bool):
+        """게이트별 프로파일링 토글 (이미 기록된 통계는 유지)"""
+        self.profile = enabled
+        return self
+    
+    def _record_profile(self, name: str, elapsed: float, nbytes: int):
+        entry = self._profile.setdefault(name, [0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += nbytes
+    
+    def _apply_gate_profiled(self, gate: QuantumGate, state: QuantumState, simulator) -> QuantumState:
+        """_apply_gate + 소요 시간/접근 바이트 기록
+
+        퓨전된 게이트는 비용을 합쳐진 원래 게이트들에 똑같이 나눠 원래 게이트 종류별로 기록한다.
+        """
+        start = time.perf_counter()
+        state = self._apply_gate(gate, state, simulator)
+        elapsed = time.perf_counter() - start
+        nbytes = _gate_bytes_touched(gate, state.state_vector.nbytes)
+        if not gate.fused_names:
+            self._record_profile(gate.name, elapsed, nbytes)
+            return state
+        self._fused_passes += 1
+        share, remainder = divmod(nbytes, len(gate.fused_names))
+        for index, name in enumerate(gate.fused_names):
+            self._record_profile(name, elapsed / len(gate.fused_names), share + (remainder if index == 0 else 0))
+        return state
+    
+    def _layer_depth(self) -> int:
+        """같은 큐빗을 쓰지 않는 게이트를 한 층으로 묶었을 때의 층 수"""
+        levels = [0] * self.n_qubits
+        for gate in self.gates:
+            qubits = list(gate.control_qubits) + list(gate.target_qubits)
+            level = max(levels[q] for q in qubits) + 1
+            for q in qubits:
+                levels[q] = level
+        return max(levels, default=0)
+    
+    def stats(self) -> Dict[str, Any]:
+        """시뮬레이션 통계
+
+        gates는 실제로 적용한 (핍홀 최적화 후) 게이트 종류별 {"count", "time", "bytes"}이며
+        profile=True일 때만 기록된다. 퓨전된 게이트의 비용은 합쳐진 원래 게이트들에 똑같이 나눠 더하고,
+        fused_passes는 퓨전 게이트 적용 횟수다. bytes는 상태 벡터를 읽고 쓴 양의 추정치
+        (제어/대각 게이트는 조건을 만족하는 부분 공간만 센다, 스태빌라이저/MPS/희소 백엔드는 0).
+        """
+        gates = {name: {"count": count, "time": elapsed, "bytes": nbytes}
+                 for name, (count, elapsed, nbytes) in sorted(self._profile.items())}
+        return {
+            "n_qubits": self.n_qubits,
+            "backend": self.active_backend,
+            "precision": self.precision,
+            "state_vector_bytes": 0 if self._circuit_state is None else int(self._circuit_state.state_vector.nbytes),
+            "gate_count": len(self.gates),
+            "depth": self._layer_depth(),
+            "gates_removed": self.gates_removed,
+            "profiled": self.profile,
+            "fused_passes": self._fused_passes,
+            "total_time": sum(entry["time"] for entry in gates.values()),
+            "total_bytes": sum(entry["bytes"] for entry in gates.values()),
+            "gates": gates,
+        }
+    
     def _apply_gate(self, gate: QuantumGate, state: QuantumState, simulator) -> QuantumState:
         """개별 게이트를 상태에 적용"""
-        if gate.name == "H":
-            return simulator.apply_single_gate_to_circuit("H", state, gate.target_qubits[0], self.debug_mode)
+        if gate.matrix is not None:
+            # 퓨전된 게이트: 2^k x 2^k 유니터리 직접 적용
+            return simulator.apply_unitary_to_circuit(gate.matrix, state, gate.target_qubits)
+        elif gate.name == "H":
+            return simulator.apply_single_gate_to_circuit("H", state, gate.target_qubits[0])
         elif gate.name == "X":
-            return simulator.apply_single_gate_to_circuit("X", state, gate.target_qubits[0], self.debug_mode)
+            return simulator.apply_single_gate_to_circuit("X", state, gate.target_qubits[0])
         elif gate.name == "Y":
-            return simulator.apply_single_gate_to_circuit("Y", state, gate.target_qubits[0], self.debug_mode)
+            return simulator.apply_single_gate_to_circuit("Y", state, gate.target_qubits[0])
         elif gate.name == "Z":
-            return simulator.apply_single_gate_to_circuit("Z", state, gate.target_qubits[0], self.debug_mode)
+            return simulator.apply_single_gate_to_circuit("Z", state, gate.target_qubits[0])
         elif gate.name == "S":
-            return simulator.apply_single_gate_to_circuit("S", state, gate.target_qubits[0], self.debug_mode)
+            return simulator.apply_single_gate_to_circuit("S", state, gate.target_qubits[0])
         elif gate.name == "T":
-            return simulator.apply_single_gate_to_circuit("T", state, gate.target_qubits[0], self.debug_mode)
+            return simulator.apply_single_gate_to_circuit("T", state, gate.target_qubits[0])
         elif gate.name in ["RX", "RY", "RZ"]:
             axis = gate.name[1]  # "X", "Y", "Z"
             angle = gate.parameters[0]
-            return simulator.apply_rotation_to_circuit(axis, angle, state, gate.target_qubits[0], self.debug_mode)
-        elif gate.name == "CNOT":
-            return simulator.apply_cnot_to_circuit(state, gate.control_qubits[0], gate.target_qubits[0], self.debug_mode)
-        elif gate.name == "CZ":
-            return simulator.apply_cz_to_circuit(state, gate.control_qubits[0], gate.target_qubits[0], self.debug_mode)
+            if isinstance(angle, Parameter):
+                raise ValueError(f"Unbound parameter: {angle.name} (use compile() and bind() first)")
+            return simulator.apply_rotation_to_circuit(axis, angle, state, gate.target_qubits[0])
+        elif gate.name == "CNOT" or (gate.name.endswith("X") and gate.control_qubits):
+            return simulator.apply_mcx_to_circuit(state, gate.control_qubits, gate.target_qubits[0])
+        elif gate.name.lstrip("C") == "Z":
+            # CZ, CCZ, CCCZ, ...: 대각 게이트라 제어/타겟 구분 없이 전체 큐빗 사용
+            return simulator.apply_controlled_z_to_circuit(state, gate.control_qubits + gate.target_qubits)
         else:
             raise ValueError(f"Unknown gate: {gate.name}")
     
@@ -643,12 +1186,12 @@ class QuantumCircuit:
                 for i in range(self.n_qubits):
                     if i != qubit:
                         lines[i] += "─────────────"
-            elif gate.name == "CNOT":
-                # CNOT 게이트
-                control = gate.control_qubits[0]
+            elif gate.name == "CNOT" or (gate.name.endswith("X") and gate.control_qubits):
+                # CNOT / 다중 제어 X 게이트
+                controls = gate.control_qubits
                 target = gate.target_qubits[0]
                 for i in range(self.n_qubits):
-                    if i == control:
+                    if i in controls:
                         lines[i] += "●────"
                     elif i == target:
                         lines[i] += "⊕────"
@@ -664,45 +1207,81 @@ class QuantumCircuit:
     def __str__(self) -> str:
         return self.draw()
 
+def _gate_bytes_touched(gate: QuantumGate, state_bytes: int) -> int:
+    """게이트 한 번이 읽고 쓰는 상태 벡터 바이트 추정
+
+    일반 게이트는 전체를 한 번 읽고 쓰고, 제어 X는 제어 비트가 모두 1인 부분만,
+    CZ/CCZ 같은 제어 Z는 모든 비트가 1인 진폭만 건드린다.
+    """
+    if gate.name.lstrip("C") == "Z" and gate.name != "Z":
+        fixed_bits = len(gate.control_qubits) + len(gate.target_qubits)
+    elif gate.matrix is None:
+        fixed_bits = len(gate.control_qubits)
+    else:
+        fixed_bits = 0
+    return (2 * state_bytes) >> fixed_bits
+
+
+class CompiledCircuit:
+    """기호 매개변수 회로의 컴파일 결과 (한 번 컴파일, 여러 번 bind)
+
+    매개변수가 없는 게이트 구간은 컴파일할 때 한 번만 퓨전해 두고 (매개변수 게이트는 퓨전하지 않음),
+    bind()는 매개변수 게이트의 각도만 다시 계산해 새 지연 회로를 만든다.
+    """
+    def __init__(self, circuit: QuantumCircuit):
+        self.n_qubits = circuit.n_qubits
+        self.parameters = circuit.parameters
+        self.measurements = list(circuit.measurements)
+        self.gates = circuit._optimized_gates(fuse=True)
+        self._parametric = [i for i, gate in enumerate(self.gates) if gate.is_parametric]
+        self._options = {
+            "debug_mode": circuit.debug_mode,
+            "precision": circuit.precision,
+            "storage": circuit.storage,
+            "scratch_dir": circuit.scratch_dir,
+            "memory_budget": circuit.memory_budget,
+            "profile": circuit.profile,
+            "tracer": circuit.tracer,
+        }
+    
+    def _parameter_values(self, values) -> Dict[str, float]:
+        """{이름: 값} 또는 parameters 순서의 값 리스트를 사전으로 변환"""
+        if not isinstance(values, dict):
+            values = list(values)
+            if len(values) != len(self.parameters):
+                raise ValueError(f"Expected {len(self.parameters)} parameter values, got {len(values)}")
+            values = dict(zip(self.parameters, values))
+        missing = [name for name in self.parameters if name not in values]
+        if missing:
+            raise ValueError(f"Unbound parameters: {', '.join(missing)}")
+        return values
+    
+    def bind(self, values) -> QuantumCircuit:
+        """매개변수 값을 대입한 지연 회로 반환 (상태 벡터는 처음 관측할 때 시뮬레이션)
+
+        게이트는 이미 퓨전되어 있으므로 반환된 회로는 다시 퓨전하지 않는다.
+        """
+        values = self._parameter_values(values)
+        gates = list(self.gates)
+        for index in self._parametric:
+            gate = gates[index]
+            parameters = [p.resolve(values) if isinstance(p, Parameter) else p for p in gate.parameters]
+            gates[index] = QuantumGate(gate.name, gate.target_qubits, gate.control_qubits, parameters)
+        
+        circuit = QuantumCircuit(self.n_qubits, max_fused_width=0, lazy=True, **self._options)
+        circuit.gates = gates
+        circuit.measurements = list(self.measurements)
+        circuit._gate_count = len(gates)
+        return circuit
+    
+    def __str__(self) -> str:
+        return f"CompiledCircuit({self.n_qubits} qubits, {len(self.gates)} gates, parameters={self.parameters})"
+
 class QuantumSimulator:
     def __init__(self):
-        
-        self.predefined_states = {
-            "|0⟩": np.array([1.0, 0.0]),
-            "|1⟩": np.array([0.0, 1.0]),
-            "|+⟩": np.array([1/np.sqrt(2), 1/np.sqrt(2)]),
-            "|-⟩": np.array([1/np.sqrt(2), -1/np.sqrt(2)]),
-            "|+i⟩": np.array([1/np.sqrt(2), 1j/np.sqrt(2)]),
-            "|-i⟩": np.array([1/np.sqrt(2), -1j/np.sqrt(2)]),
-            
-            # Multi-qubit states
-            "|00⟩": np.array([1.0, 0.0, 0.0, 0.0]),
-            "|01⟩": np.array([0.0, 1.0, 0.0, 0.0]),
-            "|10⟩": np.array([0.0, 0.0, 1.0, 0.0]),
-            "|11⟩": np.array([0.0, 0.0, 0.0, 1.0]),
-            
-            # Bell states
-            "|Φ+⟩": np.array([1/np.sqrt(2), 0.0, 0.0, 1/np.sqrt(2)]),
-            "|Φ-⟩": np.array([1/np.sqrt(2), 0.0, 0.0, -1/np.sqrt(2)]),
-            "|Ψ+⟩": np.array([0.0, 1/np.sqrt(2), 1/np.sqrt(2), 0.0]),
-            "|Ψ-⟩": np.array([0.0, 1/np.sqrt(2), -1/np.sqrt(2), 0.0]),
-            
-            # 3-qubit states
-            "|000⟩": np.array([1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
-            "|GHZ⟩": np.array([1/np.sqrt(2), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1/np.sqrt(2)]),
-            "|W⟩": np.array([0.0, 1/np.sqrt(3), 1/np.sqrt(3), 0.0, 1/np.sqrt(3), 0.0, 0.0, 0.0]),
-        }
-        
-        # Quantum gates
-        self.gates = {
-            'I': np.array([[1, 0], [0, 1]]),
-            'X': np.array([[0, 1], [1, 0]]),
-            'Y': np.array([[0, -1j], [1j, 0]]),
-            'Z': np.array([[1, 0], [0, -1]]),
-            'H': np.array([[1, 1], [1, -1]]) / np.sqrt(2),
-            'S': np.array([[1, 0], [0, 1j]]),
-            'T': np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]]),
-        }
+        # 모듈 수준 읽기 전용 테이블 공유 (인스턴스마다 배열을 새로 만들지 않음)
+        self.predefined_states = PREDEFINED_STATES
+        self.gates = GATE_MATRICES
     
     def create_qubit(self, state_notation: str) -> QuantumState:
         """Create a quantum state from notation"""
@@ -733,107 +1312,72 @@ class QuantumSimulator:
             # For multi-qubit states, apply to the first qubit
             return self._apply_gate_to_qubit(gate, qubit, 0)
     
-    # 🆕 회로용 게이트 적용 메서드들 (DEBUG 제어 추가)
-    def apply_single_gate_to_circuit(self, gate_name: str, circuit_state: QuantumState, qubit_index: int, debug_mode: bool = False) -> QuantumState:
+    # 🆕 회로용 게이트 적용 메서드들 (tracer를 주면 커널 호출마다 메시지 기록)
+    def apply_single_gate_to_circuit(self, gate_name: str, circuit_state: QuantumState, qubit_index: int, tracer: Tracer = None) -> QuantumState:
         """회로의 특정 큐빗에 단일 게이트 적용"""
         if gate_name not in self.gates:
             raise ValueError(f"Unknown gate: {gate_name}")
         
         gate = self.gates[gate_name]
-        return self._apply_gate_to_qubit(gate, circuit_state, qubit_index, debug_mode)
+        return self._apply_gate_to_qubit(gate, circuit_state, qubit_index, tracer, in_place=True)
+    
+    def apply_unitary_to_circuit(self, unitary: np.ndarray, circuit_state: QuantumState, qubit_indices: List[int], tracer: Tracer = None) -> QuantumState:
+        """회로의 여러 큐빗에 2^k x 2^k 유니터리 적용 (퓨전된 게이트용)"""
+        if tracer is not None:
+            tracer.message(lambda: f"{len(qubit_indices)}큐빗 유니터리 적용 - qubits={list(qubit_indices)}")
+        
+        if circuit_state.state_vector.dtype.kind != 'c':
+            circuit_state.state_vector = circuit_state.state_vector.astype(complex)
+        state_vector = circuit_state.state_vector
+        apply_multi_qubit_gate(state_vector, unitary.astype(state_vector.dtype, copy=False), qubit_indices,
+                               circuit_state.chunk_size)
+        return circuit_state
     
-    def apply_rotation_to_circuit(self, axis: str, angle: float, circuit_state: QuantumState, qubit_index: int, debug_mode: bool = False) -> QuantumState:
+    def apply_rotation_to_circuit(self, axis: str, angle: float, circuit_state: QuantumState, qubit_index: int, tracer: Tracer = None) -> QuantumState:
         """회로의 특정 큐빗에 회전 게이트 적용"""
-        if axis.upper() == 'X':
-            gate = np.array([
-                [np.cos(angle/2), -1j*np.sin(angle/2)],
-                [-1j*np.sin(angle/2), np.cos(angle/2)]
-            ])
-        elif axis.upper() == 'Y':
-            gate = np.array([
-                [np.cos(angle/2), -np.sin(angle/2)],
-                [np.sin(angle/2), np.cos(angle/2)]
-            ])
-        elif axis.upper() == 'Z':
-            gate = np.array([
-                [np.exp(-1j*angle/2), 0],
-                [0, np.exp(1j*angle/2)]
-            ])
-        else:
-            raise ValueError(f"Unknown rotation axis: {axis}")
-        
-        return self._apply_gate_to_qubit(gate, circuit_state, qubit_index, debug_mode)
+        gate = self.rotation_matrix(axis, angle)
+        return self._apply_gate_to_qubit(gate, circuit_state, qubit_index, tracer, in_place=True)
     
-    def apply_cnot_to_circuit(self, circuit_state: QuantumState, control_qubit: int, target_qubit: int, debug_mode: bool = False) -> QuantumState:
+    def rotation_matrix(self, axis: str, angle: float) -> np.ndarray:
+        """RX/RY/RZ 회전 게이트 행렬 (읽기 전용, 캐시됨)"""
+        return rotation_matrix(axis, angle)
+    
+    def apply_cnot_to_circuit(self, circuit_state: QuantumState, control_qubit: int, target_qubit: int, tracer: Tracer = None) -> QuantumState:
         """회로에 CNOT 게이트 적용"""
-        n_qubits = circuit_state.n_qubits
-        
-        if debug_mode:
-            print(f"DEBUG: CNOT 게이트 적용 - control={control_qubit}, target={target_qubit}")
-        
-        # CNOT 행렬을 전체 힐베르트 공간에서 구성
-        cnot_matrix = np.eye(2**n_qubits, dtype=complex)
-        
-        for i in range(2**n_qubits):
-            binary = format(i, f'0{n_qubits}b')
-            control_bit = int(binary[control_qubit])
-            
-            if control_bit == 1:
-                # 컨트롤 큐빗이 1이면 타겟 큐빗 플립
-                new_binary = list(binary)
-                new_binary[target_qubit] = '1' if new_binary[target_qubit] == '0' else '0'
-                j = int(''.join(new_binary), 2)
-                
-                # i번째 행을 j번째 행과 교체
-                cnot_matrix[i, i] = 0
-                cnot_matrix[i, j] = 1
-        
-        new_state_vector = cnot_matrix @ circuit_state.state_vector
-        return QuantumState(new_state_vector, n_qubits)
-    
-    def apply_cz_to_circuit(self, circuit_state: QuantumState, control_qubit: int, target_qubit: int, debug_mode: bool = False) -> QuantumState:
+        return self.apply_mcx_to_circuit(circuit_state, [control_qubit], target_qubit, tracer)
+    
+    def apply_mcx_to_circuit(self, circuit_state: QuantumState, control_qubits: List[int], target_qubit: int, tracer: Tracer = None) -> QuantumState:
+        """회로에 다중 제어 X 게이트 적용 (제어 큐빗이 모두 1이면 타겟 플립)"""
+        if tracer is not None:
+            tracer.message(lambda: f"다중 제어 X 게이트 적용 - control={list(control_qubits)}, target={target_qubit}")
+        
+        # 전체 힐베르트 공간 행렬 대신 비트마스크 인덱스 쌍을 제자리 교환
+        if circuit_state.state_vector.dtype.kind != 'c':
+            circuit_state.state_vector = circuit_state.state_vector.astype(complex)
+        apply_controlled_x(circuit_state.state_vector, control_qubits, target_qubit, circuit_state.chunk_size)
+        return circuit_state
+    
+    def apply_cz_to_circuit(self, circuit_state: QuantumState, control_qubit: int, target_qubit: int, tracer: Tracer = None) -> QuantumState:
         """회로에 CZ 게이트 적용"""
-        n_qubits = circuit_state.n_qubits
-        
-        if debug_mode:
-            print(f"DEBUG: CZ 게이트 적용 - control={control_qubit}, target={target_qubit}")
-        
-        # CZ 행렬 구성
-        cz_matrix = np.eye(2**n_qubits, dtype=complex)
-        
-        for i in range(2**n_qubits):
-            binary = format(i, f'0{n_qubits}b')
-            control_bit = int(binary[control_qubit])
-            target_bit = int(binary[target_qubit])
-            
-            if control_bit == 1 and target_bit == 1:
-                cz_matrix[i, i] = -1
-        
-        new_state_vector = cz_matrix @ circuit_state.state_vector
-        return QuantumState(new_state_vector, n_qubits)
+        return self.apply_controlled_z_to_circuit(circuit_state, [control_qubit, target_qubit], tracer)
+    
+    def apply_controlled_z_to_circuit(self, circuit_state: QuantumState, qubits: List[int], tracer: Tracer = None) -> QuantumState:
+        """회로에 N큐빗 제어 Z 게이트 적용 (지정된 큐빗이 모두 1이면 위상 뒤집기)"""
+        if tracer is not None:
+            tracer.message(lambda: f"제어 Z 게이트 적용 - qubits={list(qubits)}")
+        
+        # 대각 행렬 대신 모든 비트가 1인 진폭들만 제자리에서 -1 곱하기
+        if circuit_state.state_vector.dtype.kind != 'c':
+            circuit_state.state_vector = circuit_state.state_vector.astype(complex)
+        apply_controlled_phase(circuit_state.state_vector, qubits, -1, circuit_state.chunk_size)
+        return circuit_state
     
     def apply_rotation_gate(self, axis: str, angle: float, qubit: QuantumState) -> QuantumState:
         """Apply rotation gates RX, RY, RZ"""
         if qubit.is_measured:
             raise RuntimeError("Cannot apply gate to measured qubit!")
         
-        if axis.upper() == 'X':
-            gate = np.array([
-                [np.cos(angle/2), -1j*np.sin(angle/2)],
-                [-1j*np.sin(angle/2), np.cos(angle/2)]
-            ])
-        elif axis.upper() == 'Y':
-            gate = np.array([
-                [np.cos(angle/2), -np.sin(angle/2)],
-                [np.sin(angle/2), np.cos(angle/2)]
-            ])
-        elif axis.upper() == 'Z':
-            gate = np.array([
-                [np.exp(-1j*angle/2), 0],
-                [0, np.exp(1j*angle/2)]
-            ])
-        else:
-            raise ValueError(f"Unknown rotation axis: {axis}")
+        gate = self.rotation_matrix(axis, angle)
         
         if qubit.n_qubits == 1:
             new_state = gate @ qubit.state_vector
@@ -863,48 +1407,28 @@ class QuantumSimulator:
         new_state = cnot @ combined.state_vector
         return QuantumState(new_state, 2)
     
-    def _apply_gate_to_qubit(self, gate: np.ndarray, state: QuantumState, qubit_index: int, debug_mode: bool = False) -> QuantumState:
+    def _apply_gate_to_qubit(self, gate: np.ndarray, state: QuantumState, qubit_index: int, tracer: Tracer = None,
+                             in_place: bool = False) -> QuantumState:
         """Apply a single-qubit gate to a specific qubit in a multi-qubit system"""
         n = state.n_qubits
         
-        # 🔧 큐빗 순서 수정: Qube는 little-endian (q0가 최하위 비트)
-        # 텐서곱에서는 big-endian (가장 왼쪽이 첫 번째)이므로 인덱스 변환 필요
-        tensor_index = n - 1 - qubit_index
-        
-        if debug_mode:
-            print(f"DEBUG: _apply_gate_to_qubit 호출됨 - qubit_index={qubit_index} → tensor_index={tensor_index}, n_qubits={n}")
-            print(f"DEBUG: 입력 상태: {[abs(amp)**2 for amp in state.state_vector[:min(16, len(state.state_vector))]]}")
-            print(f"DEBUG: 게이트 행렬:\n{gate}")
-        
-        if tensor_index == 0:
-            # Apply to first position in tensor product
-            identity = np.eye(2**(n-1))
-            full_gate = np.kron(gate, identity)
-            if debug_mode:
-                print(f"DEBUG: 텐서 첫 번째 위치에 적용 - gate shape: {gate.shape}")
-        elif tensor_index == n-1:
-            # Apply to last position in tensor product
-            identity = np.eye(2**(n-1))
-            full_gate = np.kron(identity, gate)
-            if debug_mode:
-                print(f"DEBUG: 텐서 마지막 위치에 적용 - gate shape: {gate.shape}")
+        # 🔧 Qube는 little-endian (q0가 최하위 비트): 큐빗 k는 인덱스의 k번째 비트
+        # 2^n x 2^n 연산자를 만들지 않고 strided 뷰에서 두 슬라이스만 갱신 (O(2^n))
+        # 적용 후 확률은 회로 게이트 기록 (Tracer.gate)에 남으므로 여기서는 호출 메시지만
+        if tracer is not None:
+            tracer.message(lambda: f"단일 큐빗 게이트 적용 - qubit_index={qubit_index}, n_qubits={n}, in_place={in_place}")
+        
+        if in_place and state.state_vector.dtype.kind == 'c' and state.state_vector.flags.c_contiguous:
+            # 게이트 행렬을 상태 dtype으로 맞춰야 complex64 상태가 complex128 연산으로 승격되지 않음
+            apply_single_qubit_gate(state.state_vector, gate.astype(state.state_vector.dtype, copy=False), qubit_index,
+                                    state.chunk_size)
+            result = state
         else:
-            # Apply to middle position in tensor product
-            left_identity = np.eye(2**tensor_index)
-            right_identity = np.eye(2**(n-tensor_index-1))
-            full_gate = np.kron(np.kron(left_identity, gate), right_identity)
-            if debug_mode:
-                print(f"DEBUG: 텐서 중간 위치에 적용 - position {tensor_index}")
+            new_state = np.array(state.state_vector, dtype=complex)
+            apply_single_qubit_gate(new_state, gate, qubit_index)
+            result = QuantumState(new_state, n)
         
-        if debug_mode:
-            print(f"DEBUG: full_gate shape: {full_gate.shape}")
-        
-        new_state = full_gate @ state.state_vector
-        
-        if debug_mode:
-            print(f"DEBUG: 출력 상태: {[abs(amp)**2 for amp in new_state[:min(16, len(new_state))]]}")
-        
-        return QuantumState(new_state, n)
+        return result
     
     def calculate_fidelity(self, state1: QuantumState, state2: QuantumState) -> float:
         """Calculate fidelity between two quantum states"""
@@ -914,19 +1438,12 @@ class QuantumSimulator:
         overlap = np.vdot(state1.state_vector, state2.state_vector)
         return abs(overlap) ** 2
     
-    def calculate_entanglement_measure(self, state: QuantumState) -> float:
-        """Calculate a simple entanglement measure"""
-        if state.n_qubits < 2:
-            return 0.0
-        
-        # For 2-qubit states, calculate concurrence (simplified)
-        if state.n_qubits == 2:
-            # Reshape state vector into 2x2 matrix
-            rho = np.outer(state.state_vector, np.conj(state.state_vector))
-            
-            # Calculate von Neumann entropy of reduced density matrix
-            # This is a simplified measure
-            trace_rho_squared = np.trace(rho @ rho)
-            return 1.0 - trace_rho_squared.real
-        
-        return 0.5  # Placeholder for higher-dimensional states
\ No newline at end of file
+    def calculate_entanglement_measure(self, state: QuantumState, qubits: List[int] = None) -> float:
+        """이분할 얽힘 엔트로피 (비트): qubits (기본: 앞쪽 절반 큐빗, little-endian 번호)와 나머지 사이"""
+        if qubits is None:
+            qubits = list(range(state.n_qubits // 2))
+        return state.entropy(qubits)
+
+
+# 회로 시뮬레이션용 공유 시뮬레이터 (상태가 없으므로 게이트마다 새로 만들 필요 없음)
+_SIMULATOR = QuantumSimulator()
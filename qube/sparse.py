@@ -0,0 +1,215 @@
+"""
+sparse.py - 희소 상태 벡터 시뮬레이션
+
+0이 아닌 진폭만 (기저 상태 인덱스, 진폭) 배열 두 개로 저장한다. X, CNOT, CCZ처럼 기저 상태를
+기저 상태로 보내는 게이트(단항 행렬: 열마다 0이 아닌 원소가 하나)는 인덱스 비트 연산과 위상 곱으로
+끝나므로 오라클 위주 회로는 큐빗 수와 무관하게 0이 아닌 진폭 수에 비례하는 시간/메모리만 쓴다.
+그 외 게이트는 게이트 큐빗을 뺀 나머지 비트가 같은 진폭끼리 묶어 로컬 행렬을 곱하고,
+크기가 prune_threshold 이하인 진폭은 버린다.
+
+state = SparseState(40)
+state.apply_gate(QuantumGate("X", [3]))
+state.apply_gate(QuantumGate("CNOT", [39], [3]))
+state.nnz                                   # 1
+counts = state.sample_counts(1000, [3, 39])
+
+채움 비율(fill_ratio)이 커지면 희소 표현이 오히려 느리므로 QuantumCircuit(backend="sparse")는
+max_fill_ratio를 넘는 순간 상태 벡터로 전환한다.
+"""
+
+import numpy as np
+from collections import Counter
+from typing import Dict, List
+
+from .kernels import bit_rows_to_indices
+from .observables import mask_parities
+
+
+# 기본 진폭 절단 임계값 (|진폭| 이하이면 버림)과 상태 벡터 전환 채움 비율
+DEFAULT_PRUNE_THRESHOLD = 1e-12
+DEFAULT_MAX_FILL_RATIO = 1 / 16
+
+# 인덱스를 int64에 담으므로 부호 비트를 뺀 63비트 미만까지
+MAX_SPARSE_QUBITS = 62
+
+
+class SparseState:
+    """0이 아닌 진폭만 저장하는 n큐빗 상태 (|0...0⟩에서 시작, 인덱스는 little-endian)"""
+    def __init__(self, n_qubits: int, prune_threshold: float = DEFAULT_PRUNE_THRESHOLD, dtype=np.complex128):
+        if n_qubits > MAX_SPARSE_QUBITS:
+            raise ValueError(f"Sparse backend supports at most {MAX_SPARSE_QUBITS} qubits, got {n_qubits}")
+        self.n_qubits = n_qubits
+        self.prune_threshold = prune_threshold
+        self.dtype = np.dtype(dtype)
+        self.indices = np.zeros(1, dtype=np.int64)  # 인덱스는 서로 다르지만 정렬되어 있지는 않음
+        self.amplitudes = np.ones(1, dtype=self.dtype)
+
+    def copy(self) -> 'SparseState':
+        state = SparseState(self.n_qubits, self.prune_threshold, self.dtype)
+        state.indices = self.indices.copy()
+        state.amplitudes = self.amplitudes.copy()
+        return state
+
+    @property
+    def nnz(self) -> int:
+        """저장된 (0이 아닌) 진폭 수"""
+        return self.indices.size
+
+    @property
+    def fill_ratio(self) -> float:
+        """전체 2^n 진폭 중 저장된 진폭 비율"""
+        return self.nnz / 2.0**self.n_qubits
+
+    def _local_indices(self, qubits: List[int]) -> np.ndarray:
+        """각 진폭의 로컬 인덱스 (qubits[j]의 비트가 j번째 비트)"""
+        local = np.zeros(self.nnz, dtype=np.int64)
+        for j, qubit in enumerate(qubits):
+            local |= ((self.indices >> qubit) & 1) << j
+        return local
+
+    @staticmethod
+    def _scatter_table(qubits: List[int]) -> np.ndarray:
+        """로컬 인덱스 → 전역 비트 패턴 (j번째 비트를 qubits[j] 위치로)"""
+        local = np.arange(1 << len(qubits), dtype=np.int64)
+        table = np.zeros_like(local)
+        for j, qubit in enumerate(qubits):
+            table |= ((local >> j) & 1) << qubit
+        return table
+
+    # === 게이트 적용 ===
+
+    def apply_unitary(self, matrix: np.ndarray, qubits: List[int]):
+        """로컬 유니터리 적용 (qubits[j]가 로컬 인덱스의 j번째 비트)"""
+        qubits = [int(q) for q in qubits]
+        mask = int(sum(1 << q for q in qubits))
+        scatter = self._scatter_table(qubits)
+        local = self._local_indices(qubits)
+        rest = self.indices & ~mask
+
+        nonzero = matrix != 0
+        if np.all(np.count_nonzero(nonzero, axis=0) == 1):
+            # 단항 행렬 (순열 x 위상): 진폭 수가 그대로이므로 인덱스와 위상만 갱신
+            rows = np.argmax(nonzero, axis=0)
+            phases = matrix[rows, np.arange(matrix.shape[1])].astype(self.dtype, copy=False)
+            self.indices = rest | scatter[rows[local]]
+            self.amplitudes = self.amplitudes * phases[local]
+            return
+
+        # 일반 행렬: 나머지 비트가 같은 진폭들을 (그룹 수, 2^k) 블록으로 모아 로컬 행렬 곱
+        groups, inverse = np.unique(rest, return_inverse=True)
+        block = np.zeros((groups.size, matrix.shape[0]), dtype=self.dtype)
+        block[inverse.reshape(-1), local] = self.amplitudes
+        block = block @ matrix.T.astype(self.dtype, copy=False)
+        indices = (groups[:, None] | scatter[None, :]).reshape(-1)
+        amplitudes = block.reshape(-1)
+        keep = np.abs(amplitudes) > self.prune_threshold
+        self.indices = indices[keep]
+        self.amplitudes = amplitudes[keep]
+
+    def apply_gate(self, gate):
+        """QuantumGate 하나 적용 (행렬로 표현할 수 있는 게이트만)"""
+        from .optimizer import gate_unitary
+        unitary = gate_unitary(gate)
+        if unitary is None:
+            raise ValueError(f"Unsupported gate for sparse simulation: {gate.name}")
+        qubits, matrix = unitary
+        self.apply_unitary(matrix, qubits)
+
+    # === 측정 ===
+
+    def _probabilities(self) -> np.ndarray:
+        probabilities = (self.amplitudes.real**2 + self.amplitudes.imag**2).astype(float)
+        return probabilities / probabilities.sum()
+
+    def measure(self, qubit: int) -> int:
+        """큐빗 측정 후 상태 붕괴"""
+        probabilities = self._probabilities()
+        ones = ((self.indices >> qubit) & 1).astype(bool)
+        prob_one = float(probabilities[ones].sum())
+        result = 1 if np.random.random() < prob_one else 0
+        keep = ones if result else ~ones
+        self.indices = self.indices[keep]
+        self.amplitudes = self.amplitudes[keep] / np.sqrt(prob_one if result else 1.0 - prob_one)
+        return result
+
+    def sample_counts(self, shots: int, qubits: List[int] = None) -> Dict[int, int]:
+        """상태를 붕괴시키지 않고 shots번 샘플링한 히스토그램 (qubits[j]가 j번째 비트)
+
+        저장된 진폭들에 대한 다항 분포 한 번으로 샷을 나누고 측정 큐빗 비트로 모은다.
+        """
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        hits = np.random.multinomial(shots, self._probabilities())
+        drawn = np.flatnonzero(hits)
+        bits = (self.indices[drawn, None] >> np.asarray(qubits, dtype=np.int64)[None, :]) & 1
+        counts = Counter()
+        for outcome, count in zip(bit_rows_to_indices(bits), hits[drawn].tolist()):
+            counts[outcome] += count
+        return dict(sorted(counts.items()))
+
+    def marginal_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """측정 큐빗들의 결과 확률 (길이 2^k, qubits[j]가 j번째 비트)"""
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        return np.bincount(self._local_indices(qubits), weights=self._probabilities(),
+                           minlength=1 << len(qubits))
+
+    def pauli_expectations(self, flip_mask: int, phase_masks: List[int]) -> np.ndarray:
+        """위상 마스크마다 Σ_b conj(ψ[b ⊕ x]) ψ[b] (-1)^{|b&z|} (= ⟨X^x Z^z⟩)
+
+        짝 진폭 ψ[b ⊕ x]는 정렬된 인덱스에서 이진 탐색으로 찾는다 (없으면 0).
+        """
+        if flip_mask:
+            order = np.argsort(self.indices)
+            sorted_indices = self.indices[order]
+            partners = self.indices ^ flip_mask
+            position = np.minimum(np.searchsorted(sorted_indices, partners), self.nnz - 1)
+            found = sorted_indices[position] == partners
+            partner_amplitudes = np.where(found, self.amplitudes[order[position]], 0)
+        else:
+            partner_amplitudes = self.amplitudes
+        overlap = partner_amplitudes.conj() * self.amplitudes
+        norm = float(np.sum(self.amplitudes.real**2 + self.amplitudes.imag**2))
+        return np.array([np.sum(overlap * (1 - 2 * mask_parities(self.indices, phase_mask)))
+                         for phase_mask in phase_masks]) / norm
+
+    # === 얽힘 ===
+
+    def _bipartition_matrix(self, qubits: List[int]):
+        """(qubits 로컬 인덱스들, 행렬 M) - 저장된 진폭만으로 만든 ψ[a, 나머지]의 0이 아닌 행/열 부분 (정규화)"""
+        mask = sum(1 << q for q in qubits)
+        row_keys, rows = np.unique(self._local_indices(qubits), return_inverse=True)
+        _, columns = np.unique(self.indices & ~mask, return_inverse=True)
+        matrix = np.zeros((row_keys.size, columns.max() + 1), dtype=self.dtype)
+        matrix[rows, columns] = self.amplitudes
+        return row_keys, matrix / np.linalg.norm(self.amplitudes)
+
+    def schmidt_coefficients(self, qubits: List[int]) -> np.ndarray:
+        """qubits | 나머지 이분할의 슈미트 계수 (내림차순)
+
+        진폭이 있는 행/열만 남긴 M (최대 nnz x nnz)의 더 작은 쪽 그람 행렬 고윳값의 제곱근이다.
+        """
+        _, matrix = self._bipartition_matrix(list(qubits))
+        gram = matrix @ matrix.conj().T if matrix.shape[0] <= matrix.shape[1] else matrix.conj().T @ matrix
+        coefficients = np.sqrt(np.clip(np.linalg.eigvalsh(gram)[::-1], 0.0, None))
+        return coefficients / np.linalg.norm(coefficients)
+
+    def reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """qubits 부분계의 축소 밀도 행렬 (2^k x 2^k, qubits[j]가 행/열 인덱스의 j번째 비트)"""
+        row_keys, matrix = self._bipartition_matrix(list(qubits))
+        density = np.zeros((1 << len(qubits), 1 << len(qubits)), dtype=self.dtype)
+        density[np.ix_(row_keys, row_keys)] = matrix @ matrix.conj().T
+        return density
+
+    def write_state_vector(self, state_vector: np.ndarray, chunk_size: int = None):
+        """0으로 초기화된 상태 벡터에 저장된 진폭 채우기 (memmap도 그대로 사용)
+
+        저장된 진폭만 쓰므로 임시 배열이 없어 chunk_size는 쓰지 않는다.
+        """
+        state_vector[self.indices] = self.amplitudes
+
+    def to_state_vector(self) -> np.ndarray:
+        """전체 상태 벡터로 변환 (little-endian)"""
+        state_vector = np.zeros(2**self.n_qubits, dtype=self.dtype)
+        self.write_state_vector(state_vector)
+        return state_vector
@@ -0,0 +1,368 @@
+"""
+stabilizer.py - 스태빌라이저 테이블로 Clifford 회로 시뮬레이션
+
+H, S, X, Y, Z, CNOT, CZ만 쓰는 회로는 상태 벡터 대신 Aaronson-Gottesman 테이블
+(2n개의 파울리 연산자 = n x 2n 비트 행렬 두 개)로 추적할 수 있다.
+게이트는 O(n), 측정은 O(n^2)이므로 수천 큐빗 GHZ/오류 정정 회로도 다항 시간/메모리로 처리한다.
+
+tableau = StabilizerState(1000)
+tableau.apply_gate(QuantumGate("H", [0]))
+for q in range(999):
+    tableau.apply_gate(QuantumGate("CNOT", [q + 1], control_qubits=[q]))
+counts = tableau.sample_counts(1000, qubits=[0, 999])   # {0b00: ~500, 0b11: ~500}
+
+QuantumCircuit(n, backend="auto")는 게이트가 모두 Clifford이면 측정/샘플링에 이 백엔드를 사용한다.
+"""
+
+import numpy as np
+from typing import Dict, List
+
+from .quantum import QuantumGate
+from .kernels import bit_rows_to_indices
+from .observables import mask_parities
+
+
+# 스태빌라이저 백엔드가 지원하는 단일 큐빗 게이트
+CLIFFORD_SINGLE_QUBIT_GATES = frozenset({"H", "S", "X", "Y", "Z"})
+
+# 샘플링할 때 한 번에 만드는 샷 수 (shots x 측정 큐빗 비트 행렬 메모리 제한)
+SAMPLE_BATCH_SIZE = 1 << 16
+
+# 무작위 측정 변수가 이 개수 이하이면 가능한 결과 2^m개를 나열해 다항분포로 샘플링
+MAX_ENUMERATED_VARIABLES = 20
+
+
+def is_clifford_gate(gate: QuantumGate) -> bool:
+    """스태빌라이저 테이블로 적용할 수 있는 게이트인지 여부"""
+    if gate.matrix is not None or gate.parameters:
+        return False
+    if gate.name in CLIFFORD_SINGLE_QUBIT_GATES:
+        return not gate.control_qubits
+    if gate.name == "CNOT":
+        return len(gate.control_qubits) == 1
+    if gate.name == "CZ":
+        return len(gate.control_qubits) + len(gate.target_qubits) == 2
+    return False
+
+
+# Aaronson-Gottesman g 함수 표: 인덱스 = x1 z1 x2 z2 비트 (파울리 P1 * P2가 만드는 i의 지수, -1/0/+1)
+_PHASE_TABLE = np.zeros(16, dtype=np.int8)
+for _x1, _z1, _x2, _z2 in np.ndindex(2, 2, 2, 2):
+    if _x1 and _z1:
+        _g = _z2 - _x2
+    elif _x1:
+        _g = _z2 * (2 * _x2 - 1)
+    elif _z1:
+        _g = _x2 * (1 - 2 * _z2)
+    else:
+        _g = 0
+    _PHASE_TABLE[(_x1 << 3) | (_z1 << 2) | (_x2 << 1) | _z2] = _g
+
+
+def _phase_exponents(x1: np.ndarray, z1: np.ndarray, x2: np.ndarray, z2: np.ndarray) -> np.ndarray:
+    """파울리 곱 P1 * P2의 i 지수 합 (mod 4) - g 함수 표를 열 방향으로 합산"""
+    index = (x1.view(np.uint8) << 3) | (z1.view(np.uint8) << 2) | (x2.view(np.uint8) << 1) | z2.view(np.uint8)
+    return np.sum(_PHASE_TABLE[index], axis=-1, dtype=np.int64) % 4
+
+
+def _gf2_rank(matrix: np.ndarray) -> int:
+    """GF(2) 위 비트 행렬의 계수 (가우스 소거)"""
+    matrix = matrix.copy()
+    rank = 0
+    for column in range(matrix.shape[1]):
+        pivots = np.flatnonzero(matrix[rank:, column])
+        if not pivots.size:
+            continue
+        pivot = rank + pivots[0]
+        matrix[[rank, pivot]] = matrix[[pivot, rank]]
+        rows = np.flatnonzero(matrix[:, column])
+        matrix[rows[rows != rank]] ^= matrix[rank]
+        rank += 1
+        if rank == matrix.shape[0]:
+            break
+    return rank
+
+
+class StabilizerState:
+    """n큐빗 스태빌라이저 상태 (테이블 행 0..n-1: 디스태빌라이저, n..2n-1: 스태빌라이저)
+
+    위상 r은 (2n, c) 비트 행렬이다. 0번 열이 상수 위상이고, 기호 측정(_symbolic_outcomes)에서는
+    1번 이후 열이 무작위 측정 결과 변수를 나타내 측정 결과를 변수들의 XOR로 표현한다.
+    """
+    def __init__(self, n_qubits: int):
+        self.n_qubits = n_qubits
+        rows = 2 * n_qubits
+        self.x = np.zeros((rows, n_qubits), dtype=bool)
+        self.z = np.zeros((rows, n_qubits), dtype=bool)
+        self.r = np.zeros((rows, 1), dtype=bool)
+        diagonal = np.arange(n_qubits)
+        self.x[diagonal, diagonal] = True               # 디스태빌라이저 X_i
+        self.z[n_qubits + diagonal, diagonal] = True    # 스태빌라이저 Z_i (|0...0⟩)
+
+    def copy(self) -> 'StabilizerState':
+        state = StabilizerState.__new__(StabilizerState)
+        state.n_qubits = self.n_qubits
+        state.x, state.z, state.r = self.x.copy(), self.z.copy(), self.r.copy()
+        return state
+
+    # === Clifford 게이트 (모든 행에 벡터화 적용, O(n)) ===
+
+    def h(self, qubit: int):
+        self.r[:, 0] ^= self.x[:, qubit] & self.z[:, qubit]
+        self.x[:, qubit], self.z[:, qubit] = self.z[:, qubit].copy(), self.x[:, qubit].copy()
+
+    def s(self, qubit: int):
+        self.r[:, 0] ^= self.x[:, qubit] & self.z[:, qubit]
+        self.z[:, qubit] ^= self.x[:, qubit]
+
+    def x_gate(self, qubit: int):
+        self.r[:, 0] ^= self.z[:, qubit]
+
+    def y_gate(self, qubit: int):
+        self.r[:, 0] ^= self.x[:, qubit] ^ self.z[:, qubit]
+
+    def z_gate(self, qubit: int):
+        self.r[:, 0] ^= self.x[:, qubit]
+
+    def cnot(self, control: int, target: int):
+        self.r[:, 0] ^= (self.x[:, control] & self.z[:, target]
+                         & ~(self.x[:, target] ^ self.z[:, control]))
+        self.x[:, target] ^= self.x[:, control]
+        self.z[:, control] ^= self.z[:, target]
+
+    def cz(self, control: int, target: int):
+        self.h(target)
+        self.cnot(control, target)
+        self.h(target)
+
+    def apply_gate(self, gate: QuantumGate):
+        """QuantumGate 하나 적용 (Clifford 게이트만)"""
+        if not is_clifford_gate(gate):
+            raise ValueError(f"Non-Clifford gate for stabilizer simulation: {gate.name}")
+        if gate.name == "H":
+            self.h(gate.target_qubits[0])
+        elif gate.name == "S":
+            self.s(gate.target_qubits[0])
+        elif gate.name == "X":
+            self.x_gate(gate.target_qubits[0])
+        elif gate.name == "Y":
+            self.y_gate(gate.target_qubits[0])
+        elif gate.name == "Z":
+            self.z_gate(gate.target_qubits[0])
+        elif gate.name == "CNOT":
+            self.cnot(gate.control_qubits[0], gate.target_qubits[0])
+        else:
+            qubits = list(gate.control_qubits) + list(gate.target_qubits)
+            self.cz(qubits[0], qubits[1])
+
+    # === 측정 ===
+
+    def _rowsum(self, targets, source: int):
+        """targets 행들에 source 행 파울리를 곱하기 (위상 포함)"""
+        exponents = _phase_exponents(self.x[source], self.z[source], self.x[targets], self.z[targets])
+        self.r[targets] ^= self.r[source]
+        self.r[targets, 0] ^= exponents == 2
+        self.x[targets] ^= self.x[source]
+        self.z[targets] ^= self.z[source]
+
+    def _measure(self, qubit: int, random_phase: np.ndarray):
+        """큐빗 Z 측정 후 (결과 위상 벡터, 무작위 결과 여부) 반환 (무작위 결과면 random_phase가 결과)"""
+        n = self.n_qubits
+        anticommuting = np.flatnonzero(self.x[n:, qubit])
+
+        if anticommuting.size:
+            # 무작위 결과: 반교환 스태빌라이저 p를 측정 연산자로 교체
+            p = n + anticommuting[0]
+            others = np.flatnonzero(self.x[:, qubit])
+            others = others[others != p]
+            if others.size:
+                self._rowsum(others, p)
+            self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+            self.x[p] = False
+            self.z[p] = False
+            self.z[p, qubit] = True
+            self.r[p] = random_phase
+            return self.r[p].copy(), True
+
+        # 결정적 결과: 디스태빌라이저가 가리키는 스태빌라이저들의 곱의 위상
+        return self._product_phase(n + np.flatnonzero(self.x[:n, qubit])), False
+
+    def _product_phase(self, rows: np.ndarray) -> np.ndarray:
+        """서로 교환하는 rows 행 파울리들의 곱의 위상 비트 벡터
+
+        행을 하나씩 누적하는 대신 누적 XOR로 "직전까지의 곱"을 한 번에 구해 위상 지수를 합산한다.
+        """
+        xs, zs = self.x[rows], self.z[rows]
+        prefix_x = np.zeros_like(xs)
+        prefix_z = np.zeros_like(zs)
+        prefix_x[1:] = np.logical_xor.accumulate(xs[:-1], axis=0)
+        prefix_z[1:] = np.logical_xor.accumulate(zs[:-1], axis=0)
+        exponents = _phase_exponents(xs, zs, prefix_x, prefix_z)
+        phase = np.logical_xor.reduce(self.r[rows], axis=0)
+        phase[0] ^= bool(np.sum(exponents // 2) % 2)
+        return phase
+
+    def measure(self, qubit: int) -> int:
+        """큐빗 측정 후 상태 붕괴 (무작위 결과는 np.random으로 결정)"""
+        outcome, _ = self._measure(qubit, np.array([np.random.randint(2)], dtype=bool))
+        return int(outcome[0])
+
+    def _symbolic_outcomes(self, qubits: List[int]) -> np.ndarray:
+        """측정 결과를 무작위 비트 변수들의 affine 함수로 표현한 (k, 1 + m) 비트 행렬
+
+        복사본에서 큐빗들을 한 번씩 측정하되, 무작위 결과마다 새 변수를 도입한다.
+        결과 j = 행렬[j, 0] XOR (행렬[j, 1:] · 변수들) 이므로 샷마다 테이블을 다시 측정할 필요가 없다.
+        """
+        state = self.copy()
+        state.r = np.zeros((self.r.shape[0], 1 + len(qubits)), dtype=bool)
+        state.r[:, 0] = self.r[:, 0]
+        outcomes = np.zeros((len(qubits), 1 + len(qubits)), dtype=bool)
+        n_variables = 0
+        for j, qubit in enumerate(qubits):
+            random_phase = np.zeros(state.r.shape[1], dtype=bool)
+            random_phase[1 + n_variables] = True
+            outcomes[j], is_random = state._measure(qubit, random_phase)
+            n_variables += is_random
+        return outcomes[:, :1 + n_variables]
+
+    def sample_counts(self, shots: int, qubits: List[int] = None) -> Dict[int, int]:
+        """상태를 붕괴시키지 않고 shots번 샘플링한 히스토그램 (qubits[j]가 j번째 비트)
+
+        무작위 변수 m개의 값마다 결과가 하나씩 정해지고 (서로 다름) 모두 확률 1/2^m이므로,
+        m이 작으면 변수 값 2^m개에 대한 다항분포에서 한 번에 뽑고, 크면 샷 배치별로 변수를 뽑는다.
+        """
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        outcomes = self._symbolic_outcomes(qubits).astype(np.int64)
+        constant, coefficients = outcomes[:, 0], outcomes[:, 1:]
+        n_variables = coefficients.shape[1]
+
+        if n_variables <= MAX_ENUMERATED_VARIABLES:
+            assignment_counts = np.random.multinomial(shots, np.full(1 << n_variables, 1.0 / (1 << n_variables)))
+            observed = np.flatnonzero(assignment_counts)
+            assignments = (observed[:, None] >> np.arange(n_variables)) & 1
+            keys = bit_rows_to_indices((assignments @ coefficients.T + constant) & 1)
+            return dict(sorted(zip(keys, assignment_counts[observed].tolist())))
+
+        counts = {}
+        for start in range(0, shots, SAMPLE_BATCH_SIZE):
+            batch = min(SAMPLE_BATCH_SIZE, shots - start)
+            variables = np.random.randint(0, 2, size=(batch, n_variables))
+            keys = bit_rows_to_indices((variables @ coefficients.T + constant) & 1)
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def marginal_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """측정 큐빗들의 결과 확률 (길이 2^k, qubits[j]가 j번째 비트)
+
+        스태빌라이저 상태의 측정 분포는 affine 부분공간 위의 균등 분포다.
+        """
+        if qubits is None:
+            qubits = list(range(self.n_qubits))
+        outcomes = self._symbolic_outcomes(qubits).astype(np.int64)
+        constant, coefficients = outcomes[:, 0], outcomes[:, 1:]
+        n_variables = coefficients.shape[1]
+
+        assignments = (np.arange(1 << n_variables)[:, None] >> np.arange(n_variables)) & 1
+        bits = (assignments @ coefficients.T + constant) & 1
+        indices = bits @ (1 << np.arange(len(qubits), dtype=np.int64))
+        probabilities = np.zeros(1 << len(qubits))
+        np.add.at(probabilities, indices, 1.0 / (1 << n_variables))
+        return probabilities
+
+    def pauli_expectations(self, flip_mask: int, phase_masks: List[int]) -> np.ndarray:
+        """위상 마스크마다 ⟨X^x Z^z⟩ (x = flip_mask, z = 위상 마스크, k번째 비트가 큐빗 k)
+
+        스태빌라이저 상태에서 파울리 P의 기댓값은 0 또는 ±1이다. 스태빌라이저 하나라도 P와 반교환하면 0,
+        아니면 P는 P와 반교환하는 디스태빌라이저들의 짝 스태빌라이저 곱 (±P)이므로 그 위상이 부호다.
+        테이블의 Y 행은 XZ가 아니라 Y이므로 X^x Z^z = (-i)^{|x&z|} P로 바꿔 돌려준다.
+        """
+        n = self.n_qubits
+        shifts = np.arange(n, dtype=object)
+        x = ((flip_mask >> shifts) & 1).astype(bool)
+        values = []
+        for phase_mask in phase_masks:
+            z = ((phase_mask >> shifts) & 1).astype(bool)
+            anticommutes = np.logical_xor.reduce((self.x & z) ^ (self.z & x), axis=1)
+            if anticommutes[n:].any():
+                values.append(0.0)
+                continue
+            sign = -1.0 if self._product_phase(n + np.flatnonzero(anticommutes[:n]))[0] else 1.0
+            values.append(sign * (-1j) ** bin(flip_mask & phase_mask).count("1"))
+        return np.array(values, dtype=complex)
+
+    def entanglement_entropy(self, qubits: List[int]) -> int:
+        """qubits | 나머지 이분할의 얽힘 엔트로피 (비트, 스태빌라이저 상태는 항상 정수)
+
+        S_A = rank(스태빌라이저 생성자를 A 큐빗 열로 자른 x|z 행렬) - |A| (GF(2) 계수, O(n^2 |A|)).
+        """
+        n = self.n_qubits
+        qubits = list(qubits)
+        if not qubits or len(qubits) == n:
+            return 0
+        restricted = np.concatenate([self.x[n:, qubits], self.z[n:, qubits]], axis=1)
+        return _gf2_rank(restricted) - len(qubits)
+
+    # === 상태 벡터 변환 ===
+
+    def write_state_vector(self, state_vector: np.ndarray, chunk_size: int = None):
+        """0으로 초기화된 상태 벡터에 이 상태의 진폭 채우기 (전역 위상은 임의, memmap도 그대로 사용)
+
+        스태빌라이저 행을 가우스 소거해 X 부분이 독립인 k개 행 g_1..g_k와 Z만 있는 행으로 나누면,
+        측정 결과로 나올 수 있는 기저 상태 |b⟩에 대해 |ψ⟩ ∝ Σ_S ∏_{i∈S} g_i |b⟩ 이다
+        (Z 행들은 |b⟩를 바꾸지 않음). 0이 아닌 진폭은 2^k개이고 크기는 모두 2^(-k/2)이므로
+        부분집합 S를 chunk_size개 이하씩 나눠 인덱스와 위상을 계산한다 (임시 배열은 청크 크기).
+        """
+        n = self.n_qubits
+        outcome = self._symbolic_outcomes(list(range(n)))[:, 0]  # 무작위 변수를 모두 0으로 둔 결과
+        basis = sum(1 << q for q in range(n) if outcome[q])
+
+        # 스태빌라이저 행의 X 부분 가우스 소거 (위상은 _rowsum이 추적)
+        state = self.copy()
+        rank = 0
+        for qubit in range(n):
+            candidates = np.flatnonzero(state.x[n + rank:, qubit])
+            if not candidates.size:
+                continue
+            pivot, row = n + rank + candidates[0], n + rank
+            for table in (state.x, state.z, state.r):
+                table[[row, pivot]] = table[[pivot, row]]
+            others = n + np.flatnonzero(state.x[n:, qubit])
+            others = others[others != row]
+            if others.size:
+                state._rowsum(others, row)
+            rank += 1
+
+        flip_masks, phase_masks, coefficients = [], [], []
+        for row in range(n, n + rank):
+            flip_mask = sum(1 << q for q in np.flatnonzero(state.x[row]).tolist())
+            phase_mask = sum(1 << q for q in np.flatnonzero(state.z[row]).tolist())
+            flip_masks.append(flip_mask)
+            phase_masks.append(phase_mask)
+            # g|c⟩ = (-1)^r i^{|x&z|} (-1)^{|c&z|} |c ⊕ x⟩ (Y 행은 Y = iXZ)
+            coefficients.append((-1.0 if state.r[row, 0] else 1.0) * 1j ** bin(flip_mask & phase_mask).count("1"))
+
+        # 청크 = 하위 c개 생성자의 부분집합 2^c개: 상위 생성자는 스칼라로 적용한 뒤 하위 생성자로 배가
+        # (생성자들은 서로 교환하므로 곱하는 순서는 상관없음)
+        low = rank if chunk_size is None else min(rank, max(chunk_size, 1).bit_length() - 1)
+        scale = 2.0 ** (-rank / 2)
+        for high in range(1 << (rank - low)):
+            index, amplitude = basis, scale
+            for i in range(low, rank):
+                if (high >> (i - low)) & 1:
+                    amplitude *= coefficients[i] * (-1) ** bin(index & phase_masks[i]).count("1")
+                    index ^= flip_masks[i]
+            indices = np.array([index], dtype=np.int64)
+            amplitudes = np.array([amplitude], dtype=complex)
+            for i in range(low):
+                signs = 1 - 2 * mask_parities(indices, phase_masks[i])
+                indices = np.concatenate([indices, indices ^ flip_masks[i]])
+                amplitudes = np.concatenate([amplitudes, amplitudes * (coefficients[i] * signs)])
+            state_vector[indices] = amplitudes
+
+    def to_state_vector(self, dtype=np.complex128) -> np.ndarray:
+        """전체 상태 벡터로 변환 (little-endian, 작은 회로 전용)"""
+        state_vector = np.zeros(2**self.n_qubits, dtype=dtype)
+        self.write_state_vector(state_vector)
+        return state_vector
@@ -0,0 +1,1290 @@
+import pytest
+import sys
+import os
+import copy
+import io
+import itertools
+import json
+
+import numpy as np
+
+# Add the parent directory to the path so we can import qube
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from qube.quantum import (QuantumCircuit, QuantumSimulator, QuantumState, Parameter, GATE_MATRICES,
+                          rotation_matrix, FUSION_MIN_QUBITS)
+from qube.optimizer import fuse_gates, peephole_optimize, FUSED_GATE_NAME
+from qube.kernels import (apply_single_qubit_gate, apply_controlled_x, apply_controlled_phase,
+                          apply_multi_qubit_gate, marginal_probabilities, state_marginal_probabilities,
+                          qubit_probability, collapse_qubit, set_num_threads, get_num_threads)
+from qube.interpreter import QubeInterpreter, QubeValue
+from qube.parallel import run_circuit_trials, sample_shot_batches
+from qube.batched import BatchedSimulator
+from qube.stabilizer import StabilizerState, is_clifford_gate
+from qube.mps import MPSState
+from qube.sparse import SparseState
+from qube.cache import StateCache, circuit_key
+from qube import bench
+from qube.observables import parse_pauli_terms
+from qube.tracing import Tracer, TraceRecord
+from qube.output import OutputSink, QUIET, INFO, DEBUG
+
+
+def dense_single_qubit_reference(state_vector, gate, qubit, n_qubits):
+    """little-endian 순서의 kron 연산자로 계산한 기준 결과"""
+    ops = [np.eye(2)] * n_qubits
+    ops[n_qubits - 1 - qubit] = gate
+    full_gate = ops[0]
+    for op in ops[1:]:
+        full_gate = np.kron(full_gate, op)
+    return full_gate @ state_vector
+
+
+def random_state(n_qubits, seed=0):
+    rng = np.random.default_rng(seed)
+    state = rng.normal(size=2**n_qubits) + 1j * rng.normal(size=2**n_qubits)
+    return state / np.linalg.norm(state)
+
+
+CLIFFORD_GATES = ("h", "s", "x", "y", "z", "cnot", "cz")
+UNIVERSAL_GATES = ("h", "t", "s", "y", "rx", "cnot", "cz", "ccz")
+ROTATION_GATES = ("ry", "rz", "ry", "rz", "cnot")
+GATE_ARITY = {"cnot": 2, "cz": 2, "ccz": 3}
+
+
+def random_circuit(n_qubits, n_gates, seed, gate_pool, **options):
+    """gate_pool의 게이트를 무작위 큐빗에 n_gates개 적용한 회로 (회전 게이트는 각도도 무작위)"""
+    rng = np.random.default_rng(seed)
+    options.setdefault("backend", "statevector")
+    circuit = QuantumCircuit(n_qubits, **options)
+    for _ in range(n_gates):
+        name = gate_pool[rng.integers(len(gate_pool))]
+        qubits = [int(q) for q in rng.choice(n_qubits, GATE_ARITY.get(name, 1), replace=False)]
+        if name in ("rx", "ry", "rz"):
+            qubits.insert(0, float(rng.uniform(0, 2 * np.pi)))
+        getattr(circuit, name)(*qubits)
+    return circuit
+
+
+class TestGateKernels:
+    def setup_method(self):
+        self.simulator = QuantumSimulator()
+
+    def test_single_qubit_kernel_matches_dense_operator(self):
+        n_qubits = 5
+        state = random_state(n_qubits)
+        gates = dict(self.simulator.gates)
+        gates['RX'] = np.array([[np.cos(0.3), -1j * np.sin(0.3)], [-1j * np.sin(0.3), np.cos(0.3)]])
+        for name, gate in gates.items():
+            for qubit in range(n_qubits):
+                expected = dense_single_qubit_reference(state, gate, qubit, n_qubits)
+                actual = apply_single_qubit_gate(state.copy(), gate, qubit)
+                assert np.allclose(actual, expected), f"{name} on q{qubit}"
+
+    def test_circuit_gates_update_state_in_place(self):
+        circuit = QuantumCircuit(3)
+        state_before = circuit.circuit_state.state_vector
+        circuit.h(0).x(2).rz(0.5, 1)
+        assert circuit.circuit_state.state_vector is state_before
+        probabilities = circuit.get_probabilities()
+        assert np.isclose(probabilities[0b100], 0.5)
+        assert np.isclose(probabilities[0b101], 0.5)
+
+    def test_apply_single_gate_does_not_mutate_input(self):
+        state = QuantumState(np.array([1.0, 0.0, 0.0, 0.0]), 2)
+        new_state = self.simulator.apply_single_gate("X", state)
+        assert np.allclose(state.state_vector, [1, 0, 0, 0])
+        assert np.allclose(new_state.state_vector, [0, 1, 0, 0])
+
+    def test_run_does_not_modify_circuit_state(self):
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        before = circuit.get_state_vector()
+        circuit.run()
+        assert np.allclose(circuit.get_state_vector(), before)
+
+    def test_controlled_x_matches_bit_flip_permutation(self):
+        n_qubits = 5
+        state = random_state(n_qubits, seed=1)
+        for controls, target in [([0], 3), ([4], 1), ([0, 2], 4), ([1, 2, 3], 0)]:
+            expected = np.empty_like(state)
+            for i in range(len(state)):
+                if all((i >> c) & 1 for c in controls):
+                    expected[i ^ (1 << target)] = state[i]
+                else:
+                    expected[i] = state[i]
+            actual = apply_controlled_x(state.copy(), controls, target)
+            assert np.allclose(actual, expected), f"controls={controls}, target={target}"
+
+    def test_cnot_creates_bell_state(self):
+        circuit = QuantumCircuit(2)
+        circuit.h(0).cnot(0, 1)
+        assert np.allclose(circuit.get_probabilities(), [0.5, 0, 0, 0.5])
+
+    def test_mcx_flips_target_only_when_all_controls_set(self):
+        circuit = QuantumCircuit(4)
+        circuit.x(0).x(2).mcx(0, 2, 3)
+        assert np.isclose(circuit.get_probabilities()[0b1101], 1.0)
+        circuit.mcx(0, 1, 3)
+        assert np.isclose(circuit.get_probabilities()[0b1101], 1.0)
+        assert circuit.gates[-1].name == "CCX"
+
+    def test_controlled_phase_flips_only_all_ones_amplitudes(self):
+        n_qubits = 5
+        state = random_state(n_qubits, seed=2)
+        for qubits in [[0, 1], [1, 3], [0, 2, 4], [0, 1, 2, 3, 4]]:
+            mask = sum(1 << q for q in qubits)
+            expected = np.array([-a if (i & mask) == mask else a for i, a in enumerate(state)])
+            actual = apply_controlled_phase(state.copy(), qubits)
+            assert np.allclose(actual, expected), f"qubits={qubits}"
+
+    def test_controlled_z_family_and_run_agree(self):
+        circuit = QuantumCircuit(5)
+        for q in range(5):
+            circuit.h(q)
+        circuit.cz(0, 3).ccz(0, 1, 2).cccz(1, 2, 3, 4).controlled_z_n(0, 1, 2, 3, 4)
+        state = circuit.get_state_vector()
+        for i, amp in enumerate(state):
+            sign = 1
+            for mask in [0b01001, 0b00111, 0b11110, 0b11111]:
+                if (i & mask) == mask:
+                    sign = -sign
+            assert np.isclose(amp, sign / np.sqrt(32))
+
+        replay = QuantumCircuit(5)
+        final_state = replay.circuit_state
+        for gate in circuit.gates:
+            final_state = replay._apply_gate(gate, final_state, self.simulator)
+        assert np.allclose(final_state.state_vector, state)
+
+
+class TestLazyCircuit:
+    def test_lazy_circuit_defers_allocation(self):
+        circuit = QuantumCircuit(24, lazy=True)
+        for q in range(24):
+            circuit.h(q)
+        circuit.cnot(0, 1).controlled_z_n(*range(24))
+        circuit.draw()
+        assert circuit.depth() == 26
+        assert circuit._circuit_state is None
+        assert not circuit.is_materialized
+
+    def test_lazy_matches_eager_and_accepts_more_gates(self):
+        eager = layered_circuit()
+        lazy = QuantumCircuit(eager.n_qubits, lazy=True)
+        for gate in eager.gates:
+            lazy.gates.append(gate)
+        assert np.allclose(lazy.get_state_vector(), eager.get_state_vector())
+        assert lazy.is_materialized
+
+        eager.h(0).cz(0, 3)
+        lazy.h(0).cz(0, 3)
+        assert not lazy.is_materialized
+        assert np.allclose(lazy.get_probabilities(), eager.get_probabilities())
+
+    def test_run_uses_final_state_without_reapplying_gates(self):
+        circuit = QuantumCircuit(1, lazy=True)
+        circuit.x(0).measure(0)
+        result = circuit.run()
+        assert result["measurements"]["qubit_0"] == 1
+        assert result["gate_count"] == 1
+
+
+class TestSampling:
+    def test_marginal_probabilities_follow_qubit_order(self):
+        probabilities = np.abs(random_state(4, seed=3)) ** 2
+        marginal = marginal_probabilities(probabilities, [3, 1])
+        expected = np.zeros(4)
+        for i, p in enumerate(probabilities):
+            expected[((i >> 3) & 1) | (((i >> 1) & 1) << 1)] += p
+        assert np.allclose(marginal, expected)
+
+    def test_run_with_shots_returns_counts_without_collapse(self):
+        np.random.seed(7)
+        circuit = QuantumCircuit(3)
+        circuit.h(0).cnot(0, 2)
+        before = circuit.get_state_vector()
+        result = circuit.run(shots=10000)
+        assert set(result["counts"]) == {0b000, 0b101}
+        assert sum(result["counts"].values()) == 10000
+        assert abs(result["counts"][0b101] - 5000) < 300
+        assert np.allclose(circuit.get_state_vector(), before)
+
+    def test_measure_builtin_with_shots(self):
+        interpreter = QubeInterpreter()
+        interpreter.run("""
+        circuit Flip(3) {
+            apply X to q1;
+        }
+        c = Flip();
+        counts = measure(c, [1, 2], 500);
+        """)
+        assert interpreter.variables["counts"].value == {0b01: 500}
+
+    def test_million_shots_on_twenty_qubits(self):
+        circuit = QuantumCircuit(20, lazy=True)
+        for q in range(20):
+            circuit.h(q)
+        counts = circuit.sample_counts(10**6)
+        assert sum(counts.values()) == 10**6
+
+
+class TestMeasurement:
+    def test_qubit_probability_and_collapse(self):
+        state = random_state(4, seed=4)
+        for qubit in range(4):
+            p1 = sum(abs(a) ** 2 for i, a in enumerate(state) if (i >> qubit) & 1)
+            assert np.isclose(qubit_probability(state, qubit, 1), p1)
+            assert np.isclose(qubit_probability(state, qubit, 0), 1 - p1)
+
+            collapsed = collapse_qubit(state.copy(), qubit, 1)
+            expected = np.array([a if (i >> qubit) & 1 else 0 for i, a in enumerate(state)]) / np.sqrt(p1)
+            assert np.allclose(collapsed, expected)
+
+    def test_quantum_state_measure_is_little_endian(self):
+        # 인덱스 2 = |10⟩: 큐빗 1이 1, 큐빗 0이 0 (QuantumCircuit과 같은 번호)
+        state = QuantumState(np.array([0.0, 0.0, 1.0, 0.0]), 2)
+        assert state.measure(1) == 1
+        assert np.allclose(state.state_vector, [0, 0, 1, 0])
+        assert QuantumState(np.array([0.0, 0.0, 1.0, 0.0]), 2).measure(0) == 0
+
+    def test_mid_circuit_measurement_collapses_in_place(self):
+        interpreter = QubeInterpreter()
+        circuit = QuantumCircuit(3)
+        circuit.h(0).cnot(0, 1)
+        state_vector = circuit.circuit_state.state_vector
+        result = interpreter._measure_circuit_qubit(circuit, 0)
+        assert circuit.circuit_state.state_vector is state_vector
+        expected = np.zeros(8)
+        expected[0b011 if result else 0] = 1
+        assert np.allclose(np.abs(circuit.get_state_vector()), expected)
+
+    def test_run_measures_each_qubit_in_little_endian_order(self):
+        result = QuantumCircuit(2).x(0).measure_all().run()
+        assert result["measurements"] == {"qubit_0": 1, "qubit_1": 0}
+        result = QuantumCircuit(3, storage="memmap", memory_budget=64).x(2).measure(2).measure(2).run()
+        assert result["measurements"] == {"qubit_2": 1}
+
+    def test_numpy_seed_reproduces_mixed_measurement_and_sampling(self):
+        def trial():
+            interpreter = QubeInterpreter()
+            circuit = QuantumCircuit(4)
+            for q in range(4):
+                circuit.h(q)
+            first = interpreter._measure_circuit_qubit(circuit, 1)
+            circuit.cnot(0, 3).ry(0.7, 2)
+            return (first, circuit.sample_counts(50), interpreter._measure_all_qubits_simultaneously(circuit, [0, 2, 3]),
+                    circuit.measure_all().run()["measurements"])
+
+        np.random.seed(11)
+        expected = trial()
+        np.random.seed(11)
+        assert trial() == expected
+
+
+class TestPrecision:
+    def test_single_precision_stays_complex64(self):
+        circuit = layered_circuit()
+        single = QuantumCircuit(circuit.n_qubits, precision="single")
+        for gate in circuit.gates:
+            single._add_gate(gate)
+        state = single.circuit_state.state_vector
+        assert state.dtype == np.complex64
+        assert np.allclose(state, circuit.get_state_vector(), atol=1e-6)
+        assert single.is_normalized()
+        assert single.run(shots=100)["final_state"].state_vector.dtype == np.complex64
+
+    def test_unknown_precision_rejected(self):
+        with pytest.raises(ValueError):
+            QuantumCircuit(2, precision="half")
+
+    def test_interpreter_precision_applies_to_circuits(self):
+        interpreter = QubeInterpreter()
+        interpreter.precision = "single"
+        interpreter.run("""
+        circuit Bell(2) {
+            apply H to q0;
+            apply CNOT to (q0, q1);
+        }
+        c = Bell();
+        d = Circuit(2, "double");
+        """)
+        assert interpreter.variables["c"].value.circuit_state.state_vector.dtype == np.complex64
+        assert interpreter.variables["d"].value.dtype == np.complex128
+
+
+class TestChunkedStorage:
+    def test_chunked_kernels_match_unchunked(self):
+        state = random_state(6, seed=5)
+        h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+        unitary = np.linalg.qr(random_state(4, seed=6).reshape(4, 4))[0]
+        for chunk_size in [4, 8, 32]:
+            for qubit in [0, 3, 5]:
+                assert np.allclose(apply_single_qubit_gate(state.copy(), h, qubit, chunk_size),
+                                   apply_single_qubit_gate(state.copy(), h, qubit))
+            assert np.allclose(apply_controlled_x(state.copy(), [5, 1], 3, chunk_size),
+                               apply_controlled_x(state.copy(), [5, 1], 3))
+            assert np.allclose(apply_controlled_phase(state.copy(), [0, 4], -1, chunk_size),
+                               apply_controlled_phase(state.copy(), [0, 4], -1))
+            assert np.allclose(apply_multi_qubit_gate(state.copy(), unitary, [5, 2], chunk_size),
+                               apply_multi_qubit_gate(state.copy(), unitary, [5, 2]))
+            assert np.isclose(qubit_probability(state, 5, 1, chunk_size), qubit_probability(state, 5, 1))
+            assert np.allclose(collapse_qubit(state.copy(), 4, 0, chunk_size=chunk_size),
+                               collapse_qubit(state.copy(), 4, 0))
+            assert np.allclose(state_marginal_probabilities(state, [5, 0], chunk_size),
+                               marginal_probabilities(np.abs(state) ** 2, [5, 0]))
+
+    def test_memmap_circuit_matches_memory_circuit(self, tmp_path):
+        reference = layered_circuit()
+        circuit = QuantumCircuit(reference.n_qubits, storage="memmap", scratch_dir=str(tmp_path),
+                                 memory_budget=4 * 16 * 4)
+        for gate in reference.gates:
+            circuit._add_gate(gate)
+        assert isinstance(circuit.circuit_state.state_vector, np.memmap)
+        assert circuit.chunk_size == 4
+        assert np.allclose(circuit.get_state_vector(), reference.get_state_vector())
+        assert circuit.is_normalized()
+
+        np.random.seed(3)
+        result = circuit.run(shots=200)
+        assert isinstance(result["final_state"].state_vector, np.memmap)
+        assert sum(result["counts"].values()) == 200
+
+    def test_renormalization_and_backend_export_stay_on_disk(self, tmp_path):
+        circuit = QuantumCircuit(6, storage="memmap", scratch_dir=str(tmp_path), memory_budget=16 * 16)
+        state_vector = circuit.circuit_state.state_vector
+        state_vector[:4] = 1.0
+        state = QuantumState(state_vector, 6, circuit.chunk_size)
+        assert state.state_vector is state_vector
+        assert np.allclose(state_vector[:4], 0.5) and np.isclose(np.linalg.norm(state_vector), 1.0)
+
+        reference = random_circuit(6, 40, 3, CLIFFORD_GATES)
+        tableau = QuantumCircuit(6, backend="stabilizer", storage="memmap", scratch_dir=str(tmp_path),
+                                 memory_budget=4 * 16)
+        for gate in reference.gates:
+            tableau._add_gate(gate)
+        exported = tableau.get_state_vector()
+        assert isinstance(exported, np.memmap)
+        expected = reference.get_state_vector()
+        phase = np.vdot(exported, expected)
+        assert np.isclose(abs(phase), 1.0) and np.allclose(exported * phase, expected)
+
+    def test_interpreter_memmap_lifts_qubit_cap(self, tmp_path):
+        source = """
+        circuit Wide(21) {
+            apply X to q20;
+        }
+        c = Wide();
+        """
+        with pytest.raises(Exception):
+            QubeInterpreter().run(source)
+
+        interpreter = QubeInterpreter()
+        interpreter.storage = "memmap"
+        interpreter.scratch_dir = str(tmp_path)
+        interpreter.run(source)
+        circuit = interpreter.variables["c"].value
+        assert circuit.sample_counts(10) == {1 << 20: 10}
+
+
+class TestThreadedKernels:
+    def setup_method(self):
+        set_num_threads(4, threshold=16)
+
+    def teardown_method(self):
+        set_num_threads(1, threshold=1 << 18)
+
+    def test_threaded_circuit_matches_single_thread(self):
+        threaded = layered_circuit(6).get_state_vector()
+        set_num_threads(1)
+        assert np.allclose(threaded, layered_circuit(6).get_state_vector())
+
+    def test_threaded_measurement_kernels(self):
+        state = random_state(6, seed=8)
+        expected = sum(abs(a) ** 2 for i, a in enumerate(state) if (i >> 2) & 1)
+        assert get_num_threads() == 4
+        assert np.isclose(qubit_probability(state, 2, 1), expected)
+        assert np.allclose(state_marginal_probabilities(state, [2, 5]), marginal_probabilities(np.abs(state) ** 2, [2, 5]))
+
+        collapsed = collapse_qubit(state.copy(), 2, 1)
+        assert np.allclose(collapsed, [a / np.sqrt(expected) if (i >> 2) & 1 else 0 for i, a in enumerate(state)])
+
+    def test_invalid_thread_count(self):
+        with pytest.raises(ValueError):
+            set_num_threads(0)
+
+
+class TestParallel:
+    SOURCE = """
+    circuit Coin(3) {
+        apply H to q0;
+        apply CNOT to (q0, q1);
+        measure q2;
+    }
+    """
+
+    def test_trials_are_independent_of_worker_count(self):
+        interpreter = QubeInterpreter()
+        interpreter.run(self.SOURCE)
+        results = []
+        for workers in [1, 2]:
+            np.random.seed(11)
+            results.append(run_circuit_trials(interpreter, "Coin", 150, workers=workers))
+        assert results[0] == results[1]
+        assert set(results[0]) == {0b000, 0b011}
+        assert sum(results[0].values()) == 150
+
+    def test_shot_batches_merge_deterministically(self, monkeypatch):
+        monkeypatch.setattr("qube.parallel.SHOT_BATCH_SIZE", 1000)
+        circuit = QuantumCircuit(2)
+        circuit.h(1)
+        results = []
+        for workers in [1, 2]:
+            np.random.seed(12)
+            results.append(sample_shot_batches(circuit, 4500, workers=workers, qubits=[1]))
+        assert results[0] == results[1]
+        assert sum(results[0].values()) == 4500
+
+    def test_backend_shot_batches_skip_the_marginal(self, monkeypatch):
+        monkeypatch.setattr("qube.parallel.SHOT_BATCH_SIZE", 1000)
+        for backend in ("stabilizer", "mps", "sparse"):
+            circuit = QuantumCircuit(60, backend=backend).h(0)
+            for q in range(59):
+                circuit.cnot(q, q + 1)
+            monkeypatch.setattr(circuit, "marginal_probabilities",
+                                lambda *args: pytest.fail("built the full marginal"))
+            results = []
+            for workers in [1, 2]:
+                np.random.seed(13)
+                results.append(sample_shot_batches(circuit, 2500, workers=workers))
+            assert results[0] == results[1]
+            assert set(results[0]) == {0, (1 << 60) - 1} and sum(results[0].values()) == 2500
+
+    def test_run_many_builtin(self):
+        interpreter = QubeInterpreter()
+        interpreter.run(self.SOURCE + """
+        counts = run_many("Coin", 20, [2]);
+        """)
+        assert interpreter.variables["counts"].value == {0: 20}
+
+
+class TestBatchedSimulator:
+    def sweep_circuit(self, angles):
+        circuit = QuantumCircuit(3, lazy=True)
+        circuit.h(0).ry(angles, 1).cnot(1, 2).rz(0.4, 2).rx(angles, 0).ccz(0, 1, 2).h(2)
+        return circuit
+
+    def test_sweep_matches_per_angle_circuits(self):
+        angles = np.linspace(0, 2 * np.pi, 7)
+        states = BatchedSimulator(3).run(self.sweep_circuit(angles).gates)
+        assert states.shape == (7, 8)
+        for k, angle in enumerate(angles):
+            assert np.allclose(states[k], self.sweep_circuit(angle).get_state_vector())
+
+    def test_fused_gates_and_probabilities(self):
+        angles = np.array([0.1, 0.7, 2.3])
+        fused = layered_circuit()._optimized_gates(fuse=True) + self.sweep_circuit(angles).gates
+        assert any(gate.matrix is not None for gate in fused)
+        probabilities = BatchedSimulator(4).probabilities(fused)
+        assert probabilities.shape == (3, 16)
+        for k, angle in enumerate(angles):
+            expected = replay(QuantumCircuit(4), layered_circuit().gates + self.sweep_circuit(angle).gates)
+            assert np.allclose(probabilities[k], np.abs(expected) ** 2)
+
+    def test_mismatched_parameter_lengths(self):
+        circuit = QuantumCircuit(2, lazy=True)
+        circuit.rx(np.zeros(3), 0).ry(np.zeros(4), 1)
+        with pytest.raises(ValueError):
+            BatchedSimulator(2).run(circuit.gates)
+
+
+class TestCompiledCircuit:
+    def ansatz(self, theta, gamma):
+        circuit = QuantumCircuit(3, lazy=True)
+        circuit.h(0).h(1).cnot(0, 1).ry(theta, 2).cnot(1, 2).rz(2 * gamma, 2).rx(-theta + 0.5, 0).h(1)
+        return circuit
+
+    def test_bind_matches_concrete_circuit(self):
+        compiled = self.ansatz(Parameter("theta"), Parameter("gamma")).compile()
+        assert compiled.parameters == ["theta", "gamma"]
+        for theta, gamma in [(0.3, 1.1), (2.0, -0.4)]:
+            bound = compiled.bind({"theta": theta, "gamma": gamma})
+            assert np.allclose(bound.get_state_vector(), self.ansatz(theta, gamma).get_state_vector())
+        assert np.allclose(compiled.bind([0.3, 1.1]).get_state_vector(),
+                           self.ansatz(0.3, 1.1).get_state_vector())
+
+    def test_fixed_gates_are_fused_once(self):
+        compiled = self.ansatz(Parameter("theta"), Parameter("gamma")).compile()
+        assert sum(gate.is_parametric for gate in compiled.gates) == 3
+        fixed = [gate for gate in compiled.gates if not gate.is_parametric]
+        bound = compiled.bind([0.3, 1.1])
+        assert all(any(gate is other for other in bound.gates) for gate in fixed)
+        assert not any(gate.is_parametric for gate in bound.gates)
+
+    def test_unbound_parameters(self):
+        circuit = self.ansatz(Parameter("theta"), Parameter("gamma"))
+        with pytest.raises(ValueError):
+            circuit.get_state_vector()
+        with pytest.raises(ValueError):
+            circuit.compile().bind({"theta": 0.3})
+        with pytest.raises(ValueError):
+            QuantumCircuit(1).rx(Parameter("theta"), 0)
+
+    def test_interpreter_compile_and_bind(self):
+        interpreter = QubeInterpreter()
+        interpreter.run("""
+        circuit Ansatz(2, theta, gamma) {
+            apply H to q0;
+            apply RY(theta) to q1;
+            apply CNOT to (q0, q1);
+            apply RZ(2 * gamma) to q1;
+        }
+        compiled = compile_circuit("Ansatz")
+        bound = bind_circuit(compiled, [0.5, 0.25])
+        direct = Ansatz(0.5, 0.25)
+        """)
+        bound = interpreter.variables["bound"].value
+        direct = interpreter.variables["direct"].value
+        assert interpreter.variables["compiled"].value.parameters == ["theta", "gamma"]
+        assert np.allclose(bound.get_state_vector(), direct.get_state_vector())
+
+
+class TestGateTables:
+    def test_simulators_share_read_only_tables(self):
+        first, second = QuantumSimulator(), QuantumSimulator()
+        assert first.gates is second.gates is GATE_MATRICES
+        with pytest.raises(ValueError):
+            GATE_MATRICES["H"][0, 0] = 0
+        with pytest.raises(TypeError):
+            GATE_MATRICES["H"] = np.eye(2)
+
+    def test_rotation_matrices_are_cached(self):
+        matrix = rotation_matrix("x", 0.25)
+        assert rotation_matrix("X", np.float64(0.25)) is matrix
+        assert not matrix.flags.writeable
+        expected = np.array([[np.cos(0.125), -1j * np.sin(0.125)], [-1j * np.sin(0.125), np.cos(0.125)]])
+        assert np.allclose(matrix, expected)
+        assert np.allclose(rotation_matrix("Z", np.pi), np.diag([-1j, 1j]))
+        with pytest.raises(ValueError):
+            rotation_matrix("W", 0.1)
+
+
+class TestStabilizer:
+    def test_tableau_matches_state_vector(self):
+        for seed in range(20):
+            dense = random_circuit(4, 30, seed, CLIFFORD_GATES)
+            tableau = StabilizerState(4)
+            for gate in dense.gates:
+                tableau.apply_gate(gate)
+            qubits = [3, 0, 2]
+            assert np.allclose(tableau.marginal_probabilities(qubits), dense.marginal_probabilities(qubits))
+
+    def test_auto_backend_selection(self):
+        circuit = QuantumCircuit(3, lazy=True)
+        circuit.h(0).cnot(0, 1).cz(1, 2)
+        assert circuit.uses_stabilizer
+        assert set(circuit.sample_counts(200)) <= {0b000, 0b011}
+        circuit.t(2)
+        assert not circuit.uses_stabilizer
+        assert not QuantumCircuit(2).h(0).uses_stabilizer  # 이미 상태 벡터가 있는 즉시 모드
+        assert not is_clifford_gate(QuantumCircuit(3, lazy=True).ccz(0, 1, 2).gates[0])
+
+    def test_thousand_qubit_ghz(self):
+        circuit = QuantumCircuit(1000, backend="stabilizer").h(0)
+        for q in range(999):
+            circuit.cnot(q, q + 1)
+        counts = circuit.sample_counts(500, [0, 500, 999])
+        assert set(counts) == {0b000, 0b111}
+        assert sum(counts.values()) == 500
+        first = circuit.measure_qubit(0)
+        assert circuit.measure_qubit(999) == first
+        with pytest.raises(ValueError):
+            circuit.t(0)
+        with pytest.raises(ValueError):
+            circuit.get_state_vector()
+
+    def test_auto_backend_mid_circuit_measurement_then_non_clifford(self):
+        np.random.seed(3)
+        for _ in range(5):
+            circuit = QuantumCircuit(2, lazy=True).h(0).cnot(0, 1)
+            first = circuit.measure_qubit(0)
+            assert circuit.uses_stabilizer
+            circuit.t(1).h(1)
+            counts = circuit.sample_counts(200)
+            assert {outcome & 1 for outcome in counts} == {first}
+            assert {outcome >> 1 for outcome in counts} == {0, 1}
+            assert np.allclose(circuit.marginal_probabilities([1]), [0.5, 0.5])
+
+        clifford = QuantumCircuit(3, lazy=True).h(0).cnot(0, 1).cnot(1, 2)
+        result = clifford.measure_qubit(2)
+        expected = np.zeros(8)
+        expected[0b111 * result] = 1.0
+        assert np.allclose(np.abs(clifford.get_state_vector())**2, expected)
+
+    def test_run_on_stabilizer_backend(self):
+        circuit = QuantumCircuit(2, backend="stabilizer")
+        circuit.x(0).cnot(0, 1).measure(0)
+        result = circuit.run()
+        assert isinstance(result["final_state"], StabilizerState)
+        assert result["measurements"] == {"qubit_0": 1}
+        assert circuit.run(shots=50)["counts"] == {0b01: 50}
+
+
+
+class TestMPS:
+    def test_matches_state_vector(self):
+        for seed in range(10):
+            dense = random_circuit(5, 40, seed, UNIVERSAL_GATES)
+            mps = MPSState(5)
+            for gate in dense.gates:
+                mps.apply_gate(gate)
+            assert np.allclose(mps.to_state_vector(), dense.get_state_vector())
+            qubits = [4, 1, 2]
+            assert np.allclose(mps.marginal_probabilities(qubits), dense.marginal_probabilities(qubits))
+            assert mps.truncation_error < 1e-9
+
+    def test_hundred_qubit_chain(self):
+        circuit = QuantumCircuit(100, backend="mps", max_bond_dimension=16)
+        circuit.h(0)
+        for q in range(99):
+            circuit.cnot(q, q + 1)
+        counts = circuit.sample_counts(300, [0, 50, 99])
+        assert set(counts) <= {0b000, 0b111}
+        assert sum(counts.values()) == 300
+        assert circuit.truncation_error < 1e-9
+        first = circuit.measure_qubit(0)
+        assert circuit.measure_qubit(99) == first
+        with pytest.raises(ValueError):
+            circuit.get_state_vector()
+
+    def test_state_vector_comes_from_the_mps(self):
+        np.random.seed(11)
+        for _ in range(5):
+            circuit = QuantumCircuit(6, backend="mps").h(0)
+            for q in range(5):
+                circuit.cnot(q, q + 1)
+            assert np.allclose(np.abs(circuit.get_state_vector()[[0, 63]])**2, [0.5, 0.5])
+            result = circuit.measure_qubit(3)
+            assert np.flatnonzero(np.abs(circuit.get_state_vector()) > 1e-9).tolist() == [63 * result]
+            circuit.h(5)
+            support = np.flatnonzero(np.abs(circuit.get_state_vector()) > 1e-9).tolist()
+            assert support == sorted({31 * result, 31 * result + 32})
+            assert set(circuit.sample_counts(50)) <= set(support)
+
+        stabilizer = QuantumCircuit(3, backend="stabilizer").h(0).cnot(0, 2)
+        result = stabilizer.measure_qubit(0)
+        assert np.flatnonzero(np.abs(stabilizer.get_state_vector()) > 1e-9).tolist() == [0b101 * result]
+
+    def test_bond_cap_reports_truncation(self):
+        circuit = QuantumCircuit(8, backend="mps", max_bond_dimension=2)
+        rng = np.random.default_rng(7)
+        for _ in range(4):
+            for q in range(8):
+                circuit.ry(float(rng.uniform(0, np.pi)), q)
+            for q in range(7):
+                circuit.cnot(q, q + 1)
+        result = circuit.run(shots=100)
+        assert isinstance(result["final_state"], MPSState)
+        assert max(result["final_state"].bond_dimensions) <= 2
+        assert result["truncation_error"] > 0
+        assert circuit.truncation_error == result["truncation_error"]
+        assert QuantumCircuit(2).truncation_error == 0.0
+
+    def test_interpreter_mps_backend(self):
+        interpreter = QubeInterpreter()
+        interpreter.backend = "mps"
+        interpreter.max_bond_dimension = 8
+        interpreter.run("""
+        circuit Wide(40) {
+            apply X to q0;
+            apply CNOT to (q0, q39);
+        }
+        c = Wide();
+        counts = measure(c, [0, 39], 50);
+        """)
+        circuit = interpreter.variables["c"].value
+        assert circuit.active_backend == "mps"
+        assert circuit.max_bond_dimension == 8
+        assert interpreter.variables["counts"].value == {0b11: 50}
+
+
+class TestSparse:
+    def test_matches_state_vector(self):
+        for seed in range(10):
+            dense = random_circuit(5, 40, seed, UNIVERSAL_GATES)
+            sparse = SparseState(5)
+            for gate in dense.gates:
+                sparse.apply_gate(gate)
+            assert np.allclose(sparse.to_state_vector(), dense.get_state_vector())
+            qubits = [4, 1, 2]
+            assert np.allclose(sparse.marginal_probabilities(qubits), dense.marginal_probabilities(qubits))
+
+    def test_permutation_oracle_stays_sparse(self):
+        circuit = QuantumCircuit(50, backend="sparse").h(0)
+        for q in range(49):
+            circuit.cnot(q, q + 1)
+        circuit.mcx(0, 1, 2).ccz(0, 1, 3).s(49)
+        assert circuit.active_backend == "sparse"
+        assert circuit._backend_state.nnz == 2
+        counts = circuit.sample_counts(200, [0, 2, 49])
+        assert set(counts) == {0b000, 0b101}
+        first = circuit.measure_qubit(0)
+        assert circuit.run()["final_state"].nnz == 1
+        assert circuit.measure_qubit(49) == first
+
+    def test_dense_fallback(self):
+        circuit = QuantumCircuit(6, backend="sparse", max_fill_ratio=0.25)
+        circuit.h(0).h(1)
+        assert circuit.active_backend == "sparse"
+        circuit.measure_qubit(0)  # 희소 상태에서 붕괴한 결과도 전환 후 유지
+        circuit.h(2).h(3).h(4)
+        assert circuit.active_backend == "sparse"  # 16/64 = 0.25
+        circuit.h(5)
+        assert circuit.active_backend == "statevector"
+        probabilities = circuit.marginal_probabilities()
+        assert np.count_nonzero(probabilities > 1e-12) == 32
+        assert np.isclose(probabilities.sum(), 1.0)
+
+    def test_interpreter_circuit_option(self):
+        interpreter = QubeInterpreter()
+        interpreter.run("""
+        c = Circuit(40, "sparse");
+        apply X to c[0];
+        apply CNOT to (c[0], c[39]);
+        counts = measure(c, [0, 39], 20);
+        """)
+        assert interpreter.variables["c"].value.active_backend == "sparse"
+        assert interpreter.variables["counts"].value == {0b11: 20}
+def replay(circuit, gates):
+    """게이트 리스트를 |0...0⟩부터 다시 시뮬레이션한 상태 벡터"""
+    state = QuantumCircuit(circuit.n_qubits).circuit_state
+    simulator = QuantumSimulator()
+    for gate in gates:
+        state = circuit._apply_gate(gate, state, simulator)
+    return state.state_vector
+
+
+def layered_circuit(n_qubits=4):
+    circuit = QuantumCircuit(n_qubits)
+    for q in range(n_qubits):
+        circuit.h(q).t(q).rx(0.3 * (q + 1), q)
+    circuit.cnot(0, 1).rz(0.7, 1).cnot(0, 1).cz(1, 2).h(2).x(2)
+    circuit.ccz(0, 2, 3).s(3).h(3).cnot(3, 0).ry(1.1, 0)
+    return circuit
+
+
+class TestOptimizer:
+    def test_fusion_preserves_state(self):
+        circuit = layered_circuit()
+        for width in [1, 2, 3]:
+            fused = fuse_gates(circuit.gates, max_fused_width=width)
+            assert np.allclose(replay(circuit, fused), circuit.get_state_vector()), f"width={width}"
+
+    def test_fusion_reduces_gate_count(self):
+        circuit = layered_circuit()
+        single = fuse_gates(circuit.gates, max_fused_width=1)
+        double = fuse_gates(circuit.gates, max_fused_width=2)
+        assert len(double) <= len(single) < len(circuit.gates)
+        assert any(gate.name == FUSED_GATE_NAME and len(gate.target_qubits) == 2 for gate in double)
+
+    def test_lone_controlled_gates_keep_dedicated_kernels(self):
+        # H·CNOT 블록은 4x4 순회보다 단일 큐빗 순회 + 진폭 교환이 싸므로 합치지 않음
+        circuit = QuantumCircuit(3, lazy=True).h(0).cnot(0, 1).cnot(1, 2).cz(0, 2)
+        assert fuse_gates(circuit.gates, max_fused_width=2) == circuit.gates
+        # 양쪽 큐빗의 회전을 흡수한 블록은 합침
+        circuit = QuantumCircuit(2, lazy=True).ry(0.3, 0).ry(0.4, 1).cnot(0, 1).rx(0.5, 0).rz(0.6, 1)
+        fused = fuse_gates(circuit.gates, max_fused_width=2)
+        assert [gate.name for gate in fused] == [FUSED_GATE_NAME]
+        assert np.allclose(replay(circuit, fused), circuit.get_state_vector())
+
+    def test_fusion_disabled_and_wide_gates_untouched(self):
+        circuit = layered_circuit()
+        assert fuse_gates(circuit.gates, max_fused_width=0) == circuit.gates
+        fused = fuse_gates(circuit.gates, max_fused_width=2)
+        assert [g for g in fused if g.name == "CCZ"] == [g for g in circuit.gates if g.name == "CCZ"]
+
+
+class TestStateCache:
+    SOURCE = """
+    circuit Prepare(3, theta) {
+        apply H to q0;
+        apply CNOT to (q0, q1);
+        apply RY(theta) to q2;
+    }
+    """
+
+    def test_lru_eviction_by_bytes(self):
+        cache = StateCache(max_bytes=2 * 16 * 8)
+        for key in "abc":
+            cache.put(key, np.zeros(8, dtype=complex))
+        assert len(cache) == 2 and cache.nbytes == 256
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        cache.put("d", np.zeros(8, dtype=complex))
+        assert cache.get("c") is None and cache.get("b") is not None
+        assert not cache.put("big", np.zeros(64, dtype=complex))
+
+    def test_key_follows_gates(self):
+        first = QuantumCircuit(2, lazy=True).h(0).rx(0.5, 1)
+        assert circuit_key(first) == circuit_key(QuantumCircuit(2, lazy=True).h(0).rx(0.5, 1))
+        assert circuit_key(first) != circuit_key(QuantumCircuit(2, lazy=True).h(0).rx(0.25, 1))
+        assert circuit_key(first) != circuit_key(QuantumCircuit(2, lazy=True, precision="single").h(0).rx(0.5, 1))
+        assert circuit_key(QuantumCircuit(1, lazy=True).rx(Parameter("theta"), 0)) is None
+
+    def test_instances_share_state_copy_on_write(self):
+        interpreter = QubeInterpreter()
+        interpreter.run(self.SOURCE + """
+        a = Prepare(0.4);
+        ra = measure(a, [0, 1], 10);
+        b = Prepare(0.4);
+        c = Prepare(1.2);
+        """)
+        a, b, c = (interpreter.variables[name].value for name in "abc")
+        assert interpreter.circuit_cache.hits == 1
+        assert b.circuit_state.state_vector is a.circuit_state.state_vector
+        assert not np.allclose(c.get_state_vector(), a.get_state_vector())
+        expected = a.get_state_vector()
+        b.measure_qubit(0)
+        assert np.allclose(a.get_state_vector(), expected)
+        assert not a.circuit_state.state_vector.flags.writeable
+        assert np.allclose(interpreter._create_circuit_instance("Prepare", [QubeValue(0.4, "float")])
+                           .value.get_state_vector(), expected)
+
+    def test_disabled_or_extended_circuits_are_not_cached(self):
+        interpreter = QubeInterpreter()
+        interpreter.circuit_cache = None
+        interpreter.run(self.SOURCE + "a = Prepare(0.4);")
+        assert interpreter.variables["a"].value._state_cache is None
+
+        cache = StateCache()
+        circuit = QuantumCircuit(2, lazy=True).h(0)
+        circuit.use_state_cache(cache, circuit_key(circuit))
+        circuit.x(1).get_state_vector()
+        assert len(cache) == 0
+
+class TestProfiling:
+    def test_stats_record_per_gate_type(self):
+        circuit = QuantumCircuit(10, lazy=True, max_fused_width=0, profile=True)
+        circuit.h(0).h(1).cnot(0, 1).ccz(0, 1, 2).rx(0.3, 4)
+        circuit.get_state_vector()
+        stats = circuit.stats()
+        state_bytes = 2**10 * 16
+        assert stats["state_vector_bytes"] == state_bytes
+        assert stats["gate_count"] == 5 and stats["depth"] == 3
+        assert stats["gates"]["H"]["count"] == 2
+        assert stats["gates"]["H"]["bytes"] == 2 * 2 * state_bytes
+        assert stats["gates"]["CNOT"]["bytes"] == state_bytes
+        assert stats["gates"]["CCZ"]["bytes"] == 2 * state_bytes // 8
+        assert stats["total_time"] > 0
+        assert stats["total_bytes"] == sum(entry["bytes"] for entry in stats["gates"].values())
+
+    def test_fused_gates_are_attributed_to_original_types(self):
+        n_qubits = FUSION_MIN_QUBITS  # 이보다 작은 회로는 퓨전하지 않음
+        circuit = QuantumCircuit(n_qubits, lazy=True, profile=True)  # 기본 max_fused_width=2
+        circuit.h(0).h(1).cnot(0, 1).rz(0.4, 1).h(3).x(3)
+        circuit.get_state_vector()
+        stats = circuit.stats()
+        assert stats["fused_passes"] == 2
+        assert FUSED_GATE_NAME not in stats["gates"]
+        assert {name: entry["count"] for name, entry in stats["gates"].items()} == {"H": 3, "CNOT": 1, "RZ": 1, "X": 1}
+        assert stats["total_bytes"] == 2 * 2 * 2**n_qubits * 16
+        assert stats["gates"]["H"]["time"] > 0
+
+    def test_disabled_by_default(self):
+        circuit = QuantumCircuit(3).h(0).cnot(0, 1)
+        stats = circuit.stats()
+        assert stats["gates"] == {} and not stats["profiled"]
+        assert stats["gate_count"] == 2
+        circuit.set_profiling(True).x(2)
+        assert circuit.stats()["gates"]["X"]["count"] == 1
+
+    def test_backend_gates_and_builtin(self):
+        circuit = QuantumCircuit(40, backend="stabilizer", profile=True).h(0).cnot(0, 39)
+        circuit.sample_counts(10)
+        assert circuit.stats()["gates"]["CNOT"]["count"] == 1
+        assert circuit.stats()["backend"] == "stabilizer"
+
+        interpreter = QubeInterpreter()
+        interpreter.profile = True
+        interpreter.run("""
+        c = Circuit(3);
+        apply H to c[0];
+        apply RX(0.2) to c[1];
+        r = measure(c, [0, 1], 5);
+        s = circuit_stats(c);
+        """)
+        stats = interpreter.variables["s"].value
+        assert stats["profiled"] and stats["gate_count"] == 2
+        assert sum(entry["count"] for entry in stats["gates"].values()) >= 1
+
+class TestPeephole:
+    def test_cancels_nested_pairs_and_merges_rotations(self):
+        circuit = QuantumCircuit(3, lazy=True)
+        circuit.h(0).x(1).x(1).h(0).cnot(0, 1).cnot(0, 1).rx(0.0, 2)
+        circuit.rz(0.3, 2).cz(2, 0).rz(0.4, 2).z(0).ccz(0, 1, 2).z(0)
+        optimized = peephole_optimize(circuit.gates)
+        assert [gate.name for gate in optimized] == ["RZ", "CZ", "CCZ"]
+        assert np.isclose(optimized[0].parameters[0], 0.7)
+        full_turn = QuantumCircuit(1, lazy=True).rz(np.pi, 0).rz(np.pi, 0).rz(2 * np.pi, 0)
+        assert peephole_optimize(full_turn.gates) == []
+
+    def test_non_commuting_gates_block(self):
+        circuit = QuantumCircuit(2, lazy=True)
+        circuit.h(0).cnot(0, 1).h(0).rx(0.2, 1).cz(0, 1).rx(0.3, 1).cnot(1, 0).cnot(0, 1)
+        assert len(peephole_optimize(circuit.gates)) == len(circuit.gates)
+
+    def test_enabled_circuit_preserves_state(self):
+        plain, optimized = (QuantumCircuit(4, lazy=True, peephole=flag) for flag in (False, True))
+        for circuit in (plain, optimized):
+            for gate in layered_circuit().gates:
+                circuit._add_gate(gate)
+                if gate.name in ("H", "CNOT", "RZ"):
+                    circuit._add_gate(gate)
+        assert np.allclose(optimized.get_state_vector(), plain.get_state_vector())
+        assert optimized.gates_removed > 0
+        assert plain.gates_removed == 0
+
+    def test_interpreter_option(self):
+        interpreter = QubeInterpreter()
+        interpreter.peephole = True
+        interpreter.run("""
+        c = Circuit(2);
+        apply H to c[0];
+        apply H to c[0];
+        apply X to c[1];
+        counts = measure(c, [0, 1], 20);
+        """)
+        assert interpreter.variables["counts"].value == {0b10: 20}
+        assert interpreter.variables["c"].value.gates_removed == 2
+
+
+class TestBench:
+    def test_workloads(self):
+        ghz = bench.ghz_circuit(6).get_state_vector()
+        assert np.allclose(np.abs(ghz[[0, 63]])**2, 0.5)
+
+        probabilities = np.abs(bench.grover_circuit(5).get_state_vector())**2
+        assert int(np.argmax(probabilities)) == 0b10101 and probabilities[0b10101] > 0.5
+
+        # QFT |0⟩는 균등 중첩
+        qft = bench.qft_circuit(4).get_state_vector()
+        assert np.allclose(np.abs(qft)**2, 1 / 16)
+
+        assert len(bench.random_layered_circuit(6).gates) == len(bench.random_layered_circuit(6).gates)
+
+    def test_suite_json_and_compare(self, tmp_path):
+        output = tmp_path / "bench.json"
+        assert bench.main(["--workloads", "ghz", "qft", "--min-qubits", "4", "--max-qubits", "6",
+                           "--step", "2", "--repeat", "1", "--output", str(output)]) == 0
+        report = json.loads(output.read_text(encoding="utf-8"))
+        assert [(r["workload"], r["n_qubits"]) for r in report["results"]] == [
+            ("ghz", 4), ("ghz", 6), ("qft", 4), ("qft", 6)]
+        result = report["results"][0]
+        assert result["time_per_gate"] == pytest.approx(result["seconds"] / result["gates"])
+        assert result["amplitudes_per_second"] > 0 and result["peak_memory_bytes"] > 0
+
+        assert bench.compare_results(report, report) == []
+        slower = copy.deepcopy(report)
+        slower["results"][1]["seconds"] *= 2
+        regressions = bench.compare_results(slower, report, threshold=0.5)
+        assert [(r["workload"], r["n_qubits"], r["metric"]) for r in regressions] == [("ghz", 6, "seconds")]
+
+    def test_fusion_reduces_sweeps_and_time(self):
+        rows = bench.fusion_check(["ghz", "random", "grover"], FUSION_MIN_QUBITS, repeat=3)
+        sweeps = {row["workload"]: (row["sweeps_unfused"], row["sweeps_fused"]) for row in rows}
+        assert sweeps["ghz"][0] == sweeps["ghz"][1]  # H·CNOT 사슬은 그대로 전용 커널
+        assert sweeps["random"][1] < sweeps["random"][0] / 2 and sweeps["grover"][1] < sweeps["grover"][0]
+        assert bench.fusion_regressions(rows, threshold=1.0) == []
+        slower = [dict(rows[1], speedup=0.4)]
+        assert bench.fusion_regressions(slower, threshold=1.0) == slower
+        # 작은 회로는 퓨전 패스가 게이트 적용보다 비싸서 건너뜀
+        small = bench.fusion_check(["random"], FUSION_MIN_QUBITS - 4, repeat=1)[0]
+        assert small["sweeps_fused"] == small["sweeps_unfused"]
+
+
+class TestExpectation:
+    PAULIS = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]), "Y": np.array([[0, -1j], [1j, 0]]),
+              "Z": np.diag([1, -1])}
+
+    def _dense_expectation(self, state_vector, pauli):
+        n_qubits = state_vector.size.bit_length() - 1
+        operator = np.array([[1.0]])
+        for letter in reversed(pauli.ljust(n_qubits, "I")):  # 큐빗 n-1이 kron 최상위
+            operator = np.kron(operator, self.PAULIS[letter])
+        return np.vdot(state_vector, operator @ state_vector).real
+
+    def _ansatz(self, circuit):
+        rng = np.random.default_rng(7)
+        for layer in range(3):
+            for q in range(circuit.n_qubits):
+                circuit.ry(float(rng.uniform(0, 2 * np.pi)), q).rz(float(rng.uniform(0, 2 * np.pi)), q)
+            for q in range(layer % 2, circuit.n_qubits - 1, 2):
+                circuit.cnot(q, q + 1)
+        return circuit
+
+    def test_matches_dense_operator(self):
+        state_vector = self._ansatz(QuantumCircuit(5)).get_state_vector()
+        rng = np.random.default_rng(3)
+        terms = [(float(rng.normal()), "".join(rng.choice(list("IXYZ"), 5))) for _ in range(12)]
+        terms += [(0.3, "ZZ"), (-0.2, "IIZZ"), (0.1, "ZIIIZ")]  # 짧은 문자열, 같은 반전 마스크 그룹
+        expected = sum(c * self._dense_expectation(state_vector, p) for c, p in terms)
+        for backend in ("statevector", "mps", "sparse"):
+            circuit = self._ansatz(QuantumCircuit(5, backend=backend))
+            assert circuit.expectation(terms) == pytest.approx(expected, abs=1e-10)
+        chunked = self._ansatz(QuantumCircuit(5, storage="memmap", memory_budget=64))
+        assert chunked.expectation(terms) == pytest.approx(expected, abs=1e-10)
+
+    def test_stabilizer_and_many_diagonal_terms(self):
+        circuit = QuantumCircuit(60, backend="stabilizer").h(0)
+        for q in range(59):
+            circuit.cnot(q, q + 1)
+        circuit.s(0)
+        assert circuit.expectation("Y" + "X" * 59) == pytest.approx(1.0)
+        assert circuit.expectation("X" * 60) == pytest.approx(0.0)
+        assert circuit.expectation("ZZ") == pytest.approx(1.0)
+        assert circuit.expectation({"Z": 1.0, "IZ" + "I" * 40 + "Z": 2.0}) == pytest.approx(2.0)
+
+        # 항 수가 위상 큐빗 수보다 많으면 월시-아다마르 변환 경로
+        state_vector = self._ansatz(QuantumCircuit(4)).get_state_vector()
+        diagonal = ["".join(p) for p in itertools.product("IZ", repeat=4)]
+        expected = sum(self._dense_expectation(state_vector, p) for p in diagonal)
+        assert self._ansatz(QuantumCircuit(4)).expectation(diagonal) == pytest.approx(expected)
+
+    def test_parse_and_builtin(self):
+        assert parse_pauli_terms("XYZ", 3) == [(1.0, 0b011, 0b110)]
+        with pytest.raises(ValueError):
+            parse_pauli_terms("XQ", 3)
+        with pytest.raises(ValueError):
+            parse_pauli_terms("XXXX", 3)
+
+        interpreter = QubeInterpreter()
+        interpreter.run("""
+        c = Circuit(3);
+        apply H to c[0];
+        apply CNOT to (c[0], c[1]);
+        zz = expectation(c, "ZZI");
+        e = expectation(c, ["XXI", "ZIZ", "IIZ"], [0.5, 1.0, -2.0]);
+        """)
+        assert interpreter.variables["zz"].value == pytest.approx(1.0)
+        assert interpreter.variables["e"].value == pytest.approx(-1.5)
+        assert not interpreter.variables["c"].value.measurements
+
+
+class TestEntanglement:
+    def test_reduced_density_matrix_matches_outer_product(self):
+        circuit = random_circuit(5, 40, 11, ROTATION_GATES)
+        state_vector = circuit.get_state_vector()
+        # 전체 밀도 행렬에서 큐빗 2, 4를 남기고 부분 대각합 (텐서 축 k는 큐빗 4-k)
+        rho = np.outer(state_vector, state_vector.conj()).reshape((2,) * 10)
+        rho = np.einsum('abcdeAbCde->acAC', rho)
+        expected = rho.reshape(4, 4)  # 행 인덱스: 큐빗 4가 최상위, 큐빗 2가 최하위
+        assert np.allclose(circuit.reduced_density_matrix([2, 4]), expected)
+
+        eigenvalues = np.linalg.eigvalsh(expected)
+        eigenvalues = eigenvalues[eigenvalues > 1e-15]
+        assert circuit.entanglement_entropy([2, 4]) == pytest.approx(-np.sum(eigenvalues * np.log2(eigenvalues)))
+        assert circuit.purity([2, 4]) == pytest.approx(np.sum(eigenvalues**2))
+        # 이분할의 양쪽은 같은 엔트로피
+        assert circuit.entanglement_entropy([0, 1, 3]) == pytest.approx(circuit.entanglement_entropy([2, 4]))
+
+        chunked = random_circuit(5, 40, 11, ROTATION_GATES, storage="memmap", memory_budget=64)
+        assert np.allclose(chunked.reduced_density_matrix([2, 4]), expected)
+        assert chunked.entanglement_entropy([2, 4]) == pytest.approx(circuit.entanglement_entropy([2, 4]))
+
+    def test_ghz_and_product_states(self):
+        ghz = QuantumCircuit(16).h(0)
+        for q in range(15):
+            ghz.cnot(q, q + 1)
+        assert ghz.entanglement_entropy() == pytest.approx(1.0)
+        assert ghz.entanglement_entropy([5, 11]) == pytest.approx(1.0)
+        assert ghz.purity([3]) == pytest.approx(0.5)
+
+        product = QuantumCircuit(4).h(0).ry(0.3, 1).x(3)
+        assert product.entanglement_entropy([0, 2]) == pytest.approx(0.0, abs=1e-12)
+        assert product.purity([1]) == pytest.approx(1.0)
+
+    def test_backend_states_without_state_vector(self):
+        dense = random_circuit(6, 40, 11, ROTATION_GATES, backend="statevector", lazy=True)
+        mps = random_circuit(6, 40, 11, ROTATION_GATES, backend="mps")
+        sparse = random_circuit(6, 40, 11, ROTATION_GATES, backend="sparse", max_fill_ratio=1.0)
+        for qubits in ([0, 1, 2], [1, 4], [5]):
+            expected = dense.entanglement_entropy(qubits)
+            for circuit in (mps, sparse):
+                assert circuit.entanglement_entropy(qubits) == pytest.approx(expected)
+                assert circuit.purity(qubits) == pytest.approx(dense.purity(qubits))
+                assert np.allclose(circuit.reduced_density_matrix(qubits), dense.reduced_density_matrix(qubits))
+        assert mps._circuit_state is None and sparse.active_backend == "sparse"
+
+        chain = QuantumCircuit(60, backend="mps").h(0)
+        for q in range(59):
+            chain.cnot(q, q + 1)
+        assert chain.entanglement_entropy() == pytest.approx(1.0)
+        assert chain.purity([7, 40]) == pytest.approx(0.5)
+        with pytest.raises(ValueError):
+            chain.reduced_density_matrix(list(range(20)))
+
+        tableau = QuantumCircuit(1000, backend="stabilizer").h(0).h(1)
+        for q in range(1, 999):
+            tableau.cnot(q, q + 1)
+        assert tableau.entanglement_entropy([0]) == 0.0
+        assert tableau.entanglement_entropy() == 1.0 and tableau.purity([1, 999]) == 0.5
+        with pytest.raises(ValueError):
+            tableau.reduced_density_matrix([0])
+
+    def test_quantum_state_and_builtin(self):
+        bell = QuantumState(np.array([1, 0, 0, 1]) / np.sqrt(2))
+        assert bell.entropy([0]) == pytest.approx(1.0)
+        assert bell.purity([1]) == pytest.approx(0.5)
+        assert bell.purity() == pytest.approx(1.0) and bell.entropy() == pytest.approx(0.0)
+        assert QuantumSimulator().calculate_entanglement_measure(bell) == pytest.approx(1.0)
+
+        # QuantumState도 little-endian: kron의 오른쪽 인자가 큐빗 0
+        product = QuantumState(np.kron([1, 0], [np.sqrt(0.3), np.sqrt(0.7)]))
+        assert np.allclose(product.reduced_density_matrix([1]), [[1, 0], [0, 0]])
+        assert np.allclose(product.reduced_density_matrix([0]), [[0.3, np.sqrt(0.21)], [np.sqrt(0.21), 0.7]])
+
+        # 비대칭 부분계: 상태와 그 상태를 만든 회로가 같은 큐빗을 가리켜야 한다
+        circuit = QuantumCircuit(3).h(0).cnot(0, 1).ry(0.7, 2)
+        state = QuantumState(circuit.get_state_vector().copy(), 3)
+        for subsystem in ([0], [2], [0, 2], [1, 2]):
+            assert state.purity(subsystem) == pytest.approx(circuit.purity(subsystem))
+            assert state.entropy(subsystem) == pytest.approx(circuit.entanglement_entropy(subsystem), abs=1e-9)
+            assert np.allclose(state.reduced_density_matrix(subsystem), circuit.reduced_density_matrix(subsystem))
+        assert state.purity([2]) == pytest.approx(1.0) and state.purity([0]) == pytest.approx(0.5)
+        builtins = QubeInterpreter()
+        subsystem = QubeValue([0], "array")  # 큐빗 0은 얽힘, 큐빗 2는 곱 상태
+        for builtin in (builtins._builtin_purity, builtins._builtin_entanglement):
+            from_state = builtin(QubeValue(state, "quantum_state"), subsystem).value
+            assert from_state == pytest.approx(builtin(QubeValue(circuit, "quantum_circuit"), subsystem).value)
+
+        interpreter = QubeInterpreter()
+        interpreter.run("""
+        c = Circuit(4);
+        apply H to c[0];
+        apply CNOT to (c[0], c[3]);
+        e = entanglement(c);
+        e_rest = entanglement(c, [1, 2]);
+        p = purity(c, [3]);
+        """)
+        assert interpreter.variables["e"].value == pytest.approx(1.0)
+        assert interpreter.variables["e_rest"].value == pytest.approx(0.0, abs=1e-12)
+        assert interpreter.variables["p"].value == pytest.approx(0.5)
+
+
+class TestTracing:
+    def test_records_gates_and_messages(self):
+        tracer = Tracer()
+        circuit = QuantumCircuit(3, lazy=True, max_fused_width=0, peephole=True, tracer=tracer)
+        circuit.h(0).h(0).x(1).cnot(1, 2)
+        circuit.get_state_vector()
+        messages = [r for r in tracer.records if r.event == "message"]
+        gates = [r for r in tracer.records if r.event == "gate"]
+        assert len(messages) == 1 and "2개 제거" in messages[0].message
+        assert [(r.name, r.qubits) for r in gates] == [("X", (1,)), ("CNOT", (1, 2))]
+        assert gates[-1].probabilities[0b110] == pytest.approx(1.0)
+        assert all(r.elapsed >= 0 for r in gates)
+
+    def test_disabled_by_default_and_backend_gates(self, capsys):
+        circuit = QuantumCircuit(4).h(0).cnot(0, 1)
+        assert circuit.tracer is None
+        assert capsys.readouterr().out == ""
+
+        circuit.set_debug(True).x(2)
+        assert "DEBUG: X 게이트 적용됨" in capsys.readouterr().out
+        circuit.set_debug(False).x(3)
+        assert circuit.tracer is None and capsys.readouterr().out == ""
+
+        tracer = Tracer(max_records=1)
+        stabilizer = QuantumCircuit(50, backend="stabilizer", tracer=tracer).h(0).cnot(0, 49)
+        stabilizer.sample_counts(4)
+        assert list(tracer.records) == [TraceRecord("gate", "CNOT", (0, 49), tracer.records[0].elapsed,
+                                                    timestamp=tracer.records[0].timestamp)]
+
+    def test_bound_circuits_share_tracer(self):
+        tracer = Tracer()
+        theta = Parameter("theta")
+        template = QuantumCircuit(2, lazy=True, max_fused_width=0, tracer=tracer).ry(theta, 0)
+        template.compile().bind({"theta": 0.3}).get_state_vector()
+        assert [r.name for r in tracer.records] == ["RY"]
+
+    def test_simulator_kernels_emit_records_not_prints(self, capsys):
+        tracer = Tracer()
+        simulator = QuantumSimulator()
+        state = QuantumCircuit(3).circuit_state
+        simulator.apply_single_gate_to_circuit("H", state, 0, tracer)
+        simulator.apply_cnot_to_circuit(state, 0, 2, tracer)
+        simulator.apply_cz_to_circuit(state, 0, 2, tracer)
+        simulator.apply_unitary_to_circuit(np.eye(4), state, [1, 2], tracer)
+        simulator.apply_rotation_to_circuit("Y", 0.3, state, 1)
+        assert capsys.readouterr().out == ""
+        assert [r.event for r in tracer.records] == ["message"] * 4
+        assert "target=2" in tracer.records[1].message and "[1, 2]" in tracer.records[3].message
+
+
+class TestOutputSink:
+    PROGRAM = """
+    circuit Pair(2) {
+        apply H to q0;
+        apply CNOT to (q0, q1);
+        measure q0;
+    }
+    c = Pair();
+    println("done {}", 1);
+    print("tail");
+    """
+
+    def _run(self, verbosity):
+        stream = io.StringIO()
+        interpreter = QubeInterpreter()
+        interpreter.output = OutputSink(stream, verbosity)
+        interpreter.run(self.PROGRAM)
+        return stream.getvalue()
+
+    def test_verbosity_levels(self):
+        assert self._run(QUIET) == "done 1\ntail"
+
+        normal = self._run(INFO)
+        assert "회로 정의 등록: Pair" in normal and "회로 생성: Pair" in normal and "측정: q0" in normal
+        assert "DEBUG" not in normal and normal.endswith("done 1\ntail")
+
+        debug = self._run(DEBUG)
+        assert "DEBUG: H 게이트 적용됨 - 큐빗 [0]" in debug
+        assert "DEBUG: CNOT 게이트 적용됨 - 큐빗 [0, 1]" in debug
+
+    def test_circuit_traces_go_through_the_sink(self, capsys):
+        stream = io.StringIO()
+        interpreter = QubeInterpreter()
+        interpreter.output = OutputSink(stream, DEBUG)
+        interpreter.peephole = True
+        interpreter.run("""
+        c = Circuit(2);
+        apply H to c[0];
+        apply H to c[0];
+        apply X to c[1];
+        r = run_circuit(c);
+        """)
+        debug = stream.getvalue()
+        assert "DEBUG: 핍홀 최적화: 게이트 3개 중 2개 제거" in debug and "DEBUG: X 게이트 적용됨 - 큐빗 [1]" in debug
+        assert "DEBUG" not in capsys.readouterr().out
+
+        quiet = QubeInterpreter()
+        quiet.output = OutputSink(io.StringIO(), QUIET)
+        quiet.run("c = Circuit(2);")
+        assert quiet.variables["c"].value.tracer is None
+
+    def test_buffers_until_flush_and_skips_disabled_messages(self):
+        stream = io.StringIO()
+        output = OutputSink(stream, QUIET, buffer_size=8)
+        output.write("abc")
+        assert stream.getvalue() == ""
+        output.line(lambda: pytest.fail("disabled message was formatted"), DEBUG)
+        output.line("info", INFO)
+        output.write("defgh\n")
+        assert stream.getvalue() == "abcdefgh\n"
+        output.write("x")
+        output.flush()
+        assert stream.getvalue() == "abcdefgh\nx"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
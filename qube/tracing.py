@@ -0,0 +1,85 @@
+"""
+tracing.py - 시뮬레이터 트레이스
+
+회로에 Tracer를 붙이면 게이트를 적용할 때마다 구조화된 TraceRecord (게이트, 큐빗, 적용 시간,
+적용 후 확률 앞부분)를 남긴다. 트레이스를 끈 회로는 tracer가 None이고 게이트 루프는 트레이스 없는
+함수를 그대로 쓰므로, 메시지 포맷이나 확률 계산 비용이 전혀 없다. 그 밖의 메시지는 문자열 대신
+문자열을 만드는 함수로 넘겨 트레이스가 켜져 있을 때만 만든다.
+
+tracer = Tracer()                                   # 기록만 (출력 없음)
+circuit = QuantumCircuit(10, tracer=tracer)
+circuit.h(0).cnot(0, 1)
+for record in tracer.records:
+    print(record.name, record.qubits, record.elapsed)
+
+QuantumCircuit(5, debug_mode=True)                  # Tracer(sink=print_record): 기록하면서 "DEBUG: ..." 출력
+
+인터프리터는 print_record 대신 기록을 self.output.line(..., DEBUG)로 보내는 sink를 붙인다.
+"""
+
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Tuple
+
+import numpy as np
+
+
+# 기본 최대 기록 수 (넘으면 오래된 기록부터 버림)
+DEFAULT_MAX_RECORDS = 100_000
+
+# 게이트 기록에 남기는 적용 후 확률 개수 (기저 상태 |0...0⟩부터)
+TRACE_PROBABILITIES = 8
+
+
+class TraceRecord(NamedTuple):
+    """트레이스 기록 하나"""
+    event: str                                  # "gate" | "message"
+    name: str = ""                              # 게이트 이름
+    qubits: Tuple[int, ...] = ()                # 게이트 큐빗 (제어 큐빗 먼저)
+    elapsed: float = 0.0                        # 게이트 적용 시간 (초)
+    probabilities: Tuple[float, ...] = ()       # 상태 벡터 게이트: 적용 후 처음 TRACE_PROBABILITIES개 확률
+    message: str = ""
+    timestamp: float = 0.0                      # time.perf_counter() 기준 기록 시각
+
+
+def format_record(record: TraceRecord) -> str:
+    """사람이 읽을 한 줄 표현"""
+    if record.event != "gate":
+        return record.message
+    text = f"{record.name} 게이트 적용됨 - 큐빗 {list(record.qubits)} ({record.elapsed * 1e6:.1f} µs)"
+    if record.probabilities:
+        text += f", 확률 {[round(p, 6) for p in record.probabilities]}"
+    return text
+
+
+def print_record(record: TraceRecord):
+    """기존 디버그 출력 형식의 sink"""
+    print(f"DEBUG: {format_record(record)}")
+
+
+class Tracer:
+    """트레이스 기록 수집기 (sink가 있으면 기록할 때마다 호출)"""
+    def __init__(self, sink: Callable[[TraceRecord], None] = None, max_records: int = DEFAULT_MAX_RECORDS):
+        self.sink = sink
+        self.records = deque(maxlen=max_records)
+
+    def emit(self, record: TraceRecord):
+        self.records.append(record)
+        if self.sink is not None:
+            self.sink(record)
+
+    def message(self, build: Callable[[], str]):
+        """build()가 만든 메시지 기록 (트레이스가 켜져 있을 때만 호출되므로 포맷 비용은 여기서만)"""
+        self.emit(TraceRecord("message", message=build(), timestamp=time.perf_counter()))
+
+    def gate(self, gate, elapsed: float, state_vector: np.ndarray = None):
+        """게이트 적용 기록 (상태 벡터를 주면 적용 후 확률 앞부분도 남김)"""
+        probabilities = ()
+        if state_vector is not None:
+            head = state_vector[:TRACE_PROBABILITIES]
+            probabilities = tuple((head.real**2 + head.imag**2).tolist())
+        qubits = tuple(int(q) for q in list(gate.control_qubits) + list(gate.target_qubits))
+        self.emit(TraceRecord("gate", gate.name, qubits, elapsed, probabilities, timestamp=time.perf_counter()))
+
+    def clear(self):
+        self.records.clear()